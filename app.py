@@ -3,20 +3,13 @@ import pandas as pd
 import plotly.graph_objs as go
 from plotly.subplots import make_subplots
 import yfinance as yf
-import ta
 import numpy as np
 import numpy_financial as npf  # Added for financial calculations
-try:
-    from transformers import pipeline
-except ImportError:  # Fallback for environments where top-level export is unavailable
-    from transformers.pipelines import pipeline
-import feedparser
 import requests
 from bs4 import BeautifulSoup # Added for scraping
 from urllib.parse import quote_plus, urlparse # Added for scraping URL encoding
 import os
 from dotenv import load_dotenv
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import time
 from datetime import datetime, timedelta
 import json # Added for Lottie
@@ -25,6 +18,25 @@ import plotly.express as px
 from datetime import datetime, timedelta
 import random
 from about_tab import render_about_tab  # Added for About tab
+from store_utils import get_bars, bars_refresh_window  # Local OHLCV store with incremental top-up
+from fingerprint_utils import FRAME_HASH_FUNCS  # Version-stamp cache keys for DataFrame arguments
+from simulation_utils import run_monte_carlo  # Vectorised Monte Carlo engine
+from backtest_utils import run_backtest, DEFAULT_COST_BPS, MIN_DATA_POINTS as BACKTEST_MIN_DATA_POINTS  # Vectorised signal history + backtest
+from panel_utils import load_panel, signal_board  # Cross-sectional (dates x tickers) signal scoring
+from risk_utils import risk_report, returns_from_closes, risk_metric  # One-pass vectorised risk metrics
+from correlation_utils import rolling_correlation, correlation_clusters, most_correlated_pairs  # Incremental N x N rolling correlation
+from optimizer_utils import optimize_signal_parameters, random_parameters, DEFAULT_TRAIN_FRACTION  # Parallel signal-threshold sweeps
+from indicator_utils import compute_indicators  # Incremental SMA/BB/RSI/MACD engine
+from info_cache_utils import get_info  # Shared .info cache with per-field-class TTLs
+from screener_utils import get_fundamentals_table, screen_fundamentals, screener_universe  # Cached fundamentals table + vectorized filters
+from sentiment_utils import score_texts_vader, score_texts_hf, warm_hf_model_async  # Batch VADER/HF scoring
+from bundle_utils import LazyBundle, session_memo  # Deferred, session-memoized tab data
+from http_utils import http_get, http_head, parse_feed  # Shared pooled HTTP client
+from response_cache_utils import cached_get  # Persistent conditional-GET cache for pages and feeds
+from batch_utils import get_batch_quotes, fetch_batch_info  # Bulk multi-ticker fetches
+from concurrency_utils import map_concurrently, gather_with_deadline, single_flight
+from rate_limit_utils import acquire, request_priority, get_rate_limit_metrics, YAHOO, PRIORITY_BULK  # Prioritized upstream quota scheduler
+from thumbnail_utils import get_thumbnail, prefetch_thumbnails  # Lazy og:image thumbnails for news cards
 import streamlit.components.v1 as components # Added for HTML components
 import re
 
@@ -58,7 +70,7 @@ def scrape_company_images(query_term, max_images=9):
         try:
             # Try Google Images
             search_url = f"https://www.google.com/search?q={quote_plus(search_query)}&tbm=isch"
-            response = requests.get(search_url, headers=headers, timeout=10)
+            response = http_get(search_url, headers=headers, timeout=10)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -113,7 +125,7 @@ def scrape_company_images(query_term, max_images=9):
         try:
             # Try Unsplash API as a fallback
             unsplash_url = f"https://source.unsplash.com/featured/?{quote_plus(query_term)},company"
-            response = requests.head(unsplash_url, allow_redirects=True)
+            response = http_head(unsplash_url, allow_redirects=True)
             if response.status_code == 200:
                 image_urls.append(response.url)
         except:
@@ -739,15 +751,8 @@ def load_lottiefile(filepath: str):
         return None
 
 # --- SENTIMENT MODELS ---
-@st.cache_resource
-def load_hf_sentiment_model():
-    return pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
-hf_sentiment_analyzer = load_hf_sentiment_model()
-
-@st.cache_resource
-def load_vader_sentiment_analyzer():
-    return SentimentIntensityAnalyzer()
-vader_analyzer = load_vader_sentiment_analyzer()
+# The HF model is loaded on first use (see sentiment_utils); HF_SENTIMENT_WARMUP=1 loads it in the background at start-up instead
+if os.getenv("HF_SENTIMENT_WARMUP") == "1": warm_hf_model_async()
 
 # --- STYLING ---
 st.markdown("""
@@ -1856,14 +1861,21 @@ with st.sidebar:
     st.markdown('</div>', unsafe_allow_html=True)
     st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
+    # Operator view of the upstream scheduler (queue depth, throttling per priority class)
+    if os.getenv("SHOW_UPSTREAM_METRICS") == "1":
+        with st.expander("Upstream rate limits"):
+            st.json(get_rate_limit_metrics())
+
 # --- UTILITY FUNCTIONS ---
-@st.cache_data(ttl=3600)
 def fetch_stock_data(ticker_symbol, period='1y', interval='1d', max_retries=3):
+    # The refresh window follows the ticker's trading hours: short while the market is open, frozen from close to the next open
+    return _fetch_stock_data_cached(ticker_symbol, period, interval, max_retries, bars_refresh_window(ticker_symbol, interval))
+
+@st.cache_data(ttl=3600)
+def _fetch_stock_data_cached(ticker_symbol, period, interval, max_retries, refresh_window_key):
     for attempt in range(max_retries):
         try:
-            stock = yf.Ticker(ticker_symbol)
-            df = stock.history(period=period, interval=interval)
-            df.dropna(inplace=True)
+            df = get_bars(ticker_symbol, period=period, interval=interval)
             df.attrs['ticker_symbol'] = ticker_symbol
             return df
         except Exception as e:
@@ -1875,31 +1887,70 @@ def fetch_stock_data(ticker_symbol, period='1y', interval='1d', max_retries=3):
                 return pd.DataFrame()
     return pd.DataFrame()
 
-@st.cache_data(ttl=3600)
+def get_market_signal_board(tickers, period='1y'):
+    # One panel pass scores the whole universe; refreshed on the first ticker's market schedule
+    tickers = tuple(dict.fromkeys(tickers))
+    return _get_market_signal_board_cached(tickers, period, bars_refresh_window(tickers[0]) if tickers else None)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _get_market_signal_board_cached(tickers, period, refresh_window_key):
+    with request_priority(PRIORITY_BULK):
+        closes, volumes = load_panel(tickers, period=period)
+    return signal_board(closes, volumes)
+
+def get_panel_returns(tickers, period='1y'):
+    # Daily returns for a ticker list from one panel load; refreshed on the first ticker's market schedule
+    tickers = tuple(dict.fromkeys(t.upper() for t in tickers))
+    return _get_panel_returns_cached(tickers, period, bars_refresh_window(tickers[0]) if tickers else None)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _get_panel_returns_cached(tickers, period, refresh_window_key):
+    with request_priority(PRIORITY_BULK):
+        closes, _ = load_panel(tickers, period=period)
+    return returns_from_closes(closes)
+
+def get_risk_table(tickers, benchmark_symbol=None, risk_free_rate=0.0, period='1y'):
+    # Risk columns for a ticker list (plus its benchmark) from one panel; refreshed on the first ticker's market schedule
+    tickers = tuple(dict.fromkeys(t.upper() for t in tickers))
+    return _get_risk_table_cached(tickers, benchmark_symbol, risk_free_rate, period, bars_refresh_window(tickers[0]) if tickers else None)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _get_risk_table_cached(tickers, benchmark_symbol, risk_free_rate, period, refresh_window_key):
+    symbols = list(tickers) + ([benchmark_symbol] if benchmark_symbol and benchmark_symbol not in tickers else [])
+    with request_priority(PRIORITY_BULK):
+        closes, _ = load_panel(symbols, period=period)
+    if closes.empty:
+        return pd.DataFrame()
+    benchmark = benchmark_symbol if benchmark_symbol in closes.columns else None
+    report = risk_report(returns_from_closes(closes), benchmark=benchmark, risk_free_rate=risk_free_rate)
+    return report.reindex([t for t in tickers if t in report.index])
+
+@st.cache_data(ttl=3600, hash_funcs=FRAME_HASH_FUNCS)
 def add_technical_indicators(df):
     if df.empty or 'Close' not in df.columns: return pd.DataFrame()
     df_ta = df.copy()
+    # Same values as the ta library, but only bars new since the last call for this ticker are computed
+    indicators = compute_indicators(df_ta['Close'], key=df_ta.attrs.get('ticker_symbol'))
     if len(df_ta) > 20:
-        df_ta['SMA_20'] = ta.trend.sma_indicator(df_ta['Close'], window=20)
-        bb_indicator = ta.volatility.BollingerBands(close=df_ta['Close'], window=20, window_dev=2)
-        df_ta['BB_High'] = bb_indicator.bollinger_hband()
-        df_ta['BB_Mid'] = bb_indicator.bollinger_mavg()
-        df_ta['BB_Low'] = bb_indicator.bollinger_lband()
+        df_ta['SMA_20'] = indicators['SMA_20']
+        df_ta['BB_High'] = indicators['BB_High']
+        df_ta['BB_Mid'] = indicators['BB_Mid']
+        df_ta['BB_Low'] = indicators['BB_Low']
     else:
         df_ta['SMA_20'], df_ta['BB_High'], df_ta['BB_Mid'], df_ta['BB_Low'] = np.nan, np.nan, np.nan, np.nan
-    if len(df_ta) > 50: df_ta['SMA_50'] = ta.trend.sma_indicator(df_ta['Close'], window=50)
+    if len(df_ta) > 50: df_ta['SMA_50'] = indicators['SMA_50']
     else: df_ta['SMA_50'] = np.nan
-    if len(df_ta) > 14: df_ta['RSI'] = ta.momentum.rsi(df_ta['Close'], window=14)
+    if len(df_ta) > 14: df_ta['RSI'] = indicators['RSI']
     else: df_ta['RSI'] = np.nan
     if len(df_ta) > 34: 
-        df_ta['MACD_line'] = ta.trend.macd(df_ta['Close'])
-        df_ta['MACD_signal'] = ta.trend.macd_signal(df_ta['Close'])
-        df_ta['MACD_hist'] = ta.trend.macd_diff(df_ta['Close'])
+        df_ta['MACD_line'] = indicators['MACD_line']
+        df_ta['MACD_signal'] = indicators['MACD_signal']
+        df_ta['MACD_hist'] = indicators['MACD_hist']
     else:
         df_ta['MACD_line'], df_ta['MACD_signal'], df_ta['MACD_hist'] = np.nan, np.nan, np.nan
     return df_ta
 
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, hash_funcs=FRAME_HASH_FUNCS)
 def generate_signal(df, overall_news_sentiment_score=0.0, company_name="the company"):
     MIN_DATA_POINTS = 35 
     required_cols = ['RSI', 'MACD_hist', 'SMA_20', 'Close', 'MACD_line', 'MACD_signal']
@@ -1947,13 +1998,14 @@ def get_about_stock_info(ticker_symbol):
     description, sector, industry, market_cap, exchange = "Info not available.", "N/A", "N/A", None, "N/A"
     info_dict, financials_df, earnings_df, analyst_recs_df, analyst_price_target_dict, company_officers_list = {}, pd.DataFrame(), pd.DataFrame(), None, None, []
     try:
-        stock = yf.Ticker(ticker_symbol); info = stock.info
+        stock = yf.Ticker(ticker_symbol); info = get_info(ticker_symbol)
         if info:
             description, sector, industry = info.get('longBusinessSummary', description), info.get('sector', sector), info.get('industry', industry)
             market_cap, exchange, info_dict = info.get('marketCap'), info.get('exchange', exchange), info
             company_officers_list = info.get('companyOfficers', [])
             info_dict['currency_symbol'] = get_currency_symbol(info.get('currency', 'USD')) 
             info_dict['logo_url'] = get_company_logo_url(ticker_symbol, info.get('shortName'), info.get('website'))
+        acquire(YAHOO, tokens=4)  # Financials, earnings, recommendations and price target requests below
         try: financials_df = stock.quarterly_financials if not stock.quarterly_financials.empty else stock.financials
         except: pass
         try: earnings_df = stock.quarterly_earnings if not stock.quarterly_earnings.empty else stock.earnings
@@ -1971,7 +2023,7 @@ def get_stock_news_from_newsapi(ticker_symbol_or_company_name):
     if not NEWS_API_KEY: return news_items, "NEWS_API_KEY not configured."
     query_term = ticker_symbol_or_company_name
     try:
-        stock_info_temp = yf.Ticker(ticker_symbol_or_company_name).info
+        stock_info_temp = get_info(ticker_symbol_or_company_name, field_classes=("profile",))
         if stock_info_temp and stock_info_temp.get('shortName'):
             company_name_for_search = stock_info_temp['shortName'].replace(" Inc.", "").replace(" Corp.", "").replace(" Ltd.", "")
             if len(company_name_for_search) > 3 : query_term = company_name_for_search
@@ -1979,27 +2031,15 @@ def get_stock_news_from_newsapi(ticker_symbol_or_company_name):
     to_date, from_date = datetime.now().strftime('%Y-%m-%d'), (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
     url = f"https://newsapi.org/v2/everything?q={query_term}&from={from_date}&to={to_date}&language=en&sortBy=relevancy&pageSize=15&apiKey={NEWS_API_KEY}"
     try:
-        response = requests.get(url, timeout=10); response.raise_for_status()
+        response = http_get(url, timeout=10); response.raise_for_status()
         articles_data = response.json().get("articles", [])
         if not articles_data: error_message = f"No recent news for '{query_term}' via NewsAPI."
         else:
             for item in articles_data:
                 publish_time_readable = pd.to_datetime(item['publishedAt']).strftime('%Y-%m-%d %H:%M') if item.get('publishedAt') else "N/A"
-                # Enhanced image URL handling
+                # Articles without urlToImage get a thumbnail lazily via thumbnail_utils in the News tab
                 image_url = item.get('urlToImage')
-                if not image_url or not image_url.startswith('http'):
-                    # Try to get image from article URL
-                    try:
-                        article_response = requests.get(item.get('url', ''), timeout=5)
-                        if article_response.status_code == 200:
-                            soup = BeautifulSoup(article_response.text, 'html.parser')
-                            # Try to find the first valid image
-                            for img in soup.find_all('img'):
-                                if img.get('src') and img['src'].startswith('http'):
-                                    image_url = img['src']
-                                    break
-                    except:
-                        pass
+                if not image_url or not image_url.startswith('http'): image_url = None
                 
                 news_items.append({
                     'title': item.get('title', 'N/A'), 
@@ -2026,7 +2066,7 @@ def scrape_google_news(query_term):
     search_url = f"https://news.google.com/search?q={safe_query}&hl=en-US&gl=US&ceid=US%3Aen"
     headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
     try:
-        response = requests.get(search_url, headers=headers, timeout=15); response.raise_for_status()
+        response = cached_get(search_url, headers=headers, timeout=15); response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser'); articles_tags = soup.find_all('article', limit=15)
         processed_urls = set()
         for article_tag in articles_tags:
@@ -2034,20 +2074,8 @@ def scrape_google_news(query_term):
             if link_tag and link_tag['href'].startswith('./articles/'):
                 title_text = link_tag.get_text(strip=True) or (article_tag.find(['h3', 'h4']) and article_tag.find(['h3', 'h4']).get_text(strip=True)) or article_tag.get_text(separator=' ', strip=True).split(' temporally ')[0]
                 full_link = "https://news.google.com" + link_tag['href'][1:]
-                
-                # Try to get image from article
-                image_url = None
-                try:
-                    article_response = requests.get(full_link, headers=headers, timeout=5)
-                    if article_response.status_code == 200:
-                        article_soup = BeautifulSoup(article_response.text, 'html.parser')
-                        # Try to find the first valid image
-                        for img in article_soup.find_all('img'):
-                            if img.get('src') and img['src'].startswith('http'):
-                                image_url = img['src']
-                                break
-                except:
-                    pass
+
+                image_url = None  # Resolved lazily from og:image by thumbnail_utils
                 
                 if full_link not in processed_urls and len(title_text) > 15:
                     news_items.append({
@@ -2064,20 +2092,8 @@ def scrape_google_news(query_term):
             for link_tag in potential_links:
                 title_text = link_tag.get_text(strip=True) or (link_tag.find(['h3','h4','div'], recursive=False) and link_tag.find(['h3','h4','div'], recursive=False).get_text(strip=True)) or (link_tag.img and link_tag.img.get('alt'))
                 full_link = "https://news.google.com" + link_tag['href'][1:]
-                
-                # Try to get image from article
-                image_url = None
-                try:
-                    article_response = requests.get(full_link, headers=headers, timeout=5)
-                    if article_response.status_code == 200:
-                        article_soup = BeautifulSoup(article_response.text, 'html.parser')
-                        # Try to find the first valid image
-                        for img in article_soup.find_all('img'):
-                            if img.get('src') and img['src'].startswith('http'):
-                                image_url = img['src']
-                                break
-                except:
-                    pass
+
+                image_url = None  # Resolved lazily from og:image by thumbnail_utils
                 
                 if full_link not in processed_urls and title_text and len(title_text) > 20 and (query_term.split()[0].lower() in title_text.lower() or query_term.lower() in title_text.lower()):
                     news_items.append({
@@ -2101,7 +2117,7 @@ def scrape_yahoo_finance_news(ticker_symbol):
     search_url = f"https://finance.yahoo.com/quote/{ticker_symbol}/news"
     headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
     try:
-        response = requests.get(search_url, headers=headers, timeout=15); response.raise_for_status()
+        response = cached_get(search_url, headers=headers, timeout=15); response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser')
         article_containers = soup.find_all('li', class_=lambda x: x and 'stream-item' in x.lower(), limit=15)
         if not article_containers : article_containers = soup.select('div.Cf div.js-stream-content > div', limit=15)
@@ -2114,20 +2130,8 @@ def scrape_yahoo_finance_news(ticker_symbol):
                 elif raw_link.startswith('https://finance.yahoo.com/news/'): full_link = raw_link
                 elif raw_link.startswith(('http://', 'https://')) and 'yahoo.com' in raw_link : full_link = raw_link
                 else: continue
-                
-                # Try to get image from article
-                image_url = None
-                try:
-                    article_response = requests.get(full_link, headers=headers, timeout=5)
-                    if article_response.status_code == 200:
-                        article_soup = BeautifulSoup(article_response.text, 'html.parser')
-                        # Try to find the first valid image
-                        for img in article_soup.find_all('img'):
-                            if img.get('src') and img['src'].startswith('http'):
-                                image_url = img['src']
-                                break
-                except:
-                    pass
+
+                image_url = None  # Resolved lazily from og:image by thumbnail_utils
                 
                 publisher_name = "Yahoo Finance"; publisher_tag_container = item_container.find('div', class_=lambda x: x and ('publisher' in x.lower() or 'provider' in x.lower() or 'c-secondary-text' in x.lower()))
                 if publisher_tag_container: publisher_name = (publisher_tag_container.find('span') and publisher_tag_container.find('span').get_text(strip=True)) or publisher_tag_container.get_text(strip=True) or publisher_name
@@ -2153,7 +2157,7 @@ def fetch_google_news_rss(query_term, site_domain=None, max_items=6, hl="en-US",
     try:
         query = quote_plus(query_term + (f" site:{site_domain}" if site_domain else ""))
         feed_url = f"https://news.google.com/rss/search?q={query}&hl={hl}&gl={gl}&ceid={ceid}"
-        feed = feedparser.parse(feed_url)
+        feed = parse_feed(feed_url, fetch=cached_get)
         if getattr(feed, 'bozo', 0):
             return [], f"RSS parse error for {site_domain or 'global'}"
         for entry in feed.entries[:max_items]:
@@ -2175,51 +2179,93 @@ def fetch_google_news_rss(query_term, site_domain=None, max_items=6, hl="en-US",
         error_message = f"RSS error for {site_domain or 'global'}: {str(e)}"
     return news_items, error_message
 
-@st.cache_data(ttl=1800)
-def get_curated_publisher_news(company_name):
-    domains = [
-        'bloomberg.com',
-        'cnbc.com',
-        'marketwatch.com',
-        'economictimes.indiatimes.com',
-        'tradingview.com',
-        'livemint.com'
-    ]
-    combined, errors = [], []
-    for domain in domains:
-        items, err = fetch_google_news_rss(company_name + " stock", site_domain=domain, max_items=4)
-        if items:
-            combined.extend(items)
-        if err:
-            errors.append(err)
-    # Deduplicate by link
+CURATED_NEWS_DOMAINS = [
+    'bloomberg.com',
+    'cnbc.com',
+    'marketwatch.com',
+    'economictimes.indiatimes.com',
+    'tradingview.com',
+    'livemint.com'
+]
+NEWS_STAGE_DEADLINE_SECONDS = 15  # Whole news stage budget; sources still running after this are skipped
+
+def dedupe_news_by_link(items):
     seen = set(); deduped = []
-    for item in combined:
+    for item in items:
         url = item.get('link') or item.get('url')
         if not url or url in seen:
             continue
         seen.add(url)
         deduped.append(item)
-    return deduped[:12], ("; ".join(errors) if errors else None)
+    return deduped
+
+def _merge_curated_results(domain_results):
+    combined, errors = [], []
+    for domain in CURATED_NEWS_DOMAINS:
+        items, err = domain_results.get(domain, ([], f"Timed out for {domain}"))
+        if items:
+            combined.extend(items)
+        if err:
+            errors.append(err)
+    return dedupe_news_by_link(combined)[:12], ("; ".join(errors) if errors else None)
+
+@st.cache_data(ttl=1800)
+def get_curated_publisher_news(company_name):
+    domain_results = map_concurrently(lambda domain: fetch_google_news_rss(company_name + " stock", site_domain=domain, max_items=4), CURATED_NEWS_DOMAINS)
+    domain_results = {d: r for d, r in domain_results.items() if not isinstance(r, Exception)}
+    return _merge_curated_results(domain_results)
+
+def aggregate_stock_news(ticker_symbol, company_name, deadline_seconds=NEWS_STAGE_DEADLINE_SECONDS):
+    """Fetch every news source concurrently and merge whatever arrives before the deadline.
+
+    Returns a dict with the per-source (items, error) tuples under 'newsapi', 'google' and
+    'yahoo', plus 'all': the link-deduplicated merge of every source in the usual priority order.
+    """
+    tasks = {
+        'google': lambda: scrape_google_news(company_name),
+        'yahoo': lambda: scrape_yahoo_finance_news(ticker_symbol),
+        # Global Google News RSS for broader fallback (company name and ticker)
+        'rss_global_by_name': lambda: fetch_google_news_rss(company_name + " stock", site_domain=None, max_items=8),
+        'rss_global_by_ticker': lambda: fetch_google_news_rss(ticker_symbol + " stock", site_domain=None, max_items=6),
+        # India-focused RSS (useful for NSE/BSE tickers)
+        'rss_india_by_name': lambda: fetch_google_news_rss(company_name + " stock", site_domain=None, max_items=8, hl="en-IN", gl="IN", ceid="IN:en"),
+        'rss_india_by_ticker': lambda: fetch_google_news_rss(ticker_symbol + " stock", site_domain=None, max_items=6, hl="en-IN", gl="IN", ceid="IN:en"),
+    }
+    if NEWS_API_KEY:
+        tasks['newsapi'] = lambda: get_stock_news_from_newsapi(company_name)
+    # Curated publishers are fanned out per domain so one slow feed can't hold the others back
+    for domain in CURATED_NEWS_DOMAINS:
+        tasks[f'curated:{domain}'] = (lambda d=domain: fetch_google_news_rss(company_name + " stock", site_domain=d, max_items=4))
+
+    results, timed_out = gather_with_deadline(tasks, deadline_seconds, max_workers=len(tasks))
+    for name in timed_out:
+        results[name] = ([], f"{name}: timed out or failed")
+    curated_items, _ = _merge_curated_results({name.split(':', 1)[1]: r for name, r in results.items() if name.startswith('curated:')})
+
+    source_order = ['newsapi', 'google', 'yahoo', None, 'rss_global_by_name', 'rss_global_by_ticker', 'rss_india_by_name', 'rss_india_by_ticker']
+    aggregated_candidates = []
+    for name in source_order:
+        bucket = curated_items if name is None else results.get(name, ([], None))[0]
+        aggregated_candidates.extend(bucket or [])
+    return {
+        'newsapi': results.get('newsapi', ([], None)),
+        'google': results['google'],
+        'yahoo': results['yahoo'],
+        # Cap total to reasonable number
+        'all': dedupe_news_by_link(aggregated_candidates)[:20]
+    }
 
 @st.cache_data(show_spinner=False)
 def analyze_news_item_sentiment_vader(text):
-    if not text or not isinstance(text, str) or not text.strip(): return {"label": "NEUTRAL", "score": 0.0, "compound": 0.0}
-    vs = vader_analyzer.polarity_scores(text); compound_score = vs['compound']
-    label = "POSITIVE" if compound_score >= 0.05 else "NEGATIVE" if compound_score <= -0.05 else "NEUTRAL"
-    return {"label": label, "score": compound_score, "compound": compound_score}
+    return score_texts_vader([text])[0]  # Shares the persistent per-headline score store
 
 @st.cache_data(ttl=3600)
 def analyze_sentiment_text_hf(text):
     if not text or not isinstance(text, str): return {"label": "NEUTRAL", "score": 0.0}
-    try:
-        max_len = hf_sentiment_analyzer.tokenizer.model_max_length
-        truncated_text = text[:max_len] if len(text) > max_len else text
-        if not truncated_text.strip(): return {"label": "NEUTRAL", "score": 0.0}
-        return hf_sentiment_analyzer(truncated_text)[0]
+    try: return score_texts_hf([text])[0]
     except Exception: return {"label": "NEUTRAL", "score": 0.0}
 
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, hash_funcs=FRAME_HASH_FUNCS)
 def assess_volatility_and_risk(df, window=60):
     if df.empty or 'Close' not in df.columns or len(df) < window + 1: return None, "N/A", "Not enough data."
     daily_returns = df['Close'].pct_change().dropna()
@@ -2239,7 +2285,7 @@ def get_historical_volatility_data(df, window=30, trading_days=252):
     if df.empty or 'Close' not in df.columns or len(df) < window + 1: return None
     return (df['Close'].pct_change().rolling(window=window).std() * np.sqrt(trading_days) * 100).dropna()
 
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, hash_funcs=FRAME_HASH_FUNCS)
 def get_correlation_data(ticker1_df, ticker2_symbol, main_ticker_symbol, period='1y', interval='1d'):
     try:
         ticker2_df = fetch_stock_data(ticker2_symbol, period=period, interval=interval)
@@ -2252,7 +2298,7 @@ def get_correlation_data(ticker1_df, ticker2_symbol, main_ticker_symbol, period=
         return rolling_corr.dropna(), overall_corr, None
     except Exception as e: return None, None, f"Corr. Error with {ticker2_symbol}: {e}"
 
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, hash_funcs=FRAME_HASH_FUNCS)
 def calculate_historical_performance_and_cagr(df_hist, initial_investment=1000):
     if df_hist.empty or len(df_hist) < 2 or 'Close' not in df_hist.columns: return None, None, None, "Not enough hist. data."
     start_price, end_price = df_hist['Close'].iloc[0], df_hist['Close'].iloc[-1]
@@ -2282,7 +2328,7 @@ def calculate_max_drawdown(df):
         start_date = df.index[0]
     return max_drawdown, start_date, end_date
 
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, hash_funcs=FRAME_HASH_FUNCS)
 def calculate_sharpe_ratio(returns, risk_free_rate):
     """Calculates the Sharpe ratio."""
     if returns is None or returns.empty or len(returns) < 2:
@@ -2315,7 +2361,7 @@ def calculate_sortino_ratio(returns, risk_free_rate):
     sortino_ratio = (expected_return - target_return) / downside_std * np.sqrt(252)
     return sortino_ratio
 
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, hash_funcs=FRAME_HASH_FUNCS)
 def calculate_beta(stock_returns, index_returns):
     """Calculates the beta of a stock against an index."""
     if stock_returns is None or index_returns is None or len(stock_returns) < 2 or len(index_returns) < 2:
@@ -2450,11 +2496,100 @@ def calculate_max_drawdown(df):
         start_date = df.index[0]
     return max_drawdown, start_date, end_date
 
+# --- DEFERRED TAB DATA ---
+# Loaders for the expensive stock_bundle fields; each runs only when a tab first reads its field.
+def load_news_and_sentiment(ticker_symbol, company_name):
+    """Aggregate news for a stock and score it, returning every news field the tabs read.
+
+    Sessions opening the same stock at the same time share one aggregation
+    instead of each fanning out to every news source.
+    """
+    return single_flight(("news", ticker_symbol, company_name), lambda: _aggregate_and_score_news(ticker_symbol, company_name))
+
+def _aggregate_and_score_news(ticker_symbol, company_name):
+    overall_news_sentiment_score = 0.0
+    overall_news_sentiment_stats = {"label": "Neutral", "score": 0.0, "positive_count": 0, "negative_count": 0, "neutral_count": 0, "total_articles":0, "source": "N/A"}
+    
+    # Aggregate from all sources concurrently instead of short-circuiting
+    news_results = aggregate_stock_news(ticker_symbol, company_name)
+    news_items_api, news_error_message_api = news_results['newsapi']
+    scraped_gnews_items, scraped_gnews_error = news_results['google']
+    scraped_yfinance_items, scraped_yfinance_error = news_results['yahoo']
+    processed_news_for_sentiment = news_results['all']
+    # Start resolving card thumbnails now so they're likely cached by the time the News tab renders
+    prefetch_thumbnails([item.get('link') for item in processed_news_for_sentiment if not item.get('image_url')])
+
+    if processed_news_for_sentiment:
+        compound_scores = []
+        # Score every headline in one batch; ones seen before (by any user or ticker) come from the store
+        vader_sentiment_results = score_texts_vader([
+            ((item_content.get('title') or "") + " " + (item_content.get('description') or "")).strip()
+            for item_content in processed_news_for_sentiment
+        ])
+        for item_idx, vader_sentiment_result in enumerate(vader_sentiment_results):
+            processed_news_for_sentiment[item_idx]["vader_sentiment"] = vader_sentiment_result
+            compound_scores.append(vader_sentiment_result['compound'])
+            if vader_sentiment_result['label'] == "POSITIVE": overall_news_sentiment_stats["positive_count"] += 1
+            elif vader_sentiment_result['label'] == "NEGATIVE": overall_news_sentiment_stats["negative_count"] += 1
+            else: overall_news_sentiment_stats["neutral_count"] += 1
+        overall_news_sentiment_stats["total_articles"] = len(compound_scores)
+        if compound_scores:
+            overall_news_sentiment_score = sum(compound_scores) / len(compound_scores)
+            overall_news_sentiment_stats["score"] = round(overall_news_sentiment_score, 3)
+            if overall_news_sentiment_score >= 0.05: overall_news_sentiment_stats["label"] = "Positive"
+            elif overall_news_sentiment_score <= -0.05: overall_news_sentiment_stats["label"] = "Negative"
+    
+    if not NEWS_API_KEY: news_error_message_api = "NewsAPI key not configured. Using web scrapers."
+    return {
+        'news_items_api': news_items_api, 'news_error_message_api': news_error_message_api,
+        'scraped_gnews_items': scraped_gnews_items, 'scraped_gnews_error': scraped_gnews_error,
+        'scraped_yfinance_items': scraped_yfinance_items, 'scraped_yfinance_error': scraped_yfinance_error,
+        'processed_news_for_sentiment': processed_news_for_sentiment,
+        'overall_news_sentiment_score': overall_news_sentiment_score,
+        'overall_news_sentiment_stats': overall_news_sentiment_stats,
+    }
+
+def load_historical_cagr(ticker_symbol, period, df):
+    """CAGR over ~5 years, fetching a longer history only when the selected period is shorter"""
+    df_5y_for_calc = df
+    if period not in ["5y", "max"] and (not df.empty and (df.index[-1] - df.index[0]).days / 365.25 < 4.9):
+        try: df_5y_for_calc_temp = fetch_stock_data(ticker_symbol, period="5y"); df_5y_for_calc = df_5y_for_calc_temp if not df_5y_for_calc_temp.empty else df_5y_for_calc
+        except: pass
+    _, _, hist_cagr, _ = calculate_historical_performance_and_cagr(df_5y_for_calc)
+    return hist_cagr
+
+def load_market_index_data(index_symbol, period, market_info):
+    """Fetch the market index history, trying alternative index symbols if the primary one is empty.
+
+    Returns:
+        tuple: (index DataFrame, alternative symbol used or None)
+    """
+    index_df = fetch_stock_data(index_symbol, period=period)
+    if index_df.empty:
+        # Try alternative index symbols
+        alt_indices = {
+            "Indian": ["^NSEI", "NIFTY.NS", "^BSESN"],
+            "US": ["^GSPC", "^DJI", "^IXIC"]
+        }
+        for alt_index in alt_indices.get(market_info.get("market", "US"), []):
+            try:
+                alt_df = fetch_stock_data(alt_index, period=period)
+                if not alt_df.empty:
+                    return alt_df, alt_index
+            except:
+                continue
+    return index_df, None
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def get_earnings_dates(ticker_symbol):
+    acquire(YAHOO)
+    return yf.Ticker(ticker_symbol).earnings_dates
+
 # --- MAIN APP LOGIC ---
 if ticker:
     try:
         with st.spinner("🔄 Initializing..."):
-            stock_info_main = yf.Ticker(ticker).info
+            stock_info_main = get_info(ticker)
             if not stock_info_main or stock_info_main.get('regularMarketPrice') is None:
                 st.error(f"Essential data for **{ticker}** unavailable. Check the ticker or try again later.")
                 st.stop()
@@ -2534,14 +2669,7 @@ if ticker:
     company_name_for_news_search = stock_info_main.get('shortName', ticker)
 
     with st.spinner(f"Summoning insights for {ticker}... This might take a moment."):
-        df = fetch_stock_data(ticker, selected_period)
-        if df.empty: st.error(f"No historical data for {ticker} ({selected_label})."); st.stop()
-        
-        df_ta = add_technical_indicators(df.copy()) 
-
-        (about_info, sector, industry, mcap_val, exch_val, s_info_full, fin_df, earn_df,
-         analyst_recs, analyst_price_target_data, company_officers) = get_about_stock_info(ticker)
-        
+        # df, df_ta and the get_about_stock_info results were already loaded above; don't refetch them here
         if not s_info_full and stock_info_main: s_info_full = stock_info_main 
         if s_info_full and s_info_full.get('currency') and s_info_full.get('currency') != stock_currency_code : 
             stock_currency_code = s_info_full.get('currency', stock_currency_code)
@@ -2564,72 +2692,6 @@ if ticker:
         if s_info_full and s_info_full.get('shortName') and company_name_for_news_search == ticker :
             company_name_for_news_search = s_info_full.get('shortName', ticker)
 
-        news_items_api, news_error_message_api, scraped_gnews_items, scraped_gnews_error, scraped_yfinance_items, scraped_yfinance_error = [], None, [], None, [], None
-        processed_news_for_sentiment = []
-        overall_news_sentiment_score = 0.0
-        overall_news_sentiment_stats = {"label": "Neutral", "score": 0.0, "positive_count": 0, "negative_count": 0, "neutral_count": 0, "total_articles":0, "source": "N/A"}
-        
-        # Aggregate from all sources instead of short-circuiting
-        if NEWS_API_KEY:
-            news_items_api, news_error_message_api = get_stock_news_from_newsapi(company_name_for_news_search)
-        scraped_gnews_items, scraped_gnews_error = scrape_google_news(company_name_for_news_search)
-        scraped_yfinance_items, scraped_yfinance_error = scrape_yahoo_finance_news(ticker)
-        curated_items, curated_err = get_curated_publisher_news(company_name_for_news_search)
-        # Global Google News RSS for broader fallback (company name and ticker)
-        rss_global_by_name, _ = fetch_google_news_rss(company_name_for_news_search + " stock", site_domain=None, max_items=8)
-        rss_global_by_ticker, _ = fetch_google_news_rss(ticker + " stock", site_domain=None, max_items=6)
-        # India-focused RSS (useful for NSE/BSE tickers)
-        rss_india_by_name, _ = fetch_google_news_rss(company_name_for_news_search + " stock", site_domain=None, max_items=8, hl="en-IN", gl="IN", ceid="IN:en")
-        rss_india_by_ticker, _ = fetch_google_news_rss(ticker + " stock", site_domain=None, max_items=6, hl="en-IN", gl="IN", ceid="IN:en")
-
-        aggregated_candidates = []
-        for bucket in [news_items_api or [], scraped_gnews_items or [], scraped_yfinance_items or [], curated_items or [], rss_global_by_name or [], rss_global_by_ticker or [], rss_india_by_name or [], rss_india_by_ticker or []]:
-            aggregated_candidates.extend(bucket)
-        # Deduplicate by link/url
-        seen_links = set()
-        for item in aggregated_candidates:
-            link_val = item.get('link') or item.get('url')
-            if not link_val or link_val in seen_links:
-                continue
-            seen_links.add(link_val)
-            processed_news_for_sentiment.append(item)
-        # Cap total to reasonable number
-        processed_news_for_sentiment = processed_news_for_sentiment[:20]
-
-        if processed_news_for_sentiment:
-            compound_scores = []
-            for item_idx, item_content in enumerate(processed_news_for_sentiment):
-                text_for_sentiment = (item_content.get('title') or "") + " " + (item_content.get('description') or "")
-                vader_sentiment_result = analyze_news_item_sentiment_vader(text_for_sentiment.strip())
-                processed_news_for_sentiment[item_idx]["vader_sentiment"] = vader_sentiment_result
-                compound_scores.append(vader_sentiment_result['compound'])
-                if vader_sentiment_result['label'] == "POSITIVE": overall_news_sentiment_stats["positive_count"] += 1
-                elif vader_sentiment_result['label'] == "NEGATIVE": overall_news_sentiment_stats["negative_count"] += 1
-                else: overall_news_sentiment_stats["neutral_count"] += 1
-            overall_news_sentiment_stats["total_articles"] = len(compound_scores)
-            if compound_scores:
-                overall_news_sentiment_score = sum(compound_scores) / len(compound_scores)
-                overall_news_sentiment_stats["score"] = round(overall_news_sentiment_score, 3)
-                if overall_news_sentiment_score >= 0.05: overall_news_sentiment_stats["label"] = "Positive"
-                elif overall_news_sentiment_score <= -0.05: overall_news_sentiment_stats["label"] = "Negative"
-        
-        if not NEWS_API_KEY: news_error_message_api = "NewsAPI key not configured. Using web scrapers."
-
-        signal, signal_reason = generate_signal(df_ta.copy(), overall_news_sentiment_score, company_name_for_signal)
-
-        volatility_percent, risk_level, risk_explanation_text = assess_volatility_and_risk(df.copy(), window=60)
-        hist_vol_series = get_historical_volatility_data(df.copy(), window=30)
-        df_5y_for_calc = df
-        if selected_period not in ["5y", "max"] and (not df.empty and (df.index[-1] - df.index[0]).days / 365.25 < 4.9):
-            try: df_5y_for_calc_temp = fetch_stock_data(ticker, period="5y"); df_5y_for_calc = df_5y_for_calc_temp if not df_5y_for_calc_temp.empty else df_5y_for_calc
-            except: pass
-        hist_initial_investment, hist_final_value, hist_cagr, hist_perf_error = calculate_historical_performance_and_cagr(df_5y_for_calc)
-
-    # Scrape images for the company
-    company_images, images_error = [], None
-    if s_info_full:
-        company_images, images_error = scrape_company_images(s_info_full.get('shortName', ticker))
-
     # --- MAIN PAGE HEADER WITH CLOCK ---
     # Create a header with title and compact clock
     header_col1, header_col2 = st.columns([4, 1])
@@ -2735,8 +2797,54 @@ if ticker:
 
     current_currency_symbol = s_info_full.get('currency_symbol', stock_currency_symbol) if s_info_full else stock_currency_symbol
 
+    # Everything the tabs read. Each tab is an st.fragment that renders from this bundle alone, so a
+    # widget inside a tab reruns just that tab (against the bundle of the last full run) instead of
+    # the whole script. The slow fields are deferred until a tab first reads them and memoized for
+    # the session, so the Overview paints without waiting on scrapers.
+    stock_bundle = LazyBundle({
+        'current_currency_symbol': current_currency_symbol,
+        'current_price': current_price,
+        'df': df,
+        'df_ta': df_ta,
+        'fifty_two_week_high': fifty_two_week_high,
+        'fifty_two_week_low': fifty_two_week_low,
+        'stock_currency_code': stock_currency_code,
+        'today_change': today_change,
+        'today_change_percent': today_change_percent,
+        'volume_today': volume_today,
+        'earn_df': earn_df,
+        'fin_df': fin_df,
+        's_info_full': s_info_full,
+        'market_info': market_info,
+    }, memo=session_memo((ticker, selected_period, selected_market)))
+    stock_bundle.defer_fields(
+        ['news_items_api', 'news_error_message_api', 'scraped_gnews_items', 'scraped_gnews_error',
+         'scraped_yfinance_items', 'scraped_yfinance_error', 'processed_news_for_sentiment',
+         'overall_news_sentiment_score', 'overall_news_sentiment_stats'],
+        lambda: load_news_and_sentiment(ticker, company_name_for_news_search)
+    )
+    stock_bundle.defer_fields(
+        ['signal', 'signal_reason'],
+        lambda: dict(zip(['signal', 'signal_reason'], generate_signal(df_ta.copy(), stock_bundle['overall_news_sentiment_score'], company_name_for_signal)))
+    )
+    stock_bundle.defer_fields(
+        ['volatility_percent', 'risk_level', 'risk_explanation_text'],
+        lambda: dict(zip(['volatility_percent', 'risk_level', 'risk_explanation_text'], assess_volatility_and_risk(df.copy(), window=60)))
+    )
+    stock_bundle.defer('hist_cagr', lambda: load_historical_cagr(ticker, selected_period, df))
+    stock_bundle.defer_fields(
+        ['company_images', 'images_error'],
+        lambda: dict(zip(['company_images', 'images_error'], scrape_company_images(s_info_full.get('shortName', ticker)) if s_info_full else ([], None)))
+    )
+    stock_bundle.defer('index_data', lambda: load_market_index_data(market_index, selected_period, market_info))
+    stock_bundle.defer('earnings_dates', lambda: get_earnings_dates(ticker))
+
     # --- TAB 0: Overview ---
-    with tabs[0]: 
+    @st.fragment
+    def render_overview_tab(bundle):
+        current_currency_symbol, current_price, df, df_ta = bundle['current_currency_symbol'], bundle['current_price'], bundle['df'], bundle['df_ta']
+        fifty_two_week_high, fifty_two_week_low, stock_currency_code, today_change = bundle['fifty_two_week_high'], bundle['fifty_two_week_low'], bundle['stock_currency_code'], bundle['today_change']
+        today_change_percent, volume_today = bundle['today_change_percent'], bundle['volume_today']
         c1, c2, c3, c4 = st.columns(4)
 
         with c1:
@@ -2804,13 +2912,13 @@ if ticker:
             fig.add_trace(go.Bar(x=df_ta.index,y=df_ta['MACD_hist'],name='MACD Hist.',marker_color=np.where(df_ta['MACD_hist']>0,'#39ff14','#c0392b'), yaxis="y3", opacity=0.6))
         if show_earnings_dates_cb:
             try:
-                earnings_data = yf.Ticker(ticker).earnings_dates
+                earnings_data = bundle['earnings_dates']
                 if earnings_data is not None and not earnings_data.empty:
                     min_c_date, max_c_date = df_ta.index.min(), df_ta.index.max()
-                    if not isinstance(earnings_data.index, pd.DatetimeIndex): earnings_data.index = pd.to_datetime(earnings_data.index, errors='coerce').dropna()
+                    if not isinstance(earnings_data.index, pd.DatetimeIndex): earnings_data = earnings_data.copy(); earnings_data.index = pd.to_datetime(earnings_data.index, errors='coerce').dropna()
                     relevant_e_dates = earnings_data[(earnings_data.index >= min_c_date) & (earnings_data.index <= max_c_date)]
                     for date_val in relevant_e_dates.index: fig.add_vline(x=date_val, line_width=1, line_dash="longdash", line_color="rgba(200,200,200,0.6)", annotation_text="E", annotation_position="bottom right", annotation_font_size=10, annotation_font_color="rgba(200,200,200,0.9)")
-            except Exception as e: st.sidebar.caption(f"Earnings dates error: {e}")
+            except Exception as e: st.caption(f"Earnings dates error: {e}")
         if current_price and not df_ta.empty: fig.add_annotation(x=df_ta.index[-1],y=current_price,text=f"Current: {current_currency_symbol}{current_price:.2f}",showarrow=True,arrowhead=2,ax=0,ay=-40,font=dict(color="#FFF",size=12,family="Poppins"),bgcolor="rgba(57,255,20,0.7)",bordercolor="#0a0a0a",borderwidth=1,borderpad=4,opacity=0.9)
         
         fig.update_layout(transition={'duration': 300}) 
@@ -2876,8 +2984,13 @@ if ticker:
         else:
             st.info("Not enough data or relevant columns to display in the table.")
 
+    with tabs[0]:
+        render_overview_tab(stock_bundle)
+
     # --- TAB 1: Key Fundamentals ---
-    with tabs[1]: 
+    @st.fragment
+    def render_financials_tab(bundle):
+        current_currency_symbol, earn_df, fin_df, s_info_full = bundle['current_currency_symbol'], bundle['earn_df'], bundle['fin_df'], bundle['s_info_full']
         st.markdown(f"### 📊 Key Fundamentals for {s_info_full.get('shortName', ticker)}")
         # ... (Content from your existing Fundamentals tab, including fig_r, fig_n, fig_e updates with transition)
         def fmt_f_fundamentals(v,t, cur_sym="$"): 
@@ -2937,8 +3050,14 @@ if ticker:
                 st.markdown("---");_render_metric_box("<p><b>Fundamental Analysis:</b> ... <i>Always verify with official filings.</i></p>")
             except Exception as e:st.error(f"Error processing fundamentals for {ticker}: {e}")
 
+    with tabs[1]:
+        render_financials_tab(stock_bundle)
+
     # --- TAB 2: News ---
-    with tabs[2]: 
+    @st.fragment
+    def render_news_tab(bundle):
+        news_error_message_api, news_items_api, processed_news_for_sentiment, s_info_full = bundle['news_error_message_api'], bundle['news_items_api'], bundle['processed_news_for_sentiment'], bundle['s_info_full']
+        scraped_gnews_error, scraped_gnews_items, scraped_yfinance_error, scraped_yfinance_items = bundle['scraped_gnews_error'], bundle['scraped_gnews_items'], bundle['scraped_yfinance_error'], bundle['scraped_yfinance_items']
         st.markdown("### 📰 News Analysis & Sentiment")
 
         # Build tabs including an All Sources view as fallback
@@ -2972,29 +3091,13 @@ if ticker:
                         publisher = news_item.get('publisher', 'N/A')
                         published_time = news_item.get('published', 'N/A')
                         
-                        # Enhanced image handling with multiple fallbacks
+                        # Render immediately: use a cached og:image if one has been resolved,
+                        # otherwise a placeholder while thumbnail_utils resolves it in the background
                         image_url = news_item.get('image_url')
                         if not image_url or not image_url.startswith('http'):
-                            # Try to get company logo as fallback
-                            if s_info_full and s_info_full.get('logo_url'):
-                                image_url = s_info_full.get('logo_url')
-                            else:
-                                # Try to get company logo from Yahoo Finance
-                                try:
-                                    yahoo_logo_url = f"https://s.yimg.com/aq/autoc?query={ticker}&region=US&lang=en-US"
-                                    response = requests.get(yahoo_logo_url, timeout=2)
-                                    if response.status_code == 200:
-                                        data = response.json()
-                                        if data.get('ResultSet', {}).get('Result'):
-                                            result = data['ResultSet']['Result'][0]
-                                            if result.get('symbol') == ticker and result.get('logourl'):
-                                                image_url = result['logourl']
-                                except:
-                                    pass
-                                
-                                # Use default company icon as last resort
-                                if not image_url or not image_url.startswith('http'):
-                                    image_url = DEFAULT_COMPANY_ICON_PATH
+                            image_url = get_thumbnail(link)
+                        if not image_url:
+                            image_url = s_info_full.get('logo_url') if s_info_full and s_info_full.get('logo_url') else DEFAULT_COMPANY_ICON_PATH
 
                         # Add error handling for image loading with multiple fallbacks
                         st.markdown(f"""
@@ -3021,9 +3124,15 @@ if ticker:
                         </div>
                         """, unsafe_allow_html=True)
                     st.markdown('</div>', unsafe_allow_html=True)
+
+    with tabs[2]:
+        render_news_tab(stock_bundle)
             
     # --- TAB 3: Performance ---
-    with tabs[3]:
+    @st.fragment
+    def render_performance_tab(bundle):
+        current_currency_symbol, df, hist_cagr, market_info = bundle['current_currency_symbol'], bundle['df'], bundle['hist_cagr'], bundle['market_info']
+        s_info_full, volatility_percent = bundle['s_info_full'], bundle['volatility_percent']
         st.markdown("### 📈 Performance & Simulation")
         
         # Create tabs within Performance tab
@@ -3037,21 +3146,9 @@ if ticker:
             index_df = None
             with st.spinner(f"Loading market index data for {market_index}..."):
                 try:
-                    index_df = fetch_stock_data(market_index, period=selected_period)
-                    if index_df.empty:
-                        # Try alternative index symbols
-                        alt_indices = {
-                            "Indian": ["^NSEI", "NIFTY.NS", "^BSESN"],
-                            "US": ["^GSPC", "^DJI", "^IXIC"]
-                        }
-                        for alt_index in alt_indices.get(market_info.get("market", "US"), []):
-                            try:
-                                index_df = fetch_stock_data(alt_index, period=selected_period)
-                                if not index_df.empty:
-                                    st.info(f"Using alternative index {alt_index} for comparison.")
-                                    break
-                            except:
-                                continue
+                    index_df, alt_index_used = bundle['index_data']
+                    if alt_index_used:
+                        st.info(f"Using alternative index {alt_index_used} for comparison.")
                 except Exception as e:
                     st.warning(f"Could not fetch market index data: {str(e)}")
 
@@ -3063,8 +3160,8 @@ if ticker:
                 stock_returns = df['Close'].pct_change().dropna()
                 cagr_stock = hist_cagr
                 risk_free_rate = market_info.get("risk_free_rate", 0.03)
-                sharpe_stock = calculate_sharpe_ratio(stock_returns, risk_free_rate)
-                sortino_stock = calculate_sortino_ratio(stock_returns, risk_free_rate)
+                stock_risk = risk_report(stock_returns.to_frame('stock'), risk_free_rate=risk_free_rate).loc['stock']
+                sharpe_stock, sortino_stock = risk_metric(stock_risk['sharpe']), risk_metric(stock_risk['sortino'])
                 
                 # Display metrics
                 col1, col2, col3 = st.columns(3)
@@ -3087,17 +3184,14 @@ if ticker:
                 _, _, cagr_index, _ = calculate_historical_performance_and_cagr(index_df)
                 
                 risk_free_rate = market_info.get("risk_free_rate", 0.03)
-                
-                sharpe_stock = calculate_sharpe_ratio(combined_returns['stock'], risk_free_rate)
-                sharpe_index = calculate_sharpe_ratio(combined_returns['index'], risk_free_rate)
 
-                sortino_stock = calculate_sortino_ratio(combined_returns['stock'], risk_free_rate)
-                sortino_index = calculate_sortino_ratio(combined_returns['index'], risk_free_rate)
-
-                beta_stock = calculate_beta(combined_returns['stock'], combined_returns['index'])
-                
-                max_drawdown_stock, _, _ = calculate_max_drawdown(df)
-                max_drawdown_index, _, _ = calculate_max_drawdown(index_df)
+                # Stock and index risk metrics in one vectorised pass, each over its own bars
+                perf_closes = pd.concat([df['Close'].rename('stock'), index_df['Close'].rename('index')], axis=1)
+                perf_risk = risk_report(returns_from_closes(perf_closes), benchmark='index', risk_free_rate=risk_free_rate)
+                sharpe_stock, sharpe_index = risk_metric(perf_risk.loc['stock', 'sharpe']), risk_metric(perf_risk.loc['index', 'sharpe'])
+                sortino_stock, sortino_index = risk_metric(perf_risk.loc['stock', 'sortino']), risk_metric(perf_risk.loc['index', 'sortino'])
+                beta_stock = risk_metric(perf_risk.loc['stock', 'beta'])
+                max_drawdown_stock, max_drawdown_index = risk_metric(perf_risk.loc['stock', 'max_drawdown']), risk_metric(perf_risk.loc['index', 'max_drawdown'])
 
                 # Convert CAGR to a decimal for Calmar calculation
                 calmar_stock = calculate_calmar_ratio(cagr_stock / 100 if cagr_stock else None, max_drawdown_stock)
@@ -3138,7 +3232,7 @@ if ticker:
                     st.metric("Max Drawdown (Stock)", f"{max_drawdown_stock*100:.2f}%" if max_drawdown_stock is not None else "N/A", help="The largest peak-to-trough decline in investment value.")
                     st.metric("Beta vs. Index", f"{beta_stock:.2f}" if beta_stock is not None else "N/A", help="Measures the stock's volatility relative to the index. >1 is more volatile, <1 is less volatile.")
                 with perf_col6:
-                    vol_index, _, _ = assess_volatility_and_risk(index_df)
+                    vol_index = risk_metric(perf_risk.loc['index', 'recent_volatility'])
                     st.metric("Volatility (Index)", f"{vol_index:.2f}%" if vol_index is not None else "N/A")
                     st.metric("Max Drawdown (Index)", f"{max_drawdown_index*100:.2f}%" if max_drawdown_index is not None else "N/A")
 
@@ -3225,6 +3319,9 @@ if ticker:
             with sim_cols1[1]:
                 sim_years = st.slider("Simulation Years", 1, 40, 10, key="sim_years")
                 reinvest_dividends = st.checkbox("Reinvest Dividends", value=True, key="sim_reinvest")
+                num_simulations = st.select_slider("Number of Simulations", options=[500, 1000, 5000, 10000, 50000, 100000], value=10000, key="sim_num_paths")
+                sim_seed_input = st.number_input("Random Seed (0 = random)", min_value=0, value=0, step=1, key="sim_seed", help="Use a fixed seed to reproduce a run.")
+                sim_seed = int(sim_seed_input) or None
             
             # Market Parameters
             st.markdown("""
@@ -3263,24 +3360,13 @@ if ticker:
             # Generate and display simulations
             if st.button("🚀 Run Monte Carlo Simulation", use_container_width=True, key="run_sim_btn"):
                 with st.spinner("Running thousands of simulations... this may take a moment."):
-                    # Generate multiple scenarios
-                    num_simulations = 500
-                    scenarios = []
-                    for _ in range(num_simulations):
-                        dates = pd.date_range(start=pd.Timestamp.now(), periods=sim_years*12, freq='M')
-                        values = [initial_investment_sim]
-                        current_value = initial_investment_sim
-                        
-                        for _ in range(1, len(dates)):
-                            monthly_growth = np.random.normal(sim_growth/12, sim_volatility/np.sqrt(12))
-                            current_value *= (1 + monthly_growth)
-                            current_value += monthly_contribution
-                            if reinvest_dividends and dividend_yield > 0:
-                                current_value *= (1 + dividend_yield/12)
-                            values.append(max(0, current_value)) # Ensure value doesn't go below zero
-                        scenarios.append(pd.Series(values, index=dates))
-                    
-                    final_values = [s.iloc[-1] for s in scenarios]
+                    sim_result = run_monte_carlo(
+                        initial_investment_sim, monthly_contribution, sim_years, sim_growth, sim_volatility,
+                        dividend_yield=dividend_yield, reinvest_dividends=reinvest_dividends,
+                        num_simulations=num_simulations, seed=sim_seed
+                    )
+                    final_values = sim_result["final_values"]
+                    sim_dates = sim_result["dates"]
                     
                     # --- Display Simulation Results ---
                     st.markdown("---")
@@ -3294,29 +3380,29 @@ if ticker:
                     """, unsafe_allow_html=True)
                     fig_sim = go.Figure()
                     colors = px.colors.qualitative.Plotly
-                    for i, scenario in enumerate(scenarios[:5]): # Plot first 5 as examples
+                    for i, scenario in enumerate(sim_result["sample_paths"]): # Plot first 5 as examples
                         fig_sim.add_trace(go.Scatter(
-                            x=scenario.index, y=scenario.values, name=f'Scenario {i+1}',
+                            x=sim_dates, y=scenario, name=f'Scenario {i+1}',
                             line=dict(color=colors[i], width=1.5, dash='dot'),
                             opacity=0.7
                         ))
                     
                     # Add median and percentile bounds
-                    percentile_25 = pd.concat(scenarios, axis=1).quantile(0.25, axis=1)
-                    percentile_50 = pd.concat(scenarios, axis=1).quantile(0.50, axis=1) # Median
-                    percentile_75 = pd.concat(scenarios, axis=1).quantile(0.75, axis=1)
+                    percentile_25 = sim_result["percentiles"][25]
+                    percentile_50 = sim_result["percentiles"][50] # Median
+                    percentile_75 = sim_result["percentiles"][75]
                     
                     fig_sim.add_trace(go.Scatter(
-                        x=percentile_25.index, y=percentile_25.values,
+                        x=sim_dates, y=percentile_25,
                         fill=None, line=dict(color='rgba(255,255,255,0.3)', width=1, dash='dash'), showlegend=False
                     ))
                     fig_sim.add_trace(go.Scatter(
-                        x=percentile_75.index, y=percentile_75.values,
+                        x=sim_dates, y=percentile_75,
                         fill='tonexty', fillcolor='rgba(0, 191, 255, 0.2)',
                         line=dict(color='rgba(255,255,255,0.3)', width=1, dash='dash'), name='25-75th Percentile'
                     ))
                     fig_sim.add_trace(go.Scatter(
-                        x=percentile_50.index, y=percentile_50.values, name='Median Outcome',
+                        x=sim_dates, y=percentile_50, name='Median Outcome',
                         line=dict(color='#00bfff', width=3)
                     ))
 
@@ -3385,8 +3471,14 @@ if ticker:
                             unsafe_allow_html=True
                         )
 
+    with tabs[3]:
+        render_performance_tab(stock_bundle)
+
     # --- TAB 4: Chat ---
-    with tabs[4]:  # Index 4 for Chat
+    @st.fragment
+    def render_chat_tab(bundle):
+        current_currency_symbol, current_price, df_ta, overall_news_sentiment_stats = bundle['current_currency_symbol'], bundle['current_price'], bundle['df_ta'], bundle['overall_news_sentiment_stats']
+        processed_news_for_sentiment, s_info_full, signal, signal_reason = bundle['processed_news_for_sentiment'], bundle['s_info_full'], bundle['signal'], bundle['signal_reason']
         st.markdown(f"""
             <div class="animated-card">
                 <h3 class="glow-text">💬 Chat with StockSeer about {s_info_full.get('shortName', ticker)}</h3>
@@ -3421,11 +3513,8 @@ if ticker:
             st.session_state.chat_history = [{'role': 'assistant', 'content': f"Hi! I'm ready to answer your questions about {s_info_full.get('shortName', ticker)}. What's on your mind?"}]
             st.session_state.current_ticker_for_chat = ticker
         
-        # Display chat history first
-        for message in st.session_state.chat_history:
-            avatar_icon = "👤" if message['role'] == 'user' else "🤖"
-            with st.chat_message(message['role'], avatar=avatar_icon):
-                st.markdown(message['content'])
+        # Chat history goes above the input but is drawn last, once any new query has been answered
+        chat_history_container = st.container()
 
         # Determine the source of the query
         final_user_query = None
@@ -3458,16 +3547,28 @@ if ticker:
             
             # Add bot response to history
             st.session_state.chat_history.append({'role': 'assistant', 'content': response})
-            # Rerun to display the new messages immediately
-            st.rerun()
 
         # Clear chat button
-        if st.button("Clear Chat History", key="clear_chat", use_container_width=True):
+        def clear_chat_history():
             st.session_state.chat_history = [{'role': 'assistant', 'content': f"Chat history cleared. How can I help you with {s_info_full.get('shortName', ticker)}?"}]
-            st.rerun()
+
+        st.button("Clear Chat History", key="clear_chat", on_click=clear_chat_history, use_container_width=True)
+
+        with chat_history_container:
+            for message in st.session_state.chat_history:
+                avatar_icon = "👤" if message['role'] == 'user' else "🤖"
+                with st.chat_message(message['role'], avatar=avatar_icon):
+                    st.markdown(message['content'])
+
+    with tabs[4]:  # Index 4 for Chat
+        render_chat_tab(stock_bundle)
 
     # --- TAB 5: AI, Risk & News ---
-    with tabs[5]:
+    @st.fragment
+    def render_ai_insights_tab(bundle):
+        current_currency_symbol, current_price, df, overall_news_sentiment_stats = bundle['current_currency_symbol'], bundle['current_price'], bundle['df'], bundle['overall_news_sentiment_stats']
+        processed_news_for_sentiment, risk_explanation_text, risk_level, s_info_full = bundle['processed_news_for_sentiment'], bundle['risk_explanation_text'], bundle['risk_level'], bundle['s_info_full']
+        signal, signal_reason, volatility_percent = bundle['signal'], bundle['signal_reason'], bundle['volatility_percent']
         st.markdown("""
             <div style="text-align: center; margin-bottom: 2rem;">
                 <h1 style="
@@ -3903,7 +4004,43 @@ if ticker:
                         <p style="color: #e0e0e0; font-size: 1.1em;">{signal_reason}</p>
                     </div>
                 """, unsafe_allow_html=True)
-            
+
+            # Signal history: the same rules scored on every bar, traded at each close
+            df_ta = bundle['df_ta']
+            if df_ta is not None and not df_ta.empty and len(df_ta) >= BACKTEST_MIN_DATA_POINTS:
+                with st.expander("📜 Signal Backtest (technicals only)"):
+                    bt_col1, bt_col2 = st.columns(2)
+                    strong_only = bt_col1.checkbox("Trade only STRONG signals", key="bt_strong_only")
+                    allow_short = bt_col2.checkbox("Short on SELL signals", key="bt_allow_short")
+                    backtest = run_backtest(df_ta, entry_threshold=2 if strong_only else 1, allow_short=allow_short)
+                    bt_stats = backtest['stats']
+                    m1, m2, m3, m4, m5 = st.columns(5)
+                    m1.metric("Strategy Return", f"{bt_stats['total_return']:.1%}", f"{bt_stats['total_return'] - bt_stats['buy_hold_return']:+.1%} vs hold")
+                    m2.metric("Max Drawdown", f"{bt_stats['max_drawdown']:.1%}")
+                    m3.metric("Trades", f"{int(bt_stats['trades'])}")
+                    m4.metric("Hit Rate", f"{bt_stats['hit_rate']:.0%}" if pd.notna(bt_stats['hit_rate']) else "N/A")
+                    m5.metric("Time in Market", f"{bt_stats['exposure']:.0%}")
+                    fig_bt = go.Figure()
+                    fig_bt.add_trace(go.Scatter(x=backtest['equity'].index, y=backtest['equity'] * 10000, name="Signal Strategy", line=dict(color='#39ff14', width=2)))
+                    fig_bt.add_trace(go.Scatter(x=backtest['buy_hold'].index, y=backtest['buy_hold'] * 10000, name="Buy & Hold", line=dict(color='#00bfff', width=2, dash='dash')))
+                    fig_bt.update_layout(
+                        title=f"Growth of {current_currency_symbol}10,000 Following the Signal",
+                        template='plotly_dark', plot_bgcolor='#0e0e0e', paper_bgcolor='#0e0e0e',
+                        yaxis_title="Portfolio Value",
+                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+                    )
+                    st.plotly_chart(fig_bt, use_container_width=True)
+                    if not backtest['trades'].empty:
+                        st.dataframe(backtest['trades'].iloc[::-1].style.format({'Entry Price': '{:.2f}', 'Exit Price': '{:.2f}', 'Return': '{:.2%}'}), use_container_width=True, hide_index=True)
+                    st.caption(f"Signals are scored without news sentiment (no history of it exists) and traded at the close with {DEFAULT_COST_BPS:g} bps per side. Past signal performance does not predict future results.")
+                    if st.button("🎛️ Tune Signal Thresholds", key="bt_tune"):
+                        with st.spinner("Backtesting threshold and weight settings..."):
+                            tuning = optimize_signal_parameters(df_ta['Close'], random_parameters(num_samples=120),
+                                                                entry_threshold=2 if strong_only else 1, allow_short=allow_short)
+                        st.markdown(f"Ranked by Sharpe ratio on the first {DEFAULT_TRAIN_FRACTION:.0%} of the period; the test columns show how each setting held up on the rest. The current settings are flagged as default.")
+                        shown = pd.concat([tuning.head(10), tuning[tuning['is_default'] & (tuning['rank'] > 10)]])
+                        st.dataframe(shown, use_container_width=True, hide_index=True)
+
             # Investment Strategy
             st.markdown("#### 💡 Investment Strategy")
             
@@ -3955,8 +4092,13 @@ if ticker:
                 with market_metrics[2]:
                     st.metric("52W Range", f"{current_currency_symbol}{s_info_full.get('fiftyTwoWeekLow', 0):.2f} - {current_currency_symbol}{s_info_full.get('fiftyTwoWeekHigh', 0):.2f}" if s_info_full.get('fiftyTwoWeekLow') and s_info_full.get('fiftyTwoWeekHigh') else "N/A")
 
+    with tabs[5]:
+        render_ai_insights_tab(stock_bundle)
+
     # --- TAB 6: Life Planner ---
-    with tabs[6]:  # Index 6 for Life Planner
+    @st.fragment
+    def render_life_planner_tab(bundle):
+        current_currency_symbol = bundle['current_currency_symbol']
         st.markdown("### 🎯 Life Planner: Your Path to Financial Goals")
         st.markdown("<p style='color: #a0a0a0; margin-top: -10px;'>A personalized tool to forecast your financial future and plan for your biggest life goals.</p>", unsafe_allow_html=True)
         st.markdown("---")
@@ -4109,8 +4251,13 @@ if ticker:
                     st.error(f"An error occurred during calculation: {e}")
                     st.warning("Please check your inputs. A common issue is setting the target age equal to the current age, resulting in zero years to save.")
 
+    with tabs[6]:  # Index 6 for Life Planner
+        render_life_planner_tab(stock_bundle)
+
     # --- TAB 7: My Notes ---
-    with tabs[7]:  # Index 7 for My Notes
+    @st.fragment
+    def render_notes_tab(bundle):
+        current_currency_symbol, current_price = bundle['current_currency_symbol'], bundle['current_price']
         st.markdown("""
             <div class="animated-card">
                 <h3 class="glow-text">📝 My Notes & Analysis</h3>
@@ -4259,9 +4406,7 @@ if ticker:
                                 }
                                 st.markdown(f"Sentiment: <span style='color: {sentiment_color[note['sentiment']]}'>{note['sentiment']}</span>", unsafe_allow_html=True)
                             with col3:
-                                if st.button("🗑️", key=f"delete_{category}_{idx}"):
-                                    st.session_state.stock_notes[ticker][category].remove(note)
-                                    st.rerun()
+                                st.button("🗑️", key=f"delete_{category}_{idx}", on_click=st.session_state.stock_notes[ticker][category].remove, args=(note,))
                             
                             # Note content
                             st.markdown(f"""
@@ -4326,8 +4471,13 @@ if ticker:
                 except Exception as e:
                     st.error(f"Error importing notes: {str(e)}")
 
+    with tabs[7]:  # Index 7 for My Notes
+        render_notes_tab(stock_bundle)
+
     # --- TAB 8: About Company ---
-    with tabs[8]:  # Index 8 for About Company
+    @st.fragment
+    def render_about_company_tab(bundle):
+        current_currency_symbol, images_error = bundle['current_currency_symbol'], bundle['images_error']
         about_info, sector, industry, mcap_val, exch_val, s_info_full, _, _, analyst_recs, analyst_price_target_data, company_officers = get_about_stock_info(ticker)
         
         # Prepare dynamic content for the 'About' tab
@@ -4339,7 +4489,7 @@ if ticker:
             """
         
         render_about_tab(
-            tabs[8], 
+            st.container(), 
             ticker, 
             s_info_full, 
             about_info, 
@@ -4375,8 +4525,12 @@ if ticker:
             else:
                 st.info("No company images were found.")
 
+    with tabs[8]:  # Index 8 for About Company
+        render_about_company_tab(stock_bundle)
+
     # --- TAB 9: About StockSeer.AI ---
-    with tabs[9]:  # Index 9 for About StockSeer.AI
+    @st.fragment
+    def render_about_app_tab(bundle):
         # Resolve app logo source with a safe fallback if local asset is missing
         app_logo_src = APP_LOGO_MAIN_PATH
         try:
@@ -4764,8 +4918,12 @@ if ticker:
             </div>
         """, unsafe_allow_html=True)
 
+    with tabs[9]:  # Index 9 for About StockSeer.AI
+        render_about_app_tab(stock_bundle)
+
     # --- TAB 10: Tutorial ---
-    with tabs[10]:
+    @st.fragment
+    def render_tutorial_tab(bundle):
         st.markdown("""
             <div class="animated-card">
                 <h3 class="glow-text">📚 StockSeer.AI Tutorial</h3>
@@ -4921,8 +5079,12 @@ if ticker:
         if st.button("Submit Feedback"):
             st.success("Thank you for your feedback! We'll use it to improve the tutorial.")
 
+    with tabs[10]:
+        render_tutorial_tab(stock_bundle)
+
     # --- TAB 11: Watchlist ---
-    with tabs[11]:
+    @st.fragment
+    def render_watchlist_tab(bundle):
         st.markdown("""
             <div class="animated-card">
                 <h3 class="glow-text">👀 My Watchlist</h3>
@@ -4947,31 +5109,80 @@ if ticker:
         # Display watchlist
         if st.session_state.watchlist:
             st.markdown("### Your Watchlist")
+            # One bulk price download plus concurrent name lookups instead of a serial .info per row
+            with request_priority(PRIORITY_BULK):
+                watchlist_quotes = get_batch_quotes(st.session_state.watchlist)
+                watchlist_infos = fetch_batch_info(st.session_state.watchlist, field_classes=("profile",))
             for stock in st.session_state.watchlist:
                 try:
-                    stock_info = yf.Ticker(stock).info
-                    current_price = stock_info.get('regularMarketPrice', 'N/A')
-                    prev_close = stock_info.get('regularMarketPreviousClose', 'N/A')
-                    change = ((current_price - prev_close) / prev_close * 100) if current_price != 'N/A' and prev_close != 'N/A' else 0
+                    stock_info = watchlist_infos.get(stock, {})
+                    quote = watchlist_quotes.loc[stock.upper()]
+                    watch_price = quote['price'] if pd.notna(quote['price']) else 'N/A'
+                    change = quote['change_pct'] if pd.notna(quote['change_pct']) else 0
                     
                     col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
                     with col1:
                         st.markdown(f"**{stock}** - {stock_info.get('shortName', 'N/A')}")
                     with col2:
-                        st.metric("Price", f"${current_price:.2f}" if current_price != 'N/A' else 'N/A')
+                        st.metric("Price", f"${watch_price:.2f}" if watch_price != 'N/A' else 'N/A')
                     with col3:
                         st.metric("Change", f"{change:.2f}%", delta=f"{change:.2f}%")
                     with col4:
-                        if st.button("Remove", key=f"remove_{stock}"):
-                            st.session_state.watchlist.remove(stock)
-                            st.rerun()
+                        st.button("Remove", key=f"remove_{stock}", on_click=st.session_state.watchlist.remove, args=(stock,))
                 except:
                     st.error(f"Could not fetch data for {stock}")
+
+            # Risk columns for the whole list, measured against the selected market's index
+            watch_market_info = bundle['market_info'] or {}
+            watchlist_risk = get_risk_table(st.session_state.watchlist, watch_market_info.get('index'), watch_market_info.get('risk_free_rate', 0.03))
+            if not watchlist_risk.empty:
+                st.markdown("#### Risk (1Y)")
+                st.dataframe(pd.DataFrame({
+                    'Volatility': watchlist_risk['volatility'].map('{:.1f}%'.format, na_action='ignore'),
+                    'Risk Level': watchlist_risk['risk_level'],
+                    'Sharpe': watchlist_risk['sharpe'].round(2),
+                    'Sortino': watchlist_risk['sortino'].round(2),
+                    'Max Drawdown': (watchlist_risk['max_drawdown'] * 100).map('{:.1f}%'.format, na_action='ignore'),
+                    'Beta': watchlist_risk['beta'].round(2),
+                }), use_container_width=True)
+
+            # Correlation across the list: heatmap in cluster order, so names that move together sit together
+            if len(st.session_state.watchlist) >= 2:
+                with st.expander("🔗 Correlation & Diversification"):
+                    corr_window = st.select_slider("Rolling window (trading days)", options=[20, 60, 120, 250], value=60, key="watchlist_corr_window")
+                    watchlist_returns = get_panel_returns(st.session_state.watchlist)
+                    if watchlist_returns.shape[1] < 2 or len(watchlist_returns) <= corr_window:
+                        st.info("Not enough overlapping price history to correlate these stocks.")
+                    else:
+                        corr_matrix = rolling_correlation(watchlist_returns, window=corr_window, key="watchlist")
+                        corr_clusters, cluster_order = correlation_clusters(corr_matrix)
+                        ordered_corr = corr_matrix.loc[cluster_order, cluster_order]
+                        fig_corr = go.Figure(go.Heatmap(
+                            z=ordered_corr.values, x=cluster_order, y=cluster_order, zmin=-1, zmax=1, colorscale='RdBu_r',
+                            text=np.round(ordered_corr.values, 2), texttemplate="%{text}"
+                        ))
+                        fig_corr.update_layout(
+                            title=f"{corr_window}-Day Return Correlation",
+                            template='plotly_dark', plot_bgcolor='#0e0e0e', paper_bgcolor='#0e0e0e',
+                            height=max(400, 28 * len(cluster_order))
+                        )
+                        st.plotly_chart(fig_corr, use_container_width=True)
+                        cluster_groups = corr_clusters.groupby(corr_clusters).groups
+                        correlated_groups = [", ".join(members) for members in cluster_groups.values() if len(members) > 1]
+                        if correlated_groups:
+                            st.markdown("**Move together (average correlation ≥ 0.5):** " + " · ".join(f"[{group}]" for group in correlated_groups))
+                        else:
+                            st.markdown("**Well diversified:** no group of these stocks has an average correlation of 0.5 or more.")
+                        st.dataframe(most_correlated_pairs(corr_matrix, top=10).style.format({'Correlation': '{:.2f}'}), use_container_width=True, hide_index=True)
         else:
             st.info("Your watchlist is empty. Add some stocks to track!")
 
+    with tabs[11]:
+        render_watchlist_tab(stock_bundle)
+
     # --- TAB 12: Market Screener ---
-    with tabs[12]:
+    @st.fragment
+    def render_screener_tab(bundle):
         st.markdown("""
             <div class="animated-card">
                 <h3 class="glow-text">🔍 Market Screener</h3>
@@ -4990,41 +5201,75 @@ if ticker:
             volume_min = st.number_input("Min Volume (Millions)", value=1.0)
             sector = st.selectbox("Sector", ["All", "Technology", "Healthcare", "Finance", "Consumer", "Energy", "Industrial"])
 
+        market_config = MARKET_CONFIGS[st.session_state.selected_market]
+        extra_screener_tickers = st.text_input("Additional tickers to screen (comma-separated)", value="", key="screener_extra_tickers")
+
         if st.button("Run Screener", use_container_width=True):
             with st.spinner("Scanning market..."):
-                # Get list of stocks to screen
-                stocks_to_screen = MARKET_CONFIGS[st.session_state.selected_market]["stocks"]
-                results = []
-
-                for stock in stocks_to_screen:
-                    try:
-                        info = yf.Ticker(stock).info
-                        if (info.get('marketCap', 0) >= market_cap_min * 1e6 and
-                            info.get('trailingPE', float('inf')) <= pe_max and
-                            info.get('dividendYield', 0) * 100 >= dividend_yield_min and
-                            info.get('beta', float('inf')) <= beta_max and
-                            info.get('averageVolume', 0) >= volume_min * 1e6 and
-                            (sector == "All" or info.get('sector', '') == sector)):
-                            results.append({
-                                'Ticker': stock,
-                                'Name': info.get('shortName', 'N/A'),
-                                'Price': info.get('regularMarketPrice', 'N/A'),
-                                'Market Cap': f"${info.get('marketCap', 0) / 1e6:.2f}M",
-                                'P/E': info.get('trailingPE', 'N/A'),
-                                'Dividend Yield': f"{info.get('dividendYield', 0) * 100:.2f}%",
-                                'Beta': info.get('beta', 'N/A'),
-                                'Volume': f"{info.get('averageVolume', 0) / 1e6:.2f}M"
-                            })
-                    except:
-                        continue
+                # Universe: the market's featured stocks and index large caps plus anything the user added
+                stocks_to_screen = screener_universe(market_config)
+                stocks_to_screen += [t.strip().upper() for t in extra_screener_tickers.split(",") if t.strip()]
+                fundamentals_table, fundamentals_built_at = get_fundamentals_table(stocks_to_screen)
+                matches = screen_fundamentals(
+                    fundamentals_table,
+                    market_cap_min=market_cap_min * 1e6, pe_max=pe_max,
+                    dividend_yield_min=dividend_yield_min / 100, beta_max=beta_max,
+                    volume_min=volume_min * 1e6, sector=sector
+                )
 
-                if results:
-                    st.dataframe(pd.DataFrame(results), use_container_width=True)
+                if not matches.empty:
+                    results = pd.DataFrame({
+                        'Ticker': matches.index,
+                        'Name': matches['name'].fillna('N/A').values,
+                        'Price': matches['price'].values,
+                        'Market Cap': (matches['market_cap'].fillna(0) / 1e6).map('${:.2f}M'.format).values,
+                        'P/E': matches['trailing_pe'].values,
+                        'Dividend Yield': (matches['dividend_yield'].fillna(0) * 100).map('{:.2f}%'.format).values,
+                        'Beta': matches['beta'].values,
+                        'Volume': (matches['average_volume'].fillna(0) / 1e6).map('{:.2f}M'.format).values
+                    })
+                    # Price-based risk for every match from one panel pass
+                    matches_risk = get_risk_table(matches.index, market_config.get('index'), market_config.get('risk_free_rate', 0.03))
+                    if not matches_risk.empty:
+                        matches_risk = matches_risk.reindex(matches.index.str.upper())
+                        results['Volatility (1Y)'] = matches_risk['volatility'].map('{:.1f}%'.format, na_action='ignore').values
+                        results['Sharpe'] = matches_risk['sharpe'].round(2).values
+                        results['Max Drawdown'] = (matches_risk['max_drawdown'] * 100).map('{:.1f}%'.format, na_action='ignore').values
+                    st.dataframe(results, use_container_width=True)
                 else:
                     st.info("No stocks found matching your criteria")
+                st.caption(f"Screened {len(fundamentals_table)} tickers · fundamentals as of {datetime.fromtimestamp(fundamentals_built_at).strftime('%H:%M')}")
+
+        # Today's signals: generate_signal for the whole universe from one (dates x tickers) panel
+        st.markdown("#### 📋 Today's Signals")
+        if st.button("Score Market Signals", use_container_width=True, key="market_signal_board_btn"):
+            board_tickers = screener_universe(market_config)
+            board_tickers += [t.strip().upper() for t in extra_screener_tickers.split(",") if t.strip()]
+            with st.spinner(f"Scoring {len(board_tickers)} tickers..."):
+                board = get_market_signal_board(board_tickers)
+            if board.empty:
+                st.info("No price data available for this market's tickers")
+            else:
+                signal_counts = board['Signal'].value_counts()
+                count_cols = st.columns(5)
+                for count_col, label in zip(count_cols, ["STRONG BUY", "BUY", "HOLD", "SELL", "STRONG SELL"]):
+                    count_col.metric(label, int(signal_counts.get(label, 0)))
+                st.dataframe(
+                    board.drop(columns='Signal_code').style.format({
+                        'As Of': lambda d: pd.Timestamp(d).strftime('%Y-%m-%d'), 'Close': '{:.2f}', 'Change %': '{:+.2f}%',
+                        'Return 20d %': '{:+.2f}%', 'RSI': '{:.1f}', 'MACD Hist': '{:.3f}', 'SMA 20': '{:.2f}', 'SMA 50': '{:.2f}',
+                        'BB %B': '{:.2f}', 'Volume Ratio': '{:.2f}x', 'Buy Score': '{:.1f}', 'Sell Score': '{:.1f}'
+                    }, na_rep='N/A'),
+                    use_container_width=True
+                )
+                st.caption("Technical signals only (RSI, MACD, SMA20), scored exactly as on each stock's AI Insights tab without the news component.")
+
+    with tabs[12]:
+        render_screener_tab(stock_bundle)
 
     # --- TAB 13: Alerts ---
-    with tabs[13]:
+    @st.fragment
+    def render_alerts_tab(bundle):
         st.markdown("""
             <div class="animated-card">
                 <h3 class="glow-text">⚡ Price & News Alerts</h3>
@@ -5080,8 +5325,9 @@ if ticker:
                     else:
                         st.markdown(f"Alert for {alert['condition']}")
                 with col4:
-                    if st.button("Delete", key=f"delete_alert_{i}"):
-                        st.session_state.alerts.pop(i)
-                        st.rerun()
+                    st.button("Delete", key=f"delete_alert_{i}", on_click=st.session_state.alerts.pop, args=(i,))
         else:
-            st.info("No active alerts. Create one to get started!")
\ No newline at end of file
+            st.info("No active alerts. Create one to get started!")
+
+    with tabs[13]:
+        render_alerts_tab(stock_bundle)
\ No newline at end of file
@@ -0,0 +1,281 @@
+import numpy as np
+import pandas as pd
+
+# Vectorised history of the technical signal and a backtest over it. The
+# scoring is the same rule set as generate_signal in app.py, but evaluated for
+# every bar at once with NumPy masks over (bars, tickers) arrays, so the value
+# at bar t is exactly what generate_signal would return for the frame cut at t.
+# Indicators are the ta library's formulas (rolling mean, Wilder RSI, MACD
+# 12/26/9 with adjust=False ewm), run on whole panels through pandas.
+MIN_DATA_POINTS = 35  # Bars generate_signal needs before it scores anything
+SIGNAL_LABELS = {-2: "STRONG SELL", -1: "SELL", 0: "HOLD", 1: "BUY", 2: "STRONG BUY"}
+TRADING_DAYS_PER_YEAR = 252
+DEFAULT_COST_BPS = 5.0  # Per side, as a fraction of the position traded
+SIGNAL_PARAMS = {  # generate_signal's thresholds and weights; override any subset via params=
+    "rsi_oversold": 30, "rsi_near_oversold": 40, "rsi_near_overbought": 60, "rsi_overbought": 70,
+    "rsi_strong_weight": 2.0, "rsi_weight": 1.0,
+    "macd_cross_weight": 2.0, "macd_trend_weight": 1.0, "macd_hist_weight": 0.5,
+    "sma_weight": 1.0,
+    "strong_gap": 2.5, "gap": 1.0,  # Score lead needed for STRONG BUY/SELL and BUY/SELL
+}
+
+def signal_indicators(close):
+    """SMA_20, RSI and MACD line/signal/hist for a close Series or a (dates x tickers) close DataFrame.
+
+    Values match indicator_utils/ta on the same data; leading NaNs (tickers
+    listed later than the panel start) are skipped per column.
+    """
+    diff = close.diff()
+    up = diff.where(diff > 0, 0.0)
+    down = -diff.where(diff < 0, 0.0)
+    ema_up = up.ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    ema_down = down.ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    rsi = 100 - 100 / (1 + ema_up / ema_down)
+    rsi = rsi.mask(ema_down == 0, 100.0)
+    macd_line = (close.ewm(span=12, min_periods=12, adjust=False).mean()
+                 - close.ewm(span=26, min_periods=26, adjust=False).mean())
+    macd_signal = macd_line.ewm(span=9, min_periods=9, adjust=False).mean()
+    return {
+        "SMA_20": close.rolling(20, min_periods=20).mean(),
+        "RSI": rsi,
+        "MACD_line": macd_line,
+        "MACD_signal": macd_signal,
+        "MACD_hist": macd_line - macd_signal,
+    }
+
+def _news_scores(news_sentiment_score):
+    """(buy, sell) points generate_signal gives a news sentiment score (a scalar, or one score per ticker)"""
+    score = np.asarray(news_sentiment_score, float)
+    buy = np.select([score > 0.2, score > 0.05], [1.5, 0.5], 0.0)
+    sell = np.select([score > 0.05, score < -0.2, score < -0.05], [0.0, 1.5, 0.5], 0.0)
+    return buy, sell
+
+def _shift_down(values):
+    shifted = np.full_like(values, np.nan)
+    shifted[1:] = values[:-1]
+    return shifted
+
+def score_signals(close, sma20, rsi, macd_line, macd_signal, macd_hist, news_sentiment_score=0.0, params=None):
+    """Signal code for every bar, with generate_signal's rules applied as array masks.
+
+    Inputs are same-shaped float arrays, bars along axis 0 (1-D for one
+    ticker, 2-D for a panel). News sentiment is one score applied to every
+    bar (a scalar, or one per ticker column); there is no sentiment history,
+    so pass 0.0 for technicals only.
+    params overrides entries of SIGNAL_PARAMS (the defaults reproduce
+    generate_signal).
+
+    Returns:
+        tuple: (codes, buy_score, sell_score); codes are -2..2 (keys of
+        SIGNAL_LABELS) as floats, NaN where generate_signal would say N/A
+    """
+    p = SIGNAL_PARAMS if not params else {**SIGNAL_PARAMS, **params}
+    close, sma20, rsi = np.asarray(close, float), np.asarray(sma20, float), np.asarray(rsi, float)
+    macd_line, macd_signal, macd_hist = np.asarray(macd_line, float), np.asarray(macd_signal, float), np.asarray(macd_hist, float)
+    prev_line, prev_signal = _shift_down(macd_line), _shift_down(macd_signal)
+
+    news_buy, news_sell = _news_scores(news_sentiment_score)
+    buy = np.select([rsi < p["rsi_oversold"], rsi < p["rsi_near_oversold"]], [p["rsi_strong_weight"], p["rsi_weight"]], 0.0) + news_buy
+    sell = np.select([rsi < p["rsi_near_oversold"], rsi > p["rsi_overbought"], rsi > p["rsi_near_overbought"]],
+                     [0.0, p["rsi_strong_weight"], p["rsi_weight"]], 0.0) + news_sell
+
+    above, below = macd_line > macd_signal, macd_line < macd_signal
+    cross_up = above & (prev_line <= prev_signal)
+    cross_down = below & (prev_line >= prev_signal)
+    buy += np.select([cross_up, cross_down, above], [p["macd_cross_weight"], 0.0, p["macd_trend_weight"]], 0.0)
+    sell += np.select([cross_up, cross_down, below], [0.0, p["macd_cross_weight"], p["macd_trend_weight"]], 0.0)
+    buy += np.where(macd_hist > 0, p["macd_hist_weight"], 0.0)
+    sell += np.where(macd_hist < 0, p["macd_hist_weight"], 0.0)
+    buy += np.where(close > sma20, p["sma_weight"], 0.0)
+    sell += np.where(close < sma20, p["sma_weight"], 0.0)
+
+    codes = np.select(
+        [buy > sell + p["strong_gap"], sell > buy + p["strong_gap"], buy > sell + p["gap"], sell > buy + p["gap"]],
+        [2.0, -2.0, 1.0, -1.0], 0.0
+    )
+    # generate_signal scores nothing before MIN_DATA_POINTS bars or when any input is NaN
+    bars_seen = np.cumsum(~np.isnan(close), axis=0)
+    inputs = (close, sma20, rsi, macd_line, macd_signal, macd_hist, prev_line, prev_signal)
+    unscored = (bars_seen < MIN_DATA_POINTS) | np.logical_or.reduce([np.isnan(a) for a in inputs])
+    codes[unscored] = np.nan
+    return codes, buy, sell
+
+def signal_labels(codes):
+    """Map signal codes to generate_signal's labels ("N/A" for NaN)"""
+    codes = np.asarray(codes, float)
+    labels = np.full(codes.shape, "N/A", dtype=object)
+    for code, label in SIGNAL_LABELS.items():
+        labels[codes == code] = label
+    return labels
+
+def signal_series(df, news_sentiment_score=0.0, params=None):
+    """Signal for every bar of one ticker's OHLC frame.
+
+    Reuses indicator columns already on df (add_technical_indicators output)
+    and computes any that are missing. The last row equals
+    generate_signal(df, news_sentiment_score).
+
+    Returns:
+        pd.DataFrame: Signal (label), Signal_code, Buy_score, Sell_score, indexed like df
+    """
+    close = df['Close'].astype(float)
+    indicator_cols = ('SMA_20', 'RSI', 'MACD_line', 'MACD_signal', 'MACD_hist')
+    indicators = (dict(df[list(indicator_cols)]) if all(c in df.columns for c in indicator_cols)
+                  else signal_indicators(close))
+    codes, buy, sell = score_signals(close, *(indicators[c] for c in indicator_cols),
+                                     news_sentiment_score=news_sentiment_score, params=params)
+    return pd.DataFrame({'Signal': signal_labels(codes), 'Signal_code': codes, 'Buy_score': buy, 'Sell_score': sell},
+                        index=df.index)
+
+def signal_panel(closes, news_sentiment_score=0.0, params=None):
+    """Signal codes for a (dates x tickers) close DataFrame; NaN where no signal"""
+    closes = closes.astype(float)
+    indicators = signal_indicators(closes)
+    codes, _, _ = score_signals(closes, indicators['SMA_20'], indicators['RSI'], indicators['MACD_line'],
+                                indicators['MACD_signal'], indicators['MACD_hist'], news_sentiment_score, params)
+    return pd.DataFrame(codes, index=closes.index, columns=closes.columns)
+
+def _forward_fill(values):
+    """Forward-fill NaNs down axis 0 of a 2-D array"""
+    valid = ~np.isnan(values)
+    last_valid = np.where(valid, np.arange(len(values))[:, None], 0)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+    return values[last_valid, np.arange(values.shape[1])]
+
+def signal_positions(codes, entry_threshold=1, allow_short=False):
+    """Position held after each bar's close: long from a code >= entry_threshold until a code <= -entry_threshold.
+
+    That opposite signal flattens the position, or reverses it to short
+    when allow_short is set. Codes in between (and N/A) keep the current
+    position. Works on 1-D or (bars x tickers) arrays.
+    """
+    codes = np.asarray(codes, float)
+    squeeze = codes.ndim == 1
+    codes = codes.reshape(len(codes), -1)
+    targets = np.full(codes.shape, np.nan)
+    targets[codes >= entry_threshold] = 1.0
+    targets[codes <= -entry_threshold] = -1.0 if allow_short else 0.0
+    positions = np.nan_to_num(_forward_fill(targets), nan=0.0)
+    return positions[:, 0] if squeeze else positions
+
+def backtest_signals(closes, codes, entry_threshold=1, allow_short=False, cost_bps=DEFAULT_COST_BPS):
+    """Trade a signal-code panel and return equity curves and per-ticker statistics.
+
+    A signal at bar t's close is traded at that close, so the position
+    earns bar t+1's return; cost_bps is charged on every unit of position
+    changed. Missing closes earn nothing.
+
+    Args:
+        closes (np.ndarray): Close prices, (bars x tickers) or 1-D
+        codes (np.ndarray): Signal codes from score_signals, same shape
+        entry_threshold (int): 1 trades on BUY/SELL, 2 only on STRONG signals
+        allow_short (bool): Go short on sells instead of to cash
+        cost_bps (float): Transaction cost per side in basis points
+
+    Returns:
+        dict: positions, strategy_returns, equity, buy_hold, drawdown (arrays
+        shaped like closes) and stats {name: array per ticker}
+    """
+    closes = np.asarray(closes, float)
+    squeeze = closes.ndim == 1
+    closes = closes.reshape(len(closes), -1)
+    positions = signal_positions(np.asarray(codes, float).reshape(closes.shape), entry_threshold, allow_short)
+
+    asset_returns = np.zeros_like(closes)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        asset_returns[1:] = closes[1:] / closes[:-1] - 1
+    asset_returns[~np.isfinite(asset_returns)] = 0.0
+    held = np.zeros_like(positions)
+    held[1:] = positions[:-1]
+    turnover = np.abs(np.diff(positions, axis=0, prepend=0.0))
+    strategy_returns = held * asset_returns - turnover * cost_bps / 10000
+
+    equity = np.cumprod(1 + strategy_returns, axis=0)
+    buy_hold = np.cumprod(1 + asset_returns, axis=0)
+    drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1
+
+    trades = [_trades_from_positions(closes[:, i], positions[:, i], cost_bps) for i in range(closes.shape[1])]
+    closed_returns = [t["return"][~t["open"]] for t in trades]
+    bars = np.maximum(np.sum(~np.isnan(closes), axis=0), 1)
+    years = bars / TRADING_DAYS_PER_YEAR
+    stats = {
+        "total_return": equity[-1] - 1,
+        "cagr": equity[-1] ** (1 / years) - 1,
+        "buy_hold_return": buy_hold[-1] - 1,
+        "sharpe": _annualized_sharpe(strategy_returns),
+        "max_drawdown": drawdown.min(axis=0),
+        "exposure": np.count_nonzero(held, axis=0) / bars,
+        "trades": np.array([len(t["return"]) for t in trades]),
+        "hit_rate": np.array([(r > 0).mean() if len(r) else np.nan for r in closed_returns]),
+        "avg_trade_return": np.array([r.mean() if len(r) else np.nan for r in closed_returns]),
+    }
+    result = {"positions": positions, "strategy_returns": strategy_returns, "equity": equity,
+              "buy_hold": buy_hold, "drawdown": drawdown, "stats": stats, "trades": trades}
+    if squeeze:
+        result = {key: (value[:, 0] if isinstance(value, np.ndarray) else value) for key, value in result.items()}
+        result["stats"] = {name: values[0] for name, values in stats.items()}
+        result["trades"] = trades[0]
+    return result
+
+def _annualized_sharpe(returns):
+    """Annualised mean/std of daily returns per column (NaN for a flat, never-invested column)"""
+    volatility = returns.std(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(volatility > 0, returns.mean(axis=0) / volatility * np.sqrt(TRADING_DAYS_PER_YEAR), np.nan)
+
+def _trades_from_positions(closes, positions, cost_bps):
+    """Entry/exit bar, direction and net return of every run of constant non-zero position"""
+    changes = np.flatnonzero(np.diff(positions, prepend=0.0))
+    starts = changes[positions[changes] != 0]
+    # A run ends at the next change after its start, or is still open at the last bar
+    ends = np.append(changes, len(positions) - 1)[np.searchsorted(changes, starts, side="right")]
+    is_open = positions[ends] == positions[starts]
+    direction = positions[starts]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gross = direction * (closes[ends] / closes[starts] - 1)
+    costs = np.where(is_open, 1, 2) * cost_bps / 10000
+    return {"entry": starts, "exit": ends, "direction": direction, "return": gross - costs, "open": is_open}
+
+def run_backtest(df, news_sentiment_score=0.0, entry_threshold=1, allow_short=False, cost_bps=DEFAULT_COST_BPS, params=None):
+    """Signal history and backtest for one ticker's OHLC frame.
+
+    Returns:
+        dict: signals (DataFrame from signal_series), equity, buy_hold,
+        drawdown and position (Series on df's index), trades (DataFrame),
+        stats (dict of floats)
+    """
+    signals = signal_series(df, news_sentiment_score, params)
+    result = backtest_signals(df['Close'].to_numpy(float), signals['Signal_code'].to_numpy(),
+                              entry_threshold, allow_short, cost_bps)
+    trades = result["trades"]
+    index = df.index
+    trade_table = pd.DataFrame({
+        'Entry': index[trades["entry"]],
+        'Exit': index[trades["exit"]],
+        'Side': np.where(trades["direction"] > 0, "Long", "Short"),
+        'Entry Price': df['Close'].to_numpy(float)[trades["entry"]],
+        'Exit Price': df['Close'].to_numpy(float)[trades["exit"]],
+        'Return': trades["return"],
+        'Open': trades["open"],
+    })
+    return {
+        "signals": signals,
+        "equity": pd.Series(result["equity"], index=index, name="Strategy"),
+        "buy_hold": pd.Series(result["buy_hold"], index=index, name="Buy & Hold"),
+        "drawdown": pd.Series(result["drawdown"], index=index, name="Drawdown"),
+        "position": pd.Series(result["positions"], index=index, name="Position"),
+        "trades": trade_table,
+        "stats": {name: float(value) for name, value in result["stats"].items()},
+    }
+
+def backtest_panel(closes, news_sentiment_score=0.0, entry_threshold=1, allow_short=False, cost_bps=DEFAULT_COST_BPS, params=None):
+    """Signal history and backtest for every column of a (dates x tickers) close DataFrame at once.
+
+    Returns:
+        tuple: (stats DataFrame indexed by ticker, equity DataFrame, signal code DataFrame)
+    """
+    codes = signal_panel(closes, news_sentiment_score, params)
+    result = backtest_signals(closes.to_numpy(float), codes.to_numpy(), entry_threshold, allow_short, cost_bps)
+    stats = pd.DataFrame(result["stats"], index=closes.columns)
+    equity = pd.DataFrame(result["equity"], index=closes.index, columns=closes.columns)
+    return stats, equity, codes
@@ -0,0 +1,84 @@
+import threading
+import streamlit as st
+import pandas as pd
+import yfinance as yf
+from concurrency_utils import map_concurrently
+from rate_limit_utils import acquire, YAHOO
+from market_calendar_utils import refresh_window
+from info_cache_utils import get_info, FIELD_CLASSES
+
+# yf.download keeps its per-call results in a module-global dict, so two
+# overlapping downloads (e.g. two Streamlit sessions) can clobber each other.
+_download_lock = threading.Lock()
+BATCH_QUOTES_REFRESH_SECONDS = 300
+
+def download_batch_history(tickers, period="5d", interval="1d", actions=False):
+    """Fetch history for many tickers in a single bulk request.
+
+    Args:
+        tickers (list): Ticker symbols
+        period (str): yfinance period string
+        interval (str): yfinance bar interval
+        actions (bool): Also return Dividends and Stock Splits columns, as Ticker.history does
+
+    Returns:
+        pd.DataFrame: Frame indexed by date with (ticker, field) columns, aligned across tickers
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+    if not tickers:
+        return pd.DataFrame()
+    acquire(YAHOO, tokens=len(tickers))  # yf.download makes one request per ticker
+    with _download_lock:
+        data = yf.download(tickers, period=period, interval=interval, group_by="ticker",
+                           threads=True, progress=False, auto_adjust=True, actions=actions)
+    if data is None or data.empty:
+        return pd.DataFrame()
+    if not isinstance(data.columns, pd.MultiIndex):
+        # yfinance returns flat columns when only one ticker was requested
+        data = pd.concat({tickers[0]: data}, axis=1)
+    return data
+
+def get_ticker_frame(batch_df, ticker_symbol):
+    """Pull one ticker's OHLCV frame out of a download_batch_history result"""
+    ticker_symbol = ticker_symbol.upper()
+    if batch_df.empty or ticker_symbol not in batch_df.columns.get_level_values(0):
+        return pd.DataFrame()
+    return batch_df[ticker_symbol].dropna()
+
+def get_batch_quotes(tickers):
+    """Latest price and day change for many tickers from one bulk download.
+
+    Cached per market-session window, so quotes refresh every few minutes
+    while any of the tickers' exchanges trade and not at all once every one
+    of them has closed.
+
+    Returns:
+        pd.DataFrame: Indexed by ticker with price, previous_close and change_pct columns
+    """
+    tickers = tuple(tickers)
+    windows = tuple(refresh_window(t, BATCH_QUOTES_REFRESH_SECONDS) for t in tickers)
+    return _get_batch_quotes_cached(tickers, windows)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _get_batch_quotes_cached(tickers, refresh_windows):
+    batch_df = download_batch_history(tickers, period="5d", interval="1d")
+    rows = {}
+    for ticker_symbol in dict.fromkeys(t.upper() for t in tickers if t):
+        closes = get_ticker_frame(batch_df, ticker_symbol).get("Close", pd.Series(dtype=float)).dropna()
+        price = closes.iloc[-1] if len(closes) >= 1 else None
+        previous_close = closes.iloc[-2] if len(closes) >= 2 else None
+        change_pct = (price - previous_close) / previous_close * 100 if price is not None and previous_close else None
+        rows[ticker_symbol] = {"price": price, "previous_close": previous_close, "change_pct": change_pct}
+    return pd.DataFrame.from_dict(rows, orient="index", columns=["price", "previous_close", "change_pct"])
+
+def fetch_batch_info(tickers, max_workers=8, field_classes=FIELD_CLASSES):
+    """Fetch yfinance .info for many tickers over a bounded thread pool.
+
+    Yahoo has no bulk endpoint for profile/fundamental fields, so cache misses
+    are requested concurrently instead of one after another.
+
+    Returns:
+        dict: ticker -> info dict ({} when the lookup failed)
+    """
+    results = map_concurrently(lambda t: get_info(t, field_classes), tickers, max_workers=max_workers)
+    return {t: (info if isinstance(info, dict) else {}) for t, info in results.items()}
@@ -0,0 +1,77 @@
+import time
+import threading
+from collections.abc import Mapping
+import streamlit as st
+
+# Values that feed the main-app tabs. Cheap ones are stored directly; expensive
+# ones (news, scraped images, extra history...) are registered as deferred
+# computations that run the first time a tab reads them, so nothing slow sits
+# in front of the first tab's paint.
+STOCK_BUNDLE_MAX_AGE_SECONDS = 300  # Deferred results are reused across reruns for this long
+_SESSION_MEMO_KEY = "_stock_bundle_memo"
+
+def session_memo(cache_key, max_age_seconds=STOCK_BUNDLE_MAX_AGE_SECONDS):
+    """Return this session's memo dict for cache_key, starting a fresh one when the key changes or it ages out.
+
+    Args:
+        cache_key (hashable): Identifies what the memo holds, e.g. (ticker, period, market)
+        max_age_seconds (float): How long memoized values stay valid
+
+    Returns:
+        dict: Persisted in st.session_state between reruns
+    """
+    entry = st.session_state.get(_SESSION_MEMO_KEY)
+    if not entry or entry["key"] != cache_key or time.time() - entry["created_at"] > max_age_seconds:
+        entry = {"key": cache_key, "created_at": time.time(), "values": {}}
+        st.session_state[_SESSION_MEMO_KEY] = entry
+    return entry["values"]
+
+class LazyBundle(Mapping):
+    """Read-only mapping whose deferred entries are computed on first access and then kept.
+
+    Deferred results go into `memo` (pass a session_memo() dict to reuse them
+    across reruns). A computation that raises is not memoized, so the next
+    read tries again.
+    """
+
+    def __init__(self, values=None, memo=None):
+        self._values = dict(values or {})
+        self._memo = memo if memo is not None else {}
+        self._deferred = {}  # key -> (compute, keys it produces)
+        self._lock = threading.RLock()
+
+    def defer(self, key, compute):
+        """Register compute() as the producer of one key"""
+        self._deferred[key] = (compute, None)
+
+    def defer_fields(self, keys, compute):
+        """Register one compute() returning a dict that supplies several keys at once"""
+        keys = tuple(keys)
+        for key in keys:
+            self._deferred[key] = (compute, keys)
+
+    def is_loaded(self, key):
+        return key in self._values or key in self._memo
+
+    def __getitem__(self, key):
+        if key in self._values:
+            return self._values[key]
+        with self._lock:
+            if key in self._memo:
+                return self._memo[key]
+            if key not in self._deferred:
+                raise KeyError(key)
+            compute, keys = self._deferred[key]
+            result = compute()
+            if keys is None:
+                self._memo[key] = result
+            else:
+                for field in keys:
+                    self._memo[field] = result[field]
+            return self._memo[key]
+
+    def __iter__(self):
+        return iter(dict.fromkeys([*self._values, *self._deferred]))
+
+    def __len__(self):
+        return len(set(self._values) | set(self._deferred))
@@ -0,0 +1,184 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import threading
+import time
+import contextvars
+import copy
+
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:  # Older/newer streamlit layouts, or running outside streamlit
+    add_script_run_ctx, get_script_run_ctx = None, None
+
+DEFAULT_MAX_WORKERS = 8
+TIMEOUT_POLL_SECONDS = 0.25  # How often running calls are checked against their timeout
+
+_flights = {}  # single_flight key -> _Flight currently running
+_flights_lock = threading.Lock()
+
+class _Flight:
+    """One in-progress single_flight call that followers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+def _with_script_ctx(fn):
+    """Wrap fn so worker threads inherit the caller's Streamlit script context and context variables.
+
+    Without it, st.cache_data / st.error calls made from pool threads log
+    'missing ScriptRunContext' warnings and can't reach the session, and the
+    caller's request priority (rate_limit_utils) would fall back to the default.
+    """
+    ctx = get_script_run_ctx() if get_script_run_ctx else None
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+def map_concurrently(fn, items, max_workers=DEFAULT_MAX_WORKERS):
+    """Call fn on every item using a bounded thread pool.
+
+    Args:
+        fn (callable): Function taking a single item
+        items (iterable): Items to process
+        max_workers (int): Upper bound on simultaneous calls
+
+    Returns:
+        dict: item -> result, or item -> exception if that call raised
+    """
+    items = list(dict.fromkeys(items))
+    if not items:
+        return {}
+    results = {}
+    worker = _with_script_ctx(fn)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        futures = {pool.submit(worker, item): item for item in items}
+        for future, item in futures.items():
+            try:
+                results[item] = future.result()
+            except Exception as e:
+                results[item] = e
+    return results
+
+def gather_with_deadline(tasks, deadline_seconds, max_workers=DEFAULT_MAX_WORKERS):
+    """Run named zero-argument callables concurrently under one overall deadline.
+
+    Calls still running when the deadline passes are left to finish in the
+    background (so their cached results help the next render) but are not
+    waited for.
+
+    Args:
+        tasks (dict): name -> callable
+        deadline_seconds (float): Total time budget for the whole batch
+        max_workers (int): Upper bound on simultaneous calls
+
+    Returns:
+        tuple: (results dict of name -> result for calls that finished, list of names that did not)
+    """
+    if not tasks:
+        return {}, []
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(tasks)))
+    futures = {pool.submit(_with_script_ctx(fn)): name for name, fn in tasks.items()}
+    done, _ = wait(futures, timeout=deadline_seconds)
+    pool.shutdown(wait=False, cancel_futures=True)
+    results, pending = {}, []
+    for future, name in futures.items():
+        if future in done and future.exception() is None:
+            results[name] = future.result()
+        else:
+            pending.append(name)
+    return results, pending
+
+def iter_completed(fn, items, max_workers=DEFAULT_MAX_WORKERS, timeout_seconds=None):
+    """Call fn on every item using a bounded thread pool, yielding results as they finish.
+
+    Results arrive in completion order, so the caller can update progress from
+    its own thread as each one lands. A call running longer than
+    timeout_seconds (measured from when it started, not from when it was
+    queued) is yielded as a TimeoutError and abandoned in the background.
+
+    Args:
+        fn (callable): Function taking a single item
+        items (iterable): Items to process
+        max_workers (int): Upper bound on simultaneous calls
+        timeout_seconds (float, optional): Per-call time limit
+
+    Yields:
+        tuple: (item, result), where result is the exception if that call raised or timed out
+    """
+    items = list(dict.fromkeys(items))
+    if not items:
+        return
+    worker = _with_script_ctx(fn)
+    started_at = {}
+
+    def run(item):
+        started_at[item] = time.monotonic()
+        return worker(item)
+
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(items)))
+    futures = {pool.submit(run, item): item for item in items}
+    pending = set(futures)
+    try:
+        while pending:
+            done, _ = wait(pending, timeout=TIMEOUT_POLL_SECONDS if timeout_seconds else None,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
+            if not timeout_seconds:
+                continue
+            now = time.monotonic()
+            for future in list(pending):
+                item = futures[future]
+                if not future.done() and item in started_at and now - started_at[item] > timeout_seconds:
+                    pending.discard(future)
+                    yield item, TimeoutError(f"No result after {timeout_seconds}s")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def single_flight(key, fn):
+    """Run fn() once for all concurrent callers that pass the same key.
+
+    The first caller runs fn; callers arriving while it is still running
+    wait and receive the same result (or have the same exception raised).
+    Nothing is kept once the call finishes, so this only merges overlapping
+    requests - caching stays the job of the layers underneath. Every caller,
+    leader included, gets its own deep copy of the result, so one session
+    mutating a returned DataFrame or dict can't change another's.
+
+    Args:
+        key (hashable): Identifies the upstream request, e.g. ("info", ticker)
+        fn (callable): Zero-argument function doing the actual work
+
+    Returns:
+        A deep copy of whatever fn returned
+    """
+    with _flights_lock:
+        flight = _flights.get(key)
+        is_leader = flight is None
+        if is_leader:
+            flight = _Flight()
+            _flights[key] = flight
+    if not is_leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return copy.deepcopy(flight.result)
+    try:
+        flight.result = fn()
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.done.set()
+    return copy.deepcopy(flight.result)
@@ -0,0 +1,196 @@
+import copy
+import threading
+from collections import OrderedDict, deque
+import numpy as np
+import pandas as pd
+
+# Rolling N x N correlation for a watchlist or market universe. The engine
+# keeps, for every pair, the windowed count, sums, sums of squares and cross
+# products of returns over the bars both members traded, so a new bar (and
+# the one leaving the window) updates the whole matrix with a few O(N^2)
+# outer products instead of recomputing the window. State is kept between
+# calls per universe, like indicator_utils: bars already seen are not fed
+# again, and the latest (possibly still forming) bar is always replayed.
+DEFAULT_CORRELATION_WINDOW = 60
+RESYNC_INTERVAL = 2048  # Updates between exact re-summations of the window, bounding add/subtract drift
+MAX_CACHED_UNIVERSES = 16
+DEFAULT_CLUSTER_CORRELATION = 0.5  # Names whose average correlation is at least this share a cluster
+
+class RollingCorrelation:
+    """Pairwise-complete rolling correlation matrix over the last `window` return vectors"""
+
+    def __init__(self, size, window=DEFAULT_CORRELATION_WINDOW, min_periods=None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.rows = deque()
+        self.count = np.zeros((size, size))
+        self.sum_x = np.zeros((size, size))  # sum_x[i, j]: sum of i's returns on bars where i and j both traded
+        self.sum_xx = np.zeros((size, size))
+        self.sum_xy = np.zeros((size, size))
+        self.updates_since_resync = 0
+
+    def _accumulate(self, rows, sign):
+        """Add (sign=1) or remove (sign=-1) a (bars x size) block of rows from the window sums"""
+        valid = ~np.isnan(rows)
+        x = np.where(valid, rows, 0.0)
+        present = valid.astype(float)
+        self.count += sign * (present.T @ present)
+        self.sum_x += sign * (x.T @ present)
+        self.sum_xx += sign * ((x * x).T @ present)
+        self.sum_xy += sign * (x.T @ x)
+
+    def extend(self, rows):
+        """Feed a (bars x size) block of returns; only the last `window` bars are summed"""
+        rows = np.asarray(rows, float)
+        if len(rows) >= self.window:
+            self.rows = deque(rows[-self.window:])
+            self._resync()
+            return
+        for row in rows:
+            self.update(row)
+
+    def update(self, row):
+        """Feed the next bar's returns (NaN for a name that didn't trade)"""
+        row = np.asarray(row, float)
+        if len(self.rows) == self.window:
+            self._accumulate(self.rows.popleft()[None, :], -1)
+        self.rows.append(row)
+        self._accumulate(row[None, :], 1)
+        self.updates_since_resync += 1
+        if self.updates_since_resync >= RESYNC_INTERVAL:
+            self._resync()
+
+    def _resync(self):
+        for matrix in (self.count, self.sum_x, self.sum_xx, self.sum_xy):
+            matrix[:] = 0.0
+        if self.rows:
+            self._accumulate(np.array(self.rows), 1)
+        self.updates_since_resync = 0
+
+    def matrix(self):
+        """Current correlation matrix; NaN for pairs with fewer than min_periods shared bars or no variance"""
+        n, sum_x = self.count, self.sum_x
+        with np.errstate(divide="ignore", invalid="ignore"):
+            covariance = n * self.sum_xy - sum_x * sum_x.T
+            variance = n * self.sum_xx - sum_x * sum_x
+            corr = covariance / np.sqrt(variance * variance.T)
+        corr[(n < self.min_periods) | (variance <= 0) | (variance.T <= 0)] = np.nan
+        return np.clip(corr, -1.0, 1.0)
+
+class _UniverseState:
+    """Engine snapshot taken before the last bar of a returns panel"""
+
+    def __init__(self, engine, last_timestamp):
+        self.engine = engine
+        self.last_timestamp = last_timestamp
+
+_universe_states = OrderedDict()
+_universe_states_lock = threading.Lock()
+
+def _resume_point(state, index, values):
+    """Row of these returns after the cached snapshot's last bar, or 0 if the snapshot can't be reused.
+
+    The bar is looked up by timestamp, since a period-sliced panel's start
+    moves forward and rows drop off the front. The snapshot's window must
+    still match the new rows ending at that bar; back-adjusted prices
+    rewrite history and fail the check.
+    """
+    if state.last_timestamp is None:
+        return 0
+    position = index.searchsorted(state.last_timestamp)
+    if position >= len(index) or index[position] != state.last_timestamp:
+        return 0
+    window_rows = np.array(state.engine.rows)
+    first = position + 1 - len(window_rows)
+    # A snapshot holding less than a full window must also start where the new rows start
+    if first < 0 or (len(window_rows) < state.engine.window and first > 0) or not np.array_equal(values[first:position + 1], window_rows.reshape(-1, values.shape[1]), equal_nan=True):
+        return 0
+    return position + 1
+
+def rolling_correlation(returns, window=DEFAULT_CORRELATION_WINDOW, min_periods=None, key=None):
+    """Latest rolling correlation matrix of a (dates x tickers) returns panel.
+
+    With a key (e.g. "watchlist"), the engine is kept between calls for the
+    same tickers and window, so a rerun with one more bar costs one O(N^2)
+    update rather than a pass over the window.
+
+    Args:
+        returns (pd.DataFrame): Returns, dates x tickers (see risk_utils.returns_from_closes)
+        window (int): Bars in the rolling window
+        min_periods (int, optional): Shared bars a pair needs; defaults to window,
+            as in pandas' rolling corr
+        key (hashable, optional): Identifies the universe across calls
+
+    Returns:
+        pd.DataFrame: tickers x tickers correlations (NaN where undefined)
+    """
+    values = returns.to_numpy(float)
+    columns = returns.columns
+    engine, start = RollingCorrelation(len(columns), window, min_periods), 0
+    state_key = (key, tuple(columns), window, min_periods) if key is not None else None
+    if state_key is not None:
+        with _universe_states_lock:
+            state = _universe_states.get(state_key)
+        resume_at = _resume_point(state, returns.index, values) if state is not None else 0
+        if resume_at:
+            engine, start = copy.deepcopy(state.engine), resume_at
+
+    if len(values) > start:
+        engine.extend(values[start:-1])
+        if state_key is not None:
+            new_state = _UniverseState(copy.deepcopy(engine), returns.index[-2] if len(values) > 1 else None)
+            with _universe_states_lock:
+                _universe_states[state_key] = new_state
+                _universe_states.move_to_end(state_key)
+                while len(_universe_states) > MAX_CACHED_UNIVERSES:
+                    _universe_states.popitem(last=False)
+        engine.update(values[-1])
+    return pd.DataFrame(engine.matrix(), index=columns, columns=columns)
+
+def rolling_correlation_with(returns, ticker_symbol, window=DEFAULT_CORRELATION_WINDOW):
+    """Rolling correlation history of one ticker against every column, dates x tickers"""
+    return returns.rolling(window, min_periods=window).corr(returns[ticker_symbol])
+
+def correlation_clusters(corr, min_correlation=DEFAULT_CLUSTER_CORRELATION):
+    """Group tickers by average-linkage hierarchical clustering on correlation distance.
+
+    Distance is 1 - correlation (undefined pairs count as uncorrelated).
+    Merging stops once the closest clusters' average correlation falls
+    below min_correlation.
+
+    Returns:
+        tuple: (pd.Series ticker -> cluster number, 1 = largest; list of
+        tickers in dendrogram order, which puts correlated names next to
+        each other for a heatmap)
+    """
+    tickers = list(corr.index)
+    distance = 1 - np.nan_to_num(corr.to_numpy(float), nan=0.0)
+    np.fill_diagonal(distance, np.inf)
+    members = [[i] for i in range(len(tickers))]
+    active = list(range(len(tickers)))
+    labels_at_cut = None
+    while len(active) > 1:
+        sub = distance[np.ix_(active, active)]
+        a, b = np.unravel_index(np.argmin(sub), sub.shape)
+        i, j = active[a], active[b]
+        if labels_at_cut is None and 1 - distance[i, j] < min_correlation:
+            labels_at_cut = [list(members[k]) for k in active]
+        # Lance-Williams update for average linkage: size-weighted mean of the two rows
+        size_i, size_j = len(members[i]), len(members[j])
+        merged = (size_i * distance[i] + size_j * distance[j]) / (size_i + size_j)
+        distance[i], distance[:, i] = merged, merged
+        distance[i, i] = np.inf
+        members[i] = members[i] + members[j]
+        active.remove(j)
+    order = [tickers[k] for k in members[active[0]]] if active else []
+    groups = labels_at_cut if labels_at_cut is not None else [members[k] for k in active]
+    groups = sorted(groups, key=len, reverse=True)
+    labels = pd.Series({tickers[k]: number for number, group in enumerate(groups, start=1) for k in group}, name="cluster")
+    return labels.reindex(tickers), order
+
+def most_correlated_pairs(corr, top=10):
+    """The `top` most correlated distinct pairs, as a DataFrame of Ticker A, Ticker B, Correlation"""
+    values = corr.to_numpy(float)
+    rows, cols = np.triu_indices(len(values), k=1)
+    pairs = pd.DataFrame({"Ticker A": corr.index[rows], "Ticker B": corr.columns[cols], "Correlation": values[rows, cols]})
+    return pairs.dropna().sort_values("Correlation", ascending=False).head(top).reset_index(drop=True)
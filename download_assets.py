@@ -1,7 +1,7 @@
 import os
-import requests
 from PIL import Image
 from io import BytesIO
+from http_utils import http_get
 
 ASSETS_DIR = "assets"
 if not os.path.exists(ASSETS_DIR):
@@ -20,7 +20,7 @@ ASSETS = {
 
 def download_and_save_asset(url, filename):
     try:
-        response = requests.get(url)
+        response = http_get(url)
         response.raise_for_status()
         
         filepath = os.path.join(ASSETS_DIR, filename)
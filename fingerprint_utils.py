@@ -0,0 +1,45 @@
+import pickle
+import numpy as np
+import pandas as pd
+
+# Cheap cache keys for DataFrame/Series arguments. Frames from the bar store
+# carry a version stamp (ticker, interval, store revision) in df.attrs, and
+# pandas copies attrs onto frames derived from them (slices, copies, added
+# columns, pct_change...). For stamped frames the cache key is that stamp plus
+# shape, labels, index endpoints and a handful of evenly spaced rows, instead
+# of hashing every cell the way st.cache_data does by default. Stamped frames
+# are treated as immutable: edit a copy, not a frame already passed to a cache.
+FRAME_VERSION_ATTR = "frame_version"
+FINGERPRINT_SAMPLE_ROWS = 64
+
+def stamp_frame_version(df, ticker_symbol, interval, revision):
+    """Record in df.attrs which stored series (and which revision of it) a frame came from; returns df"""
+    df.attrs[FRAME_VERSION_ATTR] = (ticker_symbol.upper(), interval, revision)
+    return df
+
+def _content_hash(obj):
+    try:
+        return pd.util.hash_pandas_object(obj, index=True).values.tobytes()
+    except TypeError:  # Unhashable cells (lists, dicts)
+        return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+def frame_fingerprint(obj):
+    """Cache key for a DataFrame or Series; use via hash_funcs=FRAME_HASH_FUNCS on st.cache_data.
+
+    Unstamped objects fall back to a full content hash, so passing one is
+    never less safe than Streamlit's default hashing.
+    """
+    if isinstance(obj, pd.DataFrame):
+        labels = (tuple(map(str, obj.columns)), tuple(map(str, obj.dtypes)))
+    else:
+        labels = (str(obj.name), str(obj.dtype))
+    version = obj.attrs.get(FRAME_VERSION_ATTR)
+    if version is None:
+        return (type(obj).__name__, obj.shape, labels, _content_hash(obj))
+
+    row_count = len(obj)
+    endpoints = (obj.index[0], obj.index[-1]) if row_count else ()
+    positions = np.unique(np.linspace(0, row_count - 1, FINGERPRINT_SAMPLE_ROWS).astype(int)) if row_count else []
+    return (type(obj).__name__, version, obj.shape, labels, endpoints, _content_hash(obj.iloc[positions]))
+
+FRAME_HASH_FUNCS = {pd.DataFrame: frame_fingerprint, pd.Series: frame_fingerprint}
@@ -0,0 +1,118 @@
+import random
+import threading
+from urllib.parse import urlsplit
+import feedparser
+import requests
+from rate_limit_utils import acquire, upstream_for_url
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# One pooled HTTP client for every scraper and API call. Connections are kept
+# alive per host, so repeat requests to Google News, Yahoo, NewsAPI, etc. skip
+# the TCP+TLS handshake. (requests speaks HTTP/1.1 only; keep-alive is where
+# the handshake savings come from.)
+DEFAULT_TIMEOUT_SECONDS = 10
+POOL_CONNECTIONS = 32  # Distinct hosts kept in the pool
+POOL_MAXSIZE = 8  # Open connections kept per host
+MAX_CONCURRENT_PER_HOST = 6
+RETRY_TOTAL = 2
+RETRY_BACKOFF_SECONDS = 0.3
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+MAX_RETRY_AFTER_SECONDS = DEFAULT_TIMEOUT_SECONDS  # Longest Retry-After honoured; the wait holds a host slot on the render path
+
+class _JitteredRetry(Retry):
+    """urllib3 Retry whose exponential backoff is spread by up to +/-50% so clients don't retry in lockstep,
+    and whose Retry-After waits are capped at MAX_RETRY_AFTER_SECONDS"""
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        return backoff * random.uniform(0.5, 1.5) if backoff else backoff
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return min(retry_after, MAX_RETRY_AFTER_SECONDS) if retry_after is not None else None
+
+_session = None
+_session_lock = threading.Lock()
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+def get_session():
+    """Return the process-wide requests.Session (created on first use)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = _JitteredRetry(
+                total=RETRY_TOTAL, connect=RETRY_TOTAL, read=RETRY_TOTAL, status=RETRY_TOTAL,
+                backoff_factor=RETRY_BACKOFF_SECONDS, status_forcelist=RETRY_STATUS_CODES,
+                allowed_methods=frozenset(["GET", "HEAD"]), respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+def _host_semaphore(url):
+    host = urlsplit(url).netloc.lower()
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(MAX_CONCURRENT_PER_HOST)
+        return _host_semaphores[host]
+
+def http_request(method, url, timeout=DEFAULT_TIMEOUT_SECONDS, **kwargs):
+    """Send a request through the shared session with a default timeout and a per-host concurrency cap.
+
+    Requests to rate-limited upstreams (Yahoo, Google) first wait for a
+    token from rate_limit_utils at the caller's request priority.
+
+    Accepts the same keyword arguments as requests.request and raises the same
+    requests exceptions, so call sites only swap `requests.get` for `http_get`.
+    A stream=True response keeps its host slot until it is closed, so use it
+    as a context manager.
+    """
+    acquire(upstream_for_url(url))
+    semaphore = _host_semaphore(url)
+    semaphore.acquire()
+    try:
+        response = get_session().request(method, url, timeout=timeout, **kwargs)
+    except BaseException:
+        semaphore.release()
+        raise
+    if not kwargs.get("stream"):
+        semaphore.release()
+        return response
+    close, released = response.close, threading.Event()
+
+    def close_and_release():
+        try:
+            close()
+        finally:
+            if not released.is_set():
+                released.set()
+                semaphore.release()
+    response.close = close_and_release
+    return response
+
+def http_get(url, **kwargs):
+    return http_request("GET", url, **kwargs)
+
+def http_head(url, **kwargs):
+    kwargs.setdefault("allow_redirects", False)  # Same default as requests.head
+    return http_request("HEAD", url, **kwargs)
+
+def parse_feed(url, fetch=None, **kwargs):
+    """Fetch an RSS/Atom feed over the shared session and parse it with feedparser.
+
+    feedparser.parse(url) would open its own un-pooled urllib connection with
+    no timeout; on a network error this returns an empty, bozo feed instead.
+    Pass fetch=cached_get (response_cache_utils) to go through the response cache.
+    """
+    try:
+        response = (fetch or http_get)(url, **kwargs)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        return feedparser.FeedParserDict(entries=[], bozo=1, bozo_exception=e)
+    return feedparser.parse(response.content, response_headers={k.lower(): v for k, v in response.headers.items()})
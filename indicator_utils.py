@@ -0,0 +1,266 @@
+import copy
+import math
+import threading
+from collections import OrderedDict, deque
+import numpy as np
+import pandas as pd
+
+# Incremental technical indicators. Each accumulator mirrors the pandas kernel
+# the `ta` library runs (rolling mean/var, ewm with adjust=False) step for step,
+# so a value produced here is bit-for-bit the one ta would produce over the
+# same frame, but a new or revised bar costs O(1) instead of a full recompute.
+INDICATOR_COLUMNS = ['SMA_20', 'BB_High', 'BB_Mid', 'BB_Low', 'SMA_50', 'RSI', 'MACD_line', 'MACD_signal', 'MACD_hist']
+MAX_CACHED_SERIES = 64  # Engines kept for reuse across reruns (one per ticker/start date)
+
+def _signbit(value):
+    return math.copysign(1.0, value) < 0
+
+class _RollingMean:
+    """Series.rolling(window, min_periods=window).mean(), one value at a time"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.nobs = 0
+        self.neg_ct = 0
+        self.sum_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.num_consecutive_same_value = 0
+        self.prev_value = math.nan
+
+    def _add(self, value):
+        if value != value:
+            return
+        self.nobs += 1
+        y = value - self.compensation_add
+        t = self.sum_x + y
+        self.compensation_add = t - self.sum_x - y
+        self.sum_x = t
+        if _signbit(value):
+            self.neg_ct += 1
+        self.num_consecutive_same_value = self.num_consecutive_same_value + 1 if value == self.prev_value else 1
+        self.prev_value = value
+
+    def _remove(self, value):
+        if value != value:
+            return
+        self.nobs -= 1
+        y = -value - self.compensation_remove
+        t = self.sum_x + y
+        self.compensation_remove = t - self.sum_x - y
+        self.sum_x = t
+        if _signbit(value):
+            self.neg_ct -= 1
+
+    def update(self, value):
+        if len(self.values) == self.window:
+            self._remove(self.values.popleft())
+        self.values.append(value)
+        self._add(value)
+        if self.nobs < self.window or self.nobs == 0:
+            return math.nan
+        if self.num_consecutive_same_value >= self.nobs:
+            return self.prev_value
+        result = self.sum_x / self.nobs
+        if self.neg_ct == 0 and result < 0:
+            return 0.0
+        if self.neg_ct == self.nobs and result > 0:
+            return 0.0
+        return result
+
+class _RollingStd:
+    """Series.rolling(window, min_periods=window).std(ddof=0), one value at a time (Welford)"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.nobs = 0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.num_consecutive_same_value = 0
+        self.prev_value = math.nan
+
+    def _add(self, value):
+        if value != value:
+            return
+        self.num_consecutive_same_value = self.num_consecutive_same_value + 1 if value == self.prev_value else 1
+        self.prev_value = value
+        self.nobs += 1
+        prev_mean = self.mean_x - self.compensation_add
+        y = value - self.compensation_add
+        t = y - self.mean_x
+        self.compensation_add = t + self.mean_x - y
+        self.mean_x += t / self.nobs
+        self.ssqdm_x += (value - prev_mean) * (value - self.mean_x)
+
+    def _remove(self, value):
+        if value != value:
+            return
+        self.nobs -= 1
+        if self.nobs:
+            prev_mean = self.mean_x - self.compensation_remove
+            y = value - self.compensation_remove
+            t = y - self.mean_x
+            self.compensation_remove = t + self.mean_x - y
+            self.mean_x -= t / self.nobs
+            self.ssqdm_x -= (value - prev_mean) * (value - self.mean_x)
+        else:
+            self.mean_x = 0.0
+            self.ssqdm_x = 0.0
+
+    def update(self, value):
+        if len(self.values) == self.window:
+            self._remove(self.values.popleft())
+        self.values.append(value)
+        self._add(value)
+        if self.nobs < self.window or self.nobs == 0:
+            return math.nan
+        if self.nobs == 1 or self.num_consecutive_same_value >= self.nobs:
+            return 0.0
+        return math.sqrt(max(self.ssqdm_x / self.nobs, 0.0))
+
+class _Ewm:
+    """Series.ewm(com=com, min_periods=min_periods, adjust=False).mean(), one value at a time"""
+
+    def __init__(self, com, min_periods):
+        self.alpha = 1.0 / (1.0 + com)
+        self.old_wt_factor = 1.0 - self.alpha
+        self.min_periods = max(int(min_periods), 1)
+        self.weighted = math.nan
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    @classmethod
+    def from_span(cls, span):
+        return cls((span - 1) / 2, min_periods=span)
+
+    @classmethod
+    def from_alpha(cls, alpha, min_periods):
+        return cls((1 - alpha) / alpha, min_periods=min_periods)
+
+    def update(self, value):
+        is_observation = value == value
+        self.nobs += is_observation
+        if self.weighted == self.weighted:
+            self.old_wt *= self.old_wt_factor
+            if is_observation:
+                if self.weighted != value:
+                    self.weighted = (self.old_wt * self.weighted + self.alpha * value) / (self.old_wt + self.alpha)
+                self.old_wt = 1.0
+        elif is_observation:
+            self.weighted = value
+        return self.weighted if self.nobs >= self.min_periods else math.nan
+
+class IndicatorEngine:
+    """Rolling state for every column in INDICATOR_COLUMNS over one close series.
+
+    Matches ta.trend.sma_indicator (20/50), ta.volatility.BollingerBands(20, 2),
+    ta.momentum.rsi(14) and ta.trend.macd/macd_signal/macd_diff (12/26/9).
+    """
+
+    def __init__(self):
+        self.sma_20 = _RollingMean(20)
+        self.std_20 = _RollingStd(20)
+        self.sma_50 = _RollingMean(50)
+        self.rsi_up = _Ewm.from_alpha(1 / 14, min_periods=14)
+        self.rsi_down = _Ewm.from_alpha(1 / 14, min_periods=14)
+        self.ema_fast = _Ewm.from_span(12)
+        self.ema_slow = _Ewm.from_span(26)
+        self.ema_signal = _Ewm.from_span(9)
+        self.prev_close = math.nan
+
+    def update(self, close):
+        """Feed the next close and return the indicator values for that bar (INDICATOR_COLUMNS order)"""
+        sma_20 = self.sma_20.update(close)
+        std_20 = self.std_20.update(close)
+        sma_50 = self.sma_50.update(close)
+
+        diff = close - self.prev_close
+        self.prev_close = close
+        emaup = self.rsi_up.update(diff if diff > 0 else 0.0)
+        emadn = self.rsi_down.update(-diff if diff < 0 else -0.0)
+        rsi = 100.0 if emadn == 0 else 100 - (100 / (1 + emaup / emadn))
+
+        macd_line = self.ema_fast.update(close) - self.ema_slow.update(close)
+        macd_signal = self.ema_signal.update(macd_line)
+
+        return (sma_20, sma_20 + 2 * std_20, sma_20, sma_20 - 2 * std_20, sma_50,
+                rsi, macd_line, macd_signal, macd_line - macd_signal)
+
+class _SeriesState:
+    """Engine snapshot taken before the last bar of a series, plus the rows it produced"""
+
+    def __init__(self, engine, rows, first_close, last_timestamp, last_close):
+        self.engine = engine
+        self.rows = rows
+        self.first_close = first_close
+        self.last_timestamp = last_timestamp
+        self.last_close = last_close
+
+_series_states = OrderedDict()
+_series_states_lock = threading.Lock()
+
+def _same_value(a, b):
+    return a == b or (a != a and b != b)
+
+def _resume_point(state, index, closes):
+    """How many leading bars of a cached series can be reused for this close series (0 if none)"""
+    committed = len(state.rows)
+    if committed == 0 or committed > len(closes):
+        return 0
+    if index[committed - 1] != state.last_timestamp:
+        return 0
+    # Back-adjusted prices rewrite history, which shows up at both ends of the committed span
+    if not _same_value(closes[0], state.first_close) or not _same_value(closes[committed - 1], state.last_close):
+        return 0
+    return committed
+
+def compute_indicators(close, key=None):
+    """Compute INDICATOR_COLUMNS for a close series, reusing saved state where possible.
+
+    With a key (e.g. the ticker symbol), the engine state is kept between calls:
+    bars already seen are not recomputed, and the most recent bar - which may
+    still be forming intraday - is always replayed from the state before it.
+
+    Args:
+        close (pd.Series): Close prices in time order
+        key (hashable, optional): Identifies the series across calls
+
+    Returns:
+        pd.DataFrame: Indicator columns on the same index as close
+    """
+    closes = close.to_numpy(dtype=float)
+    index = close.index
+    if len(closes) == 0:
+        return pd.DataFrame(columns=INDICATOR_COLUMNS, index=index, dtype=float)
+
+    state_key = (key, index[0]) if key is not None else None
+    engine, rows = IndicatorEngine(), []
+    if state_key is not None:
+        with _series_states_lock:
+            state = _series_states.get(state_key)
+        if state is not None and _resume_point(state, index, closes):
+            engine, rows = copy.deepcopy(state.engine), list(state.rows)
+
+    snapshot = None
+    for position in range(len(rows), len(closes)):
+        if position == len(closes) - 1:
+            snapshot = (copy.deepcopy(engine), list(rows))
+        rows.append(engine.update(closes[position]))
+
+    if state_key is not None and snapshot is not None:
+        committed = len(snapshot[1])
+        new_state = _SeriesState(snapshot[0], snapshot[1], closes[0],
+                                 index[committed - 1] if committed else None,
+                                 closes[committed - 1] if committed else math.nan)
+        with _series_states_lock:
+            _series_states[state_key] = new_state
+            _series_states.move_to_end(state_key)
+            while len(_series_states) > MAX_CACHED_SERIES:
+                _series_states.popitem(last=False)
+
+    return pd.DataFrame(np.array(rows, dtype=float).reshape(len(rows), len(INDICATOR_COLUMNS)),
+                        index=index, columns=INDICATOR_COLUMNS)
@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import yfinance as yf
+from concurrency_utils import single_flight
+from rate_limit_utils import acquire, YAHOO
+from market_calendar_utils import next_refresh_at
+
+# Shared cache for yfinance `.info`. Fields are grouped into classes that go
+# stale at different rates; a process-local dict sits in front of a SQLite file
+# so every Streamlit server process on the machine reuses the same lookups.
+INFO_CACHE_DB_PATH = os.path.join("data_cache", "info_cache.db")
+
+QUOTE_FIELDS = {
+    "regularMarketPrice", "currentPrice", "previousClose", "regularMarketPreviousClose",
+    "open", "regularMarketOpen", "dayHigh", "dayLow", "regularMarketDayHigh", "regularMarketDayLow",
+    "volume", "regularMarketVolume", "bid", "ask", "bidSize", "askSize", "marketCap",
+    "regularMarketChange", "regularMarketChangePercent", "preMarketPrice", "postMarketPrice",
+}
+PROFILE_FIELDS = {
+    "symbol", "shortName", "longName", "longBusinessSummary", "sector", "industry", "sectorKey",
+    "industryKey", "website", "irWebsite", "address1", "city", "state", "zip", "country", "phone",
+    "fullTimeEmployees", "companyOfficers", "exchange", "quoteType", "currency", "financialCurrency",
+    "timeZoneFullName", "exchangeTimezoneName",
+}
+# Everything else (ratios, dividends, analyst targets, 52-week range...) is "fundamentals"
+FIELD_CLASS_TTL_SECONDS = {
+    "quote": 60,
+    "fundamentals": 6 * 3600,
+    "profile": 7 * 86400,
+}
+FIELD_CLASSES = tuple(FIELD_CLASS_TTL_SECONDS)
+
+_memory_cache = {}  # ticker -> {field_class: (fetched_at, fields)}
+_memory_lock = threading.Lock()
+
+def _connect():
+    os.makedirs(os.path.dirname(INFO_CACHE_DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(INFO_CACHE_DB_PATH, timeout=10)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS info_cache (
+            ticker TEXT NOT NULL,
+            field_class TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            PRIMARY KEY (ticker, field_class)
+        )
+    ''')
+    return conn
+
+def field_class(field):
+    """Return the cache class ('quote', 'profile' or 'fundamentals') a .info field belongs to"""
+    if field in QUOTE_FIELDS:
+        return "quote"
+    if field in PROFILE_FIELDS:
+        return "profile"
+    return "fundamentals"
+
+def _split_info(info):
+    classes = {name: {} for name in FIELD_CLASSES}
+    for field, value in info.items():
+        classes[field_class(field)][field] = value
+    return classes
+
+def _load_stored(ticker_symbol):
+    """Read every stored field class for a ticker from SQLite"""
+    try:
+        conn = _connect()
+        rows = conn.execute("SELECT field_class, payload, fetched_at FROM info_cache WHERE ticker = ?",
+                            (ticker_symbol,)).fetchall()
+        conn.close()
+    except sqlite3.Error:
+        return {}
+    entries = {}
+    for name, payload, fetched_at in rows:
+        try:
+            entries[name] = (fetched_at, json.loads(payload))
+        except ValueError:
+            continue
+    return entries
+
+def _store(ticker_symbol, entries):
+    with _memory_lock:
+        _memory_cache.setdefault(ticker_symbol, {}).update(entries)
+    try:
+        conn = _connect()
+        conn.executemany("INSERT OR REPLACE INTO info_cache (ticker, field_class, payload, fetched_at) VALUES (?, ?, ?, ?)",
+                         [(ticker_symbol, name, json.dumps(fields, default=str), fetched_at)
+                          for name, (fetched_at, fields) in entries.items()])
+        conn.commit()
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+def _is_fresh(ticker_symbol, name, fetched_at, now):
+    if name == "quote":
+        # Quotes don't move while the exchange is shut, so they stay fresh until the next open
+        return now < next_refresh_at(ticker_symbol, fetched_at, FIELD_CLASS_TTL_SECONDS[name])
+    return now - fetched_at <= FIELD_CLASS_TTL_SECONDS[name]
+
+def _all_fresh(ticker_symbol, entries, field_classes, now):
+    return all(name in entries and _is_fresh(ticker_symbol, name, entries[name][0], now) for name in field_classes)
+
+def _merge(entries, field_classes):
+    merged = {}
+    for name in field_classes:
+        merged.update(entries.get(name, (0, {}))[1])
+    return merged
+
+def _fetch_and_store(ticker_symbol):
+    """Fetch the full .info payload and store every field class; {} if Yahoo returned nothing"""
+    acquire(YAHOO)
+    info = yf.Ticker(ticker_symbol).info
+    if not info:
+        return {}
+    fetched_at = time.time()
+    fresh_entries = {name: (fetched_at, fields) for name, fields in _split_info(info).items()}
+    _store(ticker_symbol, fresh_entries)
+    return fresh_entries
+
+def get_info(ticker_symbol, field_classes=FIELD_CLASSES):
+    """Cached replacement for yf.Ticker(ticker_symbol).info.
+
+    Only the requested field classes need to be fresh; when one is stale the
+    whole .info payload is fetched once and every class is refreshed. If that
+    fetch fails, stale cached fields are served rather than nothing.
+
+    Args:
+        ticker_symbol (str): Stock ticker symbol
+        field_classes (tuple): Any of 'quote', 'fundamentals', 'profile'
+
+    Returns:
+        dict: The requested .info fields ({} if Yahoo returned nothing)
+    """
+    ticker_symbol = ticker_symbol.upper()
+    now = time.time()
+    with _memory_lock:
+        entries = dict(_memory_cache.get(ticker_symbol, {}))
+    if _all_fresh(ticker_symbol, entries, field_classes, now):
+        return _merge(entries, field_classes)
+
+    # Another server process may have refreshed it already
+    entries.update({name: entry for name, entry in _load_stored(ticker_symbol).items()
+                    if name not in entries or entry[0] > entries[name][0]})
+    if _all_fresh(ticker_symbol, entries, field_classes, now):
+        with _memory_lock:
+            _memory_cache[ticker_symbol] = entries
+        return _merge(entries, field_classes)
+
+    try:
+        # Sessions missing on the same ticker at once share a single .info request
+        fresh_entries = single_flight(("info", ticker_symbol), lambda: _fetch_and_store(ticker_symbol))
+    except Exception:
+        if all(name in entries for name in field_classes):
+            return _merge(entries, field_classes)
+        raise
+    if not fresh_entries:
+        return _merge(entries, field_classes)
+    return _merge(fresh_entries, field_classes)
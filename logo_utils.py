@@ -1,6 +1,6 @@
-import requests
 from urllib.parse import urlparse
 import os
+from http_utils import http_get, http_head
 
 # Constants
 DEFAULT_COMPANY_ICON_PATH = "assets/default_company_icon.png"
@@ -42,14 +42,14 @@ def get_company_logo_url(ticker, company_name=None, website=None):
             if domain:
                 clearbit_url = f"{CLEARBIT_LOGO_API}/{domain}"
                 # Check if logo exists
-                response = requests.head(clearbit_url)
+                response = http_head(clearbit_url)
                 if response.status_code == 200:
                     return clearbit_url
 
         # Try Yahoo Finance logo (as backup)
         yahoo_logo_url = f"https://s.yimg.com/aq/autoc?query={ticker}&region=US&lang=en-US"
         try:
-            response = requests.get(yahoo_logo_url, timeout=2)
+            response = http_get(yahoo_logo_url, timeout=2)
             if response.status_code == 200:
                 data = response.json()
                 if data.get('ResultSet', {}).get('Result'):
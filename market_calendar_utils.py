@@ -0,0 +1,167 @@
+import time
+import threading
+from datetime import timedelta
+from functools import lru_cache
+import pandas as pd
+
+# Exchange sessions for cache expiry. Price data only changes while its market
+# is trading, so anything fetched after a session has closed (and Yahoo has
+# settled the final bar) stays valid until the next open; during a session
+# the caller's short refresh interval applies. Holidays and early closes come
+# from the optional `exchange_calendars` package when it is installed;
+# without it, weekends and regular hours are still honoured.
+WEEKDAYS = (0, 1, 2, 3, 4)
+SUNDAY_TO_THURSDAY = (6, 0, 1, 2, 3)
+CLOSE_SETTLE_SECONDS = 1800  # Yahoo can revise the last bar for a while after the close
+SESSION_SEARCH_DAYS = 10  # Longest stretch without a session we expect (holiday weeks)
+
+EXCHANGE_HOURS = {  # Ticker suffix -> (timezone, open, close, trading weekdays, exchange_calendars code)
+    "": ("America/New_York", "09:30", "16:00", WEEKDAYS, "XNYS"),
+    ".NS": ("Asia/Kolkata", "09:15", "15:30", WEEKDAYS, "XBOM"),
+    ".BO": ("Asia/Kolkata", "09:15", "15:30", WEEKDAYS, "XBOM"),
+    ".SS": ("Asia/Shanghai", "09:30", "15:00", WEEKDAYS, "XSHG"),
+    ".SZ": ("Asia/Shanghai", "09:30", "15:00", WEEKDAYS, "XSHG"),
+    ".AS": ("Europe/Amsterdam", "09:00", "17:30", WEEKDAYS, "XAMS"),
+    ".AE": ("Asia/Dubai", "10:00", "15:00", WEEKDAYS, None),
+    ".SR": ("Asia/Riyadh", "10:00", "15:00", SUNDAY_TO_THURSDAY, None),
+    ".QA": ("Asia/Qatar", "09:30", "13:15", SUNDAY_TO_THURSDAY, None),
+    ".L": ("Europe/London", "08:00", "16:30", WEEKDAYS, "XLON"),
+    ".T": ("Asia/Tokyo", "09:00", "15:30", WEEKDAYS, "XTKS"),
+    ".DE": ("Europe/Berlin", "09:00", "17:30", WEEKDAYS, "XETR"),
+    ".AX": ("Australia/Sydney", "10:00", "16:00", WEEKDAYS, "XASX"),
+    ".TO": ("America/Toronto", "09:30", "16:00", WEEKDAYS, "XTSE"),
+    ".KS": ("Asia/Seoul", "09:00", "15:30", WEEKDAYS, "XKRX"),
+    ".SA": ("America/Sao_Paulo", "10:00", "18:00", WEEKDAYS, "BVMF"),
+    ".TA": ("Asia/Jerusalem", "09:59", "17:25", WEEKDAYS, "XTAE"),
+    ".NZ": ("Pacific/Auckland", "10:00", "16:45", WEEKDAYS, "XNZE"),
+    ".JO": ("Africa/Johannesburg", "09:00", "17:00", WEEKDAYS, "XJSE"),
+    ".IR": ("Europe/Dublin", "08:00", "16:30", WEEKDAYS, "XDUB"),
+    ".PA": ("Europe/Paris", "09:00", "17:30", WEEKDAYS, "XPAR"),
+    ".MI": ("Europe/Rome", "09:00", "17:30", WEEKDAYS, "XMIL"),
+    ".MC": ("Europe/Madrid", "09:00", "17:30", WEEKDAYS, "XMAD"),
+    ".SI": ("Asia/Singapore", "09:00", "17:00", WEEKDAYS, "XSES"),
+    ".HK": ("Asia/Hong_Kong", "09:30", "16:00", WEEKDAYS, "XHKG"),
+    ".SW": ("Europe/Zurich", "09:00", "17:30", WEEKDAYS, "XSWX"),
+    ".BR": ("Europe/Brussels", "09:00", "17:30", WEEKDAYS, "XBRU"),
+    ".LS": ("Europe/Lisbon", "08:00", "16:30", WEEKDAYS, "XLIS"),
+    ".CO": ("Europe/Copenhagen", "09:00", "17:00", WEEKDAYS, "XCSE"),
+    ".OL": ("Europe/Oslo", "09:00", "16:20", WEEKDAYS, "XOSL"),
+    ".ST": ("Europe/Stockholm", "09:00", "17:30", WEEKDAYS, "XSTO"),
+    ".HE": ("Europe/Helsinki", "10:00", "18:30", WEEKDAYS, "XHEL"),
+    ".VI": ("Europe/Vienna", "09:00", "17:30", WEEKDAYS, "XWBO"),
+    ".MX": ("America/Mexico_City", "08:30", "15:00", WEEKDAYS, "XMEX"),
+}
+INDEX_EXCHANGES = {  # Index symbol -> ticker suffix of the market it follows
+    "^GSPC": "", "^DJI": "", "^IXIC": "", "^BSESN": ".NS", "^NSEI": ".NS", "000001.SS": ".SS",
+    "^AEX": ".AS", "^ADI": ".AE", "^TASI": ".SR", "^QSI": ".QA", "^FTSE": ".L", "^N225": ".T",
+    "^GDAXI": ".DE", "^AXJO": ".AX", "^GSPTSE": ".TO", "^KS11": ".KS", "^BVSP": ".SA", "^TA125": ".TA",
+    "^NZ50": ".NZ", "^J200": ".JO", "^ISEQ": ".IR", "^FCHI": ".PA", "FTSEMIB.MI": ".MI", "^IBEX": ".MC",
+    "^STI": ".SI", "^HSI": ".HK", "^SSMI": ".SW", "^BFX": ".BR", "^PSI20": ".LS", "^OMXC25": ".CO",
+    "^OSEAX": ".OL", "^OMXS30": ".ST", "^OMXH25": ".HE", "^ATX": ".VI", "^MXX": ".MX",
+}
+
+_calendars = {}  # exchange_calendars code -> calendar, or None if unavailable
+_calendars_lock = threading.Lock()
+
+def market_suffix(ticker_symbol):
+    """Return the EXCHANGE_HOURS key for a ticker, or None when its trading hours are unknown.
+
+    Crypto pairs, FX and futures (BTC-USD, EURUSD=X, GC=F) trade around the
+    clock and unknown index symbols can't be placed, so they get None.
+    """
+    ticker_symbol = ticker_symbol.upper()
+    if ticker_symbol in INDEX_EXCHANGES:
+        return INDEX_EXCHANGES[ticker_symbol]
+    if ticker_symbol.startswith("^") or "=" in ticker_symbol or ticker_symbol.endswith(("-USD", "-USDT")):
+        return None
+    if "." not in ticker_symbol:
+        return ""
+    suffix = "." + ticker_symbol.rsplit(".", 1)[1]
+    return suffix if suffix in EXCHANGE_HOURS else None
+
+def exchange_timezone(ticker_symbol):
+    """Return the timezone a ticker's exchange stamps its bars in, or None when unknown"""
+    suffix = market_suffix(ticker_symbol)
+    return EXCHANGE_HOURS[suffix][0] if suffix is not None else None
+
+def _get_calendar(code):
+    if code is None:
+        return None
+    with _calendars_lock:
+        if code not in _calendars:
+            try:
+                import exchange_calendars
+                _calendars[code] = exchange_calendars.get_calendar(code)
+            except Exception:  # Package not installed, or no calendar for this exchange
+                _calendars[code] = None
+        return _calendars[code]
+
+@lru_cache(maxsize=4096)
+def _session_on(suffix, local_date):
+    """(open, close) UTC timestamps of the session on local_date, or None if the market is shut that day"""
+    timezone, open_time, close_time, weekdays, calendar_code = EXCHANGE_HOURS[suffix]
+    calendar = _get_calendar(calendar_code)
+    if calendar is not None:
+        try:
+            session = pd.Timestamp(local_date)
+            if not calendar.is_session(session):
+                return None
+            return calendar.session_open(session), calendar.session_close(session)
+        except Exception:  # Date outside the calendar's range; fall back to regular hours
+            pass
+    if local_date.weekday() not in weekdays:
+        return None
+    day = local_date.isoformat()
+    return (pd.Timestamp(f"{day} {open_time}", tz=timezone).tz_convert("UTC"),
+            pd.Timestamp(f"{day} {close_time}", tz=timezone).tz_convert("UTC"))
+
+def _session_ending_after(suffix, epoch_seconds):
+    """First session whose settle period ends after epoch_seconds, as (open, settled) epoch seconds"""
+    timezone = EXCHANGE_HOURS[suffix][0]
+    local_date = pd.Timestamp(epoch_seconds, unit="s", tz="UTC").tz_convert(timezone).date()
+    for offset in range(-1, SESSION_SEARCH_DAYS):
+        session = _session_on(suffix, local_date + timedelta(days=offset))
+        if session is None:
+            continue
+        open_at, settled_at = session[0].timestamp(), session[1].timestamp() + CLOSE_SETTLE_SECONDS
+        if settled_at > epoch_seconds:
+            return open_at, settled_at
+    return None
+
+def next_refresh_at(ticker_symbol, fetched_at, refresh_seconds):
+    """When price data for a ticker fetched at fetched_at goes stale.
+
+    Fetched during a session: after refresh_seconds, but no later than the
+    end of the close's settle period so the final bar is picked up. Fetched
+    while the market is shut: at the next open.
+
+    Args:
+        ticker_symbol (str): Stock or index ticker
+        fetched_at (float): Epoch seconds of the fetch
+        refresh_seconds (float): In-session refresh interval
+
+    Returns:
+        float: Epoch seconds
+    """
+    suffix = market_suffix(ticker_symbol)
+    session = _session_ending_after(suffix, fetched_at) if suffix is not None else None
+    if session is None:
+        return fetched_at + refresh_seconds
+    open_at, settled_at = session
+    if fetched_at < open_at:
+        return open_at
+    return min(fetched_at + refresh_seconds, settled_at)
+
+def refresh_window(ticker_symbol, refresh_seconds, now=None):
+    """Cache-key token that changes whenever next_refresh_at would expire data.
+
+    Pass it as an argument to an st.cache_data function so its entries roll
+    over on the market's schedule rather than a fixed ttl: a new token every
+    refresh_seconds while trading, one token for the whole closed period.
+    """
+    now = time.time() if now is None else now
+    suffix = market_suffix(ticker_symbol)
+    session = _session_ending_after(suffix, now) if suffix is not None else None
+    if session is None or now >= session[0]:
+        return ("open", int(now // refresh_seconds))
+    return ("closed", session[0])
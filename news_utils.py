@@ -1,9 +1,9 @@
 import os
-import requests
 from bs4 import BeautifulSoup
-import feedparser
 from datetime import datetime, timedelta
 import streamlit as st
+from http_utils import http_get, parse_feed
+from response_cache_utils import cached_get
 
 def get_stock_news_from_newsapi(company_name, api_key=None):
     """Get news from NewsAPI."""
@@ -25,7 +25,7 @@ def get_stock_news_from_newsapi(company_name, api_key=None):
             'apiKey': api_key
         }
         
-        response = requests.get(base_url, params=params)
+        response = http_get(base_url, params=params)
         response.raise_for_status()
         news_data = response.json()
         
@@ -45,7 +45,7 @@ def scrape_google_news(company_name):
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
         search_url = f"https://www.google.com/search?q={company_name}+stock+news&tbm=nws"
-        response = requests.get(search_url, headers=headers, timeout=10)
+        response = cached_get(search_url, headers=headers, timeout=10)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -84,7 +84,7 @@ def scrape_yahoo_finance_news(ticker_symbol):
     """Scrape news from Yahoo Finance."""
     try:
         feed_url = f"https://feeds.finance.yahoo.com/rss/2.0/headline?s={ticker_symbol}&region=US&lang=en-US"
-        feed = feedparser.parse(feed_url)
+        feed = parse_feed(feed_url, fetch=cached_get)
         
         if feed.bozo:
             return [], "Invalid RSS feed"
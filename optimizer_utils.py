@@ -0,0 +1,161 @@
+import os
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from backtest_utils import SIGNAL_PARAMS, DEFAULT_COST_BPS, signal_indicators, score_signals, backtest_signals
+
+# Parameter sweeps over the signal backtest. Indicators don't depend on the
+# thresholds being tuned, so they are computed once for the whole panel and
+# placed, with the closes, in one shared-memory block; worker processes map
+# that block instead of receiving a pickled copy per task and only score and
+# backtest. Each candidate is ranked on the first part of the history and
+# reported alongside its result on the held-out remainder, so a setting that
+# only fits the past stands out.
+SIGNAL_PARAM_SPACE = {  # Values searched per SIGNAL_PARAMS key; (low, high) tuples are sampled uniformly
+    "rsi_oversold": [20, 25, 30, 35],
+    "rsi_near_oversold": [35, 40, 45],
+    "rsi_near_overbought": [55, 60, 65],
+    "rsi_overbought": [65, 70, 75, 80],
+    "macd_cross_weight": [1.0, 2.0, 3.0],
+    "sma_weight": [0.5, 1.0, 1.5],
+    "strong_gap": [2.0, 2.5, 3.0],
+    "gap": [0.5, 1.0, 1.5],
+}
+RANK_METRICS = ("sharpe", "cagr", "total_return", "hit_rate")
+DEFAULT_TRAIN_FRACTION = 0.7
+MAX_SWEEP_WORKERS = 4
+MIN_PARALLEL_WORK = 5_000_000  # Candidate x bar x ticker evaluations (~2-3s serially); below this, spawning workers costs more than it saves
+CHUNKS_PER_WORKER = 4
+REPORTED_STATS = ("sharpe", "cagr", "total_return", "max_drawdown", "hit_rate", "trades")
+
+# Set in each worker process by _attach_inputs
+_worker_memory = None
+_worker_inputs = None
+
+def is_valid_params(params):
+    """Whether a candidate keeps the RSI bands ordered and the STRONG gap above the plain one"""
+    p = {**SIGNAL_PARAMS, **params}
+    return (p["rsi_oversold"] <= p["rsi_near_oversold"] <= p["rsi_near_overbought"] <= p["rsi_overbought"]
+            and p["gap"] < p["strong_gap"])
+
+def parameter_grid(space=SIGNAL_PARAM_SPACE):
+    """Every valid combination of the values listed in space, as a list of params dicts"""
+    keys = list(space)
+    combos = (dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys)))
+    return [params for params in combos if is_valid_params(params)]
+
+def random_parameters(space=SIGNAL_PARAM_SPACE, num_samples=200, seed=None):
+    """num_samples valid params dicts drawn from space: lists are sampled, (low, high) ranges drawn uniformly"""
+    rng = np.random.default_rng(seed)
+    candidates = []
+    for _ in range(num_samples * 20):  # Bounded retries when most draws break the ordering
+        if len(candidates) == num_samples:
+            break
+        params = {}
+        for key, values in space.items():
+            if isinstance(values, tuple):
+                params[key] = round(float(rng.uniform(*values)), 2)
+            else:
+                params[key] = values[rng.integers(len(values))]
+        if is_valid_params(params):
+            candidates.append(params)
+    return candidates
+
+def _period_stats(inputs, codes, start, end, entry_threshold, allow_short, cost_bps):
+    """Backtest bars [start, end) of every ticker and average each statistic across tickers"""
+    stats = backtest_signals(inputs[0, start:end], codes[start:end], entry_threshold, allow_short, cost_bps)["stats"]
+    with np.errstate(invalid="ignore"):
+        return {name: float(np.nanmean(stats[name])) if np.any(np.isfinite(stats[name])) else np.nan
+                for name in REPORTED_STATS}
+
+def _evaluate(inputs, params_list, split, entry_threshold, allow_short, cost_bps):
+    """In-sample and out-of-sample stats for each params dict; inputs is the stacked (6, bars, tickers) array"""
+    rows = []
+    for params in params_list:
+        codes, _, _ = score_signals(*inputs, params=params)
+        train = _period_stats(inputs, codes, 0, split, entry_threshold, allow_short, cost_bps)
+        test = _period_stats(inputs, codes, split, inputs.shape[1], entry_threshold, allow_short, cost_bps)
+        row = dict(params)
+        row.update({f"train_{name}": value for name, value in train.items()})
+        row.update({f"test_{name}": value for name, value in test.items()})
+        rows.append(row)
+    return rows
+
+def _attach_inputs(name, shape):
+    global _worker_memory, _worker_inputs
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    _worker_inputs = np.ndarray(shape, dtype=np.float64, buffer=_worker_memory.buf)
+
+def _evaluate_chunk(params_list, split, entry_threshold, allow_short, cost_bps):
+    return _evaluate(_worker_inputs, params_list, split, entry_threshold, allow_short, cost_bps)
+
+def _stack_inputs(closes):
+    closes = closes.astype(float)
+    indicators = signal_indicators(closes)
+    return np.stack([closes.to_numpy()] + [indicators[c].to_numpy() for c in
+                                           ('SMA_20', 'RSI', 'MACD_line', 'MACD_signal', 'MACD_hist')])
+
+def optimize_signal_parameters(closes, candidates=None, train_fraction=DEFAULT_TRAIN_FRACTION, rank_by="sharpe",
+                               entry_threshold=1, allow_short=False, cost_bps=DEFAULT_COST_BPS, max_workers=None):
+    """Backtest each candidate set of signal thresholds/weights and rank them with out-of-sample validation.
+
+    Candidates are scored on the first train_fraction of the bars (averaged
+    across tickers) and ranked by train_<rank_by>; test_* columns hold the
+    same statistics on the remaining bars, which played no part in the
+    ranking. The current generate_signal settings are always included and
+    flagged in the is_default column as the baseline to beat.
+
+    Args:
+        closes (pd.DataFrame | pd.Series): Close prices, dates x tickers (or one ticker)
+        candidates (list): params dicts (see parameter_grid, random_parameters);
+            defaults to 200 random draws from SIGNAL_PARAM_SPACE
+        train_fraction (float): Share of the history used for ranking
+        rank_by (str): One of RANK_METRICS
+        entry_threshold, allow_short, cost_bps: As for backtest_signals
+        max_workers (int): Worker processes; 1 runs in this process, as does any
+            sweep smaller than MIN_PARALLEL_WORK
+
+    Returns:
+        pd.DataFrame: One row per candidate, best first, with a rank column
+    """
+    if rank_by not in RANK_METRICS:
+        raise ValueError(f"rank_by must be one of {', '.join(RANK_METRICS)}")
+    if isinstance(closes, pd.Series):
+        closes = closes.to_frame()
+    candidates = random_parameters() if candidates is None else [dict(c) for c in candidates]
+    baseline = {key: SIGNAL_PARAMS[key] for key in SIGNAL_PARAM_SPACE}
+    candidates = [baseline] + [c for c in candidates if {**baseline, **c} != baseline]
+
+    inputs = _stack_inputs(closes)
+    split = int(inputs.shape[1] * train_fraction)
+    if max_workers is None:
+        max_workers = min(os.cpu_count() or 1, MAX_SWEEP_WORKERS)
+    work = len(candidates) * inputs.shape[1] * inputs.shape[2]
+    if max_workers <= 1 or work < MIN_PARALLEL_WORK:
+        rows = _evaluate(inputs, candidates, split, entry_threshold, allow_short, cost_bps)
+    else:
+        rows = _evaluate_in_pool(inputs, candidates, split, entry_threshold, allow_short, cost_bps, max_workers)
+
+    table = pd.DataFrame(rows)
+    table.insert(0, "is_default", [True] + [False] * (len(table) - 1))
+    table = table.sort_values(f"train_{rank_by}", ascending=False, na_position="last", kind="stable")
+    table.insert(0, "rank", range(1, len(table) + 1))
+    return table.reset_index(drop=True)
+
+def _evaluate_in_pool(inputs, candidates, split, entry_threshold, allow_short, cost_bps, max_workers):
+    chunk_size = max(1, -(-len(candidates) // (max_workers * CHUNKS_PER_WORKER)))
+    chunks = [candidates[i:i + chunk_size] for i in range(0, len(candidates), chunk_size)]
+    memory = shared_memory.SharedMemory(create=True, size=inputs.nbytes)
+    try:
+        np.ndarray(inputs.shape, dtype=np.float64, buffer=memory.buf)[:] = inputs
+        # spawn rather than fork: the app's server threads make forking unsafe
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_attach_inputs, initargs=(memory.name, inputs.shape)) as pool:
+            futures = [pool.submit(_evaluate_chunk, chunk, split, entry_threshold, allow_short, cost_bps) for chunk in chunks]
+            return [row for future in futures for row in future.result()]
+    finally:
+        memory.close()
+        memory.unlink()
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+from backtest_utils import signal_indicators, score_signals, signal_labels
+from store_utils import get_bars_many
+
+# Cross-sectional signals: a whole market universe as (dates x tickers)
+# matrices, with every indicator computed for all columns at once. Tickers
+# don't share a calendar exactly (late listings, missing days, suspensions),
+# so before any rolling window runs each column's own bars are shifted down
+# to end on the last row. A column then holds exactly the series that
+# ticker's own frame would, its latest bar sits on the last row, and the
+# values match add_technical_indicators/generate_signal ticker by ticker.
+PANEL_MAX_WORKERS = 16
+
+def build_panel(frames):
+    """Stack per-ticker OHLCV frames into (closes, volumes) DataFrames on the union of their dates.
+
+    Args:
+        frames (dict): ticker -> DataFrame with Close (and Volume) columns; empty frames are dropped
+
+    Returns:
+        tuple: (closes, volumes) DataFrames, dates x tickers
+    """
+    frames = {t: df for t, df in frames.items() if isinstance(df, pd.DataFrame) and not df.empty and 'Close' in df.columns}
+    if not frames:
+        return pd.DataFrame(), pd.DataFrame()
+    # Bars are stamped in their exchange's timezone; local wall-clock dates line a mixed-market universe up by day
+    frames = {t: df.tz_localize(None) if getattr(df.index, 'tz', None) is not None else df for t, df in frames.items()}
+    closes = pd.concat({t: df['Close'] for t, df in frames.items()}, axis=1).sort_index()
+    volumes = pd.concat({t: df['Volume'] if 'Volume' in df.columns else pd.Series(np.nan, index=df.index)
+                         for t, df in frames.items()}, axis=1).reindex(closes.index)
+    return closes.astype(float), volumes.astype(float)
+
+def load_panel(tickers, period="1y", interval="1d"):
+    """(closes, volumes) panel for tickers from the bar store; tickers with no data are left out"""
+    frames = get_bars_many(list(dict.fromkeys(tickers)), period=period, interval=interval, max_workers=PANEL_MAX_WORKERS)
+    return build_panel(frames)
+
+def _align_to_last_row(values):
+    """Shift each column's non-NaN rows down so they end on the last row; returns (aligned, row order)"""
+    order = np.argsort(~np.isnan(values), axis=0, kind="stable")  # NaN rows first, bars after in date order
+    return np.take_along_axis(values, order, axis=0), order
+
+def panel_indicators(closes):
+    """Every add_technical_indicators column for all tickers of an aligned close matrix.
+
+    Args:
+        closes (pd.DataFrame): Close prices, bars x tickers, each column's bars contiguous
+
+    Returns:
+        dict: column name (SMA_20, BB_High, BB_Mid, BB_Low, SMA_50, RSI,
+        MACD_line, MACD_signal, MACD_hist) -> DataFrame shaped like closes
+    """
+    indicators = signal_indicators(closes)
+    std_20 = closes.rolling(20, min_periods=20).std(ddof=0)
+    indicators.update({
+        "BB_High": indicators["SMA_20"] + 2 * std_20,
+        "BB_Mid": indicators["SMA_20"],
+        "BB_Low": indicators["SMA_20"] - 2 * std_20,
+        "SMA_50": closes.rolling(50, min_periods=50).mean(),
+    })
+    return indicators
+
+def signal_board(closes, volumes=None, news_sentiment_scores=None):
+    """Latest generate_signal result and indicator snapshot for every ticker of a panel.
+
+    Args:
+        closes (pd.DataFrame): Close prices, dates x tickers (see build_panel / load_panel)
+        volumes (pd.DataFrame, optional): Volumes on the same grid
+        news_sentiment_scores (dict, optional): ticker -> news sentiment score; 0.0 when missing
+
+    Returns:
+        pd.DataFrame: One row per ticker, strongest buy first: As Of, Close,
+        Change %, Return 20d %, RSI, MACD Hist, MACD Cross (Bullish/Bearish on
+        the last bar, else empty), SMA 20, SMA 50, BB %B, Volume Ratio (last
+        bar vs 20-bar average), Buy Score, Sell Score, Signal, Signal_code
+    """
+    if closes.empty:
+        return pd.DataFrame()
+    aligned, order = _align_to_last_row(closes.to_numpy(float))
+    aligned_closes = pd.DataFrame(aligned, columns=closes.columns)
+    indicators = panel_indicators(aligned_closes)
+    news = [(news_sentiment_scores or {}).get(t, 0.0) for t in closes.columns]
+    codes, buy, sell = score_signals(aligned, indicators["SMA_20"], indicators["RSI"], indicators["MACD_line"],
+                                     indicators["MACD_signal"], indicators["MACD_hist"], news_sentiment_score=news)
+
+    last = {name: frame.to_numpy()[-1] for name, frame in indicators.items()}
+    previous_hist = indicators["MACD_hist"].to_numpy()[-2] if len(aligned) > 1 else np.full(aligned.shape[1], np.nan)
+    # Line crossing signal on the last bar is the histogram changing sign, as generate_signal tests it
+    macd_cross = np.select([(last["MACD_hist"] > 0) & (previous_hist <= 0), (last["MACD_hist"] < 0) & (previous_hist >= 0)],
+                           ["Bullish", "Bearish"], "")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (aligned[-1] / aligned[-2] - 1) * 100 if len(aligned) > 1 else np.full(aligned.shape[1], np.nan)
+        return_20d = (aligned[-1] / aligned[-21] - 1) * 100 if len(aligned) > 20 else np.full(aligned.shape[1], np.nan)
+        percent_b = (aligned[-1] - last["BB_Low"]) / (last["BB_High"] - last["BB_Low"])
+        if volumes is not None:
+            aligned_volumes = np.take_along_axis(volumes.reindex(index=closes.index, columns=closes.columns).to_numpy(float), order, axis=0)
+            volume_ratio = aligned_volumes[-1] / pd.DataFrame(aligned_volumes).rolling(20, min_periods=20).mean().to_numpy()[-1]
+        else:
+            volume_ratio = np.full(aligned.shape[1], np.nan)
+    as_of = closes.index.to_numpy()[order[-1]]
+
+    board = pd.DataFrame({
+        "As Of": as_of,
+        "Close": aligned[-1],
+        "Change %": change,
+        "Return 20d %": return_20d,
+        "RSI": last["RSI"],
+        "MACD Hist": last["MACD_hist"],
+        "MACD Cross": macd_cross,
+        "SMA 20": last["SMA_20"],
+        "SMA 50": last["SMA_50"],
+        "BB %B": percent_b,
+        "Volume Ratio": volume_ratio,
+        "Buy Score": buy[-1],
+        "Sell Score": sell[-1],
+        "Signal": signal_labels(codes[-1]),
+        "Signal_code": codes[-1],
+    }, index=pd.Index(closes.columns, name="Ticker"))
+    board["Net Score"] = board["Buy Score"] - board["Sell Score"]
+    board = board.sort_values(["Signal_code", "Net Score"], ascending=False, na_position="last", kind="stable")
+    return board.drop(columns="Net Score")
+
+def board_signal_reason(row, news_sentiment_score=0.0, company_name="the company"):
+    """generate_signal's itemised reason text for one signal_board row"""
+    if row["Signal"] == "N/A":
+        return "Insufficient data for signal."
+    rsi, macd_hist, close, sma20 = row["RSI"], row["MACD Hist"], row["Close"], row["SMA 20"]
+    reasons = []
+    if rsi < 30: reasons.append(f"RSI ({rsi:.2f}) < 30 (Oversold).")
+    elif rsi < 40: reasons.append(f"RSI ({rsi:.2f}) < 40 (Nearing Oversold).")
+    elif rsi > 70: reasons.append(f"RSI ({rsi:.2f}) > 70 (Overbought).")
+    elif rsi > 60: reasons.append(f"RSI ({rsi:.2f}) > 60 (Nearing Overbought).")
+    else: reasons.append(f"RSI ({rsi:.2f}) is neutral.")
+    if row["MACD Cross"] == "Bullish": reasons.append("MACD Bullish Crossover.")
+    elif row["MACD Cross"] == "Bearish": reasons.append("MACD Bearish Crossover.")
+    elif macd_hist > 0: reasons.append("MACD Line > Signal (Bullish).")
+    elif macd_hist < 0: reasons.append("MACD Line < Signal (Bearish).")
+    if macd_hist > 0: reasons.append(f"MACD Hist ({macd_hist:.2f}) positive.")
+    elif macd_hist < 0: reasons.append(f"MACD Hist ({macd_hist:.2f}) negative.")
+    if close > sma20: reasons.append("Price > SMA20.")
+    elif close < sma20: reasons.append("Price < SMA20.")
+    if news_sentiment_score > 0.2: reasons.append(f"News for {company_name} strongly positive ({news_sentiment_score:.2f}).")
+    elif news_sentiment_score > 0.05: reasons.append(f"News for {company_name} mildly positive ({news_sentiment_score:.2f}).")
+    elif news_sentiment_score < -0.2: reasons.append(f"News for {company_name} strongly negative ({news_sentiment_score:.2f}).")
+    elif news_sentiment_score < -0.05: reasons.append(f"News for {company_name} mildly negative ({news_sentiment_score:.2f}).")
+    else: reasons.append(f"News for {company_name} neutral ({news_sentiment_score:.2f}).")
+    return " ".join(reasons)
@@ -0,0 +1,147 @@
+import time
+import heapq
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# Central token-bucket scheduler for upstream quota (Yahoo, Google). Callers
+# queue for a token instead of failing, and are served in priority order: an
+# interactive page load always goes before watchlist/advisor scans, which go
+# before background screener refreshes. Non-interactive callers also leave a
+# few tokens of burst untouched so a page load never finds the bucket empty.
+PRIORITY_INTERACTIVE = 0  # The page a user is looking at
+PRIORITY_BULK = 1  # User-started multi-ticker work: watchlist refresh, advisor candidates
+PRIORITY_BACKGROUND = 2  # Prefetch and screener table builds
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BULK: "bulk", PRIORITY_BACKGROUND: "background"}
+
+YAHOO = "yahoo"
+GOOGLE = "google"
+UPSTREAM_LIMITS = {  # upstream -> (sustained requests per second, burst size)
+    YAHOO: (2.0, 20),
+    GOOGLE: (1.0, 10),
+}
+UPSTREAM_HOST_SUFFIXES = {  # Hosts whose traffic counts against an upstream's quota
+    "yahoo.com": YAHOO,
+    "google.com": GOOGLE,
+}
+INTERACTIVE_RESERVE_TOKENS = 3
+
+_priority = contextvars.ContextVar("upstream_request_priority", default=PRIORITY_INTERACTIVE)
+_sequence = itertools.count()
+
+class _Bucket:
+    """Token bucket with a priority-ordered queue of waiting callers"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.waiting = []  # heap of (priority, sequence)
+        self.condition = threading.Condition()
+        self.max_queue_depth = 0
+        self.stats = {name: {"granted": 0, "throttled": 0, "wait_seconds": 0.0} for name in PRIORITY_NAMES.values()}
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+_buckets = {name: _Bucket(rate, burst) for name, (rate, burst) in UPSTREAM_LIMITS.items()}
+
+def current_priority():
+    """Priority that upstream calls made from this context are queued with"""
+    return _priority.get()
+
+@contextmanager
+def request_priority(priority):
+    """Queue every upstream call made inside the block (and in pools it starts) at priority"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def with_priority(priority, fn):
+    """Wrap fn so every call runs under request_priority(priority)"""
+    def run(*args, **kwargs):
+        with request_priority(priority):
+            return fn(*args, **kwargs)
+    return run
+
+def upstream_for_url(url):
+    """Return the rate-limited upstream a URL belongs to, or None if its host is not limited"""
+    host = urlsplit(url).hostname or ""
+    for suffix, upstream in UPSTREAM_HOST_SUFFIXES.items():
+        if host == suffix or host.endswith("." + suffix):
+            return upstream
+    return None
+
+def acquire(upstream, tokens=1, priority=None):
+    """Block until `tokens` requests to upstream may be sent.
+
+    Waiting callers are served strictly by priority, then arrival order.
+    Unknown upstreams (or None) are not limited.
+
+    Args:
+        upstream (str): Key of UPSTREAM_LIMITS, e.g. YAHOO
+        tokens (int): Requests the caller is about to make
+        priority (int, optional): Overrides the context's request_priority
+
+    Returns:
+        float: Seconds spent waiting
+    """
+    bucket = _buckets.get(upstream)
+    if bucket is None:
+        return 0.0
+    priority = current_priority() if priority is None else priority
+    tokens = min(tokens, bucket.burst)
+    reserve = INTERACTIVE_RESERVE_TOKENS if priority > PRIORITY_INTERACTIVE else 0
+    needed = min(tokens + reserve, bucket.burst)
+    entry = (priority, next(_sequence))
+    started_at = time.monotonic()
+    with bucket.condition:
+        heapq.heappush(bucket.waiting, entry)
+        bucket.max_queue_depth = max(bucket.max_queue_depth, len(bucket.waiting))
+        try:
+            while True:
+                bucket.refill(time.monotonic())
+                if bucket.waiting[0] == entry:
+                    if bucket.tokens >= needed:
+                        break
+                    bucket.condition.wait((needed - bucket.tokens) / bucket.rate)
+                else:
+                    bucket.condition.wait()
+        except BaseException:
+            bucket.waiting.remove(entry)
+            heapq.heapify(bucket.waiting)
+            bucket.condition.notify_all()
+            raise
+        heapq.heappop(bucket.waiting)
+        bucket.tokens -= tokens
+        bucket.condition.notify_all()  # Wake the new head of the queue
+        waited = time.monotonic() - started_at
+        stats = bucket.stats[PRIORITY_NAMES.get(priority, "background")]
+        stats["granted"] += 1
+        stats["wait_seconds"] += waited
+        if waited > 0.001:
+            stats["throttled"] += 1
+    return waited
+
+def get_rate_limit_metrics():
+    """Snapshot of every upstream bucket: tokens left, queue depth per priority and throttling counters"""
+    metrics = {}
+    for name, bucket in _buckets.items():
+        with bucket.condition:
+            bucket.refill(time.monotonic())
+            queue_depth = {priority_name: 0 for priority_name in PRIORITY_NAMES.values()}
+            for priority, _ in bucket.waiting:
+                queue_depth[PRIORITY_NAMES.get(priority, "background")] += 1
+            metrics[name] = {
+                "tokens_available": round(bucket.tokens, 2),
+                "queue_depth": queue_depth,
+                "max_queue_depth": bucket.max_queue_depth,
+                "by_priority": {priority_name: dict(stats) for priority_name, stats in bucket.stats.items()},
+            }
+    return metrics
@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import sqlite3
+from urllib.parse import urlsplit
+import requests
+from requests.structures import CaseInsensitiveDict
+from http_utils import http_get
+
+# Persistent cache for scraped pages and RSS feeds. Responses are kept in a
+# SQLite file keyed by URL with their ETag/Last-Modified validators: within the
+# host's TTL the stored body is served without touching the network, after
+# that a conditional GET is sent and a 304 just renews the stored copy.
+HTTP_CACHE_DB_PATH = os.path.join("data_cache", "http_cache.db")
+DEFAULT_TTL_SECONDS = 300
+HOST_TTL_SECONDS = {
+    "news.google.com": 900,
+    "www.google.com": 900,
+    "feeds.finance.yahoo.com": 600,
+    "finance.yahoo.com": 600,
+}
+MAX_STALE_SECONDS = 7 * 86400  # Entries not revalidated for this long are pruned
+
+def _connect():
+    os.makedirs(os.path.dirname(HTTP_CACHE_DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(HTTP_CACHE_DB_PATH, timeout=10)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS http_cache (
+            url TEXT PRIMARY KEY,
+            status_code INTEGER NOT NULL,
+            headers TEXT NOT NULL,
+            body BLOB NOT NULL,
+            encoding TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL NOT NULL
+        )
+    ''')
+    return conn
+
+def host_ttl(url):
+    """Return how long (seconds) a response from url's host is served without revalidation"""
+    return HOST_TTL_SECONDS.get(urlsplit(url).netloc.lower(), DEFAULT_TTL_SECONDS)
+
+def _load_entry(url):
+    try:
+        conn = _connect()
+        row = conn.execute("SELECT status_code, headers, body, encoding, etag, last_modified, fetched_at "
+                           "FROM http_cache WHERE url = ?", (url,)).fetchone()
+        conn.close()
+    except sqlite3.Error:
+        return None
+    if row is None:
+        return None
+    keys = ("status_code", "headers", "body", "encoding", "etag", "last_modified", "fetched_at")
+    entry = dict(zip(keys, row))
+    try:
+        entry["headers"] = json.loads(entry["headers"])
+    except ValueError:
+        return None
+    return entry
+
+def _store_response(url, response):
+    try:
+        conn = _connect()
+        now = time.time()
+        conn.execute("INSERT OR REPLACE INTO http_cache (url, status_code, headers, body, encoding, etag, last_modified, fetched_at) "
+                     "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                     (url, response.status_code, json.dumps(dict(response.headers)), response.content, response.encoding,
+                      response.headers.get("ETag"), response.headers.get("Last-Modified"), now))
+        conn.execute("DELETE FROM http_cache WHERE fetched_at < ?", (now - MAX_STALE_SECONDS,))
+        conn.commit()
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+def _touch_entry(url, response):
+    """Record a 304: the stored body is still current, keep any validators the server re-sent"""
+    try:
+        conn = _connect()
+        conn.execute("UPDATE http_cache SET fetched_at = ?, etag = COALESCE(?, etag), "
+                     "last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                     (time.time(), response.headers.get("ETag"), response.headers.get("Last-Modified"), url))
+        conn.commit()
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+def _cached_response(url, entry):
+    response = requests.Response()
+    response.url = url
+    response.status_code = entry["status_code"]
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response._content = entry["body"]
+    response.encoding = entry["encoding"]
+    response.from_cache = True
+    return response
+
+def _is_storable(response):
+    cache_control = response.headers.get("Cache-Control", "").lower()
+    return response.status_code == 200 and "no-store" not in cache_control
+
+def cached_get(url, params=None, headers=None, ttl_seconds=None, **kwargs):
+    """GET through the persistent response cache, revalidating with ETag/Last-Modified once the TTL passes.
+
+    Drop-in for http_get on pages and feeds: the return value is a
+    requests.Response (with `from_cache` set) either way. If the network
+    fails and a stored copy exists, the stale copy is served instead of
+    raising.
+
+    Args:
+        url (str): Page or feed URL
+        params (dict): Query parameters, folded into the cache key
+        headers (dict): Extra request headers
+        ttl_seconds (float): Override for the host's HOST_TTL_SECONDS policy
+
+    Returns:
+        requests.Response: Live or cached response
+    """
+    url = requests.Request("GET", url, params=params).prepare().url
+    ttl_seconds = host_ttl(url) if ttl_seconds is None else ttl_seconds
+    entry = _load_entry(url)
+    if entry is not None and time.time() - entry["fetched_at"] <= ttl_seconds:
+        return _cached_response(url, entry)
+
+    request_headers = dict(headers or {})
+    if entry is not None:
+        if entry["etag"]:
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+    try:
+        response = http_get(url, headers=request_headers, **kwargs)
+    except requests.exceptions.RequestException:
+        if entry is not None:
+            return _cached_response(url, entry)
+        raise
+
+    if response.status_code == 304 and entry is not None:
+        _touch_entry(url, response)
+        return _cached_response(url, entry)
+    if _is_storable(response):
+        _store_response(url, response)
+    elif entry is not None and response.status_code >= 500:
+        return _cached_response(url, entry)
+    response.from_cache = False
+    return response
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+# Risk report for many return series at once. Every metric the Performance
+# tab computes one Series at a time (calculate_sharpe_ratio, _sortino_ratio,
+# _beta, _max_drawdown, _calmar_ratio, assess_volatility_and_risk) is
+# evaluated here for all columns of a (dates x tickers) returns matrix with
+# NaN-aware NumPy reductions, using the same formulas so the numbers agree.
+# Columns may start and end on different dates; beta uses the dates a column
+# shares with the benchmark.
+TRADING_DAYS_PER_YEAR = 252
+RISK_WINDOW = 60  # Bars in assess_volatility_and_risk's recent-volatility window
+RISK_LEVELS = ((15, "Low"), (30, "Moderate"), (50, "High"))  # Upper volatility % bounds; above the last is "Very High"
+
+def returns_from_closes(closes):
+    """Daily returns of a (dates x tickers) close panel, each column over its own bars.
+
+    A date a ticker has no close for gets NaN, and its next return spans the
+    gap, just as pct_change on that ticker's own frame would give.
+    """
+    return closes.ffill().pct_change(fill_method=None).where(closes.notna())
+
+def _nanstd(values, axis=0):
+    """Sample std (ddof=1) ignoring NaN; NaN where fewer than two values"""
+    counts = np.sum(~np.isnan(values), axis=axis)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.nansum(values, axis=axis) / counts
+        squares = np.nansum((values - np.expand_dims(means, axis)) ** 2, axis=axis)
+        return np.where(counts > 1, np.sqrt(squares / (counts - 1)), np.nan)
+
+def _last_window(values, window):
+    """(window x columns) array of each column's last `window` non-NaN values, NaN-padded at the top"""
+    order = np.argsort(~np.isnan(values), axis=0, kind="stable")
+    return np.take_along_axis(values, order, axis=0)[-window:]
+
+def risk_level(volatility_percent):
+    """assess_volatility_and_risk's label for an annualised volatility in percent"""
+    if volatility_percent is None or pd.isna(volatility_percent):
+        return "N/A"
+    for bound, label in RISK_LEVELS:
+        if volatility_percent < bound:
+            return label
+    return "Very High"
+
+def _benchmark_series(returns, benchmark):
+    if benchmark is None:
+        return None
+    if isinstance(benchmark, pd.Series):
+        return benchmark.reindex(returns.index)
+    return returns[benchmark]
+
+def risk_report(returns, benchmark=None, risk_free_rate=0.0, window=RISK_WINDOW, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """Every risk metric for every column of a returns matrix, in one vectorised pass.
+
+    Args:
+        returns (pd.DataFrame): Periodic returns, dates x tickers (see returns_from_closes)
+        benchmark (str | pd.Series, optional): Column of returns, or a separate
+            return series on the same dates, that beta and correlation are measured against
+        risk_free_rate (float): Annual risk-free rate for Sharpe and Sortino
+        window (int): Bars in the recent-volatility window
+        periods_per_year (int): Periods in a year, for annualising
+
+    Returns:
+        pd.DataFrame: Indexed by ticker with observations, total_return, cagr
+        (over observations / periods_per_year years), volatility and
+        recent_volatility (annualised, %), risk_level, sharpe, sortino,
+        max_drawdown (fraction, negative), calmar, beta and correlation
+    """
+    values = returns.to_numpy(float)
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=0)
+    annualiser = np.sqrt(periods_per_year)
+    target = risk_free_rate / periods_per_year
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.nansum(values, axis=0) / counts
+        stds = _nanstd(values)
+        sharpe = np.where(stds == 0, 0.0, (means - target) / stds * annualiser)
+        downside_stds = _nanstd(np.where(values < target, values, np.nan))
+        sortino = np.where((downside_stds == 0) | np.isnan(downside_stds), 0.0, (means - target) / downside_stds * annualiser)
+
+        equity = np.cumprod(np.where(valid, 1 + values, 1.0), axis=0)
+        peaks = np.maximum(np.maximum.accumulate(equity, axis=0), 1.0)  # The starting value is a peak too
+        max_drawdown = np.min(equity / peaks, axis=0) - 1
+        total_return = equity[-1] - 1 if len(equity) else np.full(values.shape[1], np.nan)
+        years = counts / periods_per_year
+        cagr = np.where((total_return > -1) & (years > 0), (1 + total_return) ** (1 / years) - 1, np.nan)
+        calmar = np.where(max_drawdown < 0, cagr / np.abs(max_drawdown), np.nan)
+
+        volatility = stds * annualiser * 100
+        recent_volatility = _nanstd(_last_window(values, window)) * annualiser * 100
+        recent_volatility[counts < window] = np.nan
+
+        beta = np.full(values.shape[1], np.nan)
+        correlation = np.full(values.shape[1], np.nan)
+        benchmark_returns = _benchmark_series(returns, benchmark)
+        if benchmark_returns is not None:
+            bench = np.broadcast_to(benchmark_returns.to_numpy(float)[:, None], values.shape)
+            paired = valid & ~np.isnan(bench)
+            pair_counts = paired.sum(axis=0)
+            x, y = np.where(paired, values, np.nan), np.where(paired, bench, np.nan)
+            x_dev = x - np.nansum(x, axis=0) / pair_counts
+            y_dev = y - np.nansum(y, axis=0) / pair_counts
+            covariance = np.nansum(x_dev * y_dev, axis=0) / (pair_counts - 1)
+            bench_variance = np.nansum(y_dev ** 2, axis=0) / (pair_counts - 1)
+            x_variance = np.nansum(x_dev ** 2, axis=0) / (pair_counts - 1)
+            usable = (pair_counts > 1) & (bench_variance > 0)
+            beta = np.where(usable, covariance / bench_variance, np.nan)
+            correlation = np.where(usable & (x_variance > 0), covariance / np.sqrt(bench_variance * x_variance), np.nan)
+
+    no_data = counts < 2
+    for metric in (sharpe, sortino, max_drawdown, total_return, cagr, calmar):
+        metric[no_data] = np.nan
+    return pd.DataFrame({
+        "observations": counts,
+        "total_return": total_return,
+        "cagr": cagr,
+        "volatility": volatility,
+        "recent_volatility": recent_volatility,
+        "risk_level": [risk_level(v) for v in recent_volatility],
+        "sharpe": sharpe,
+        "sortino": sortino,
+        "max_drawdown": max_drawdown,
+        "calmar": calmar,
+        "beta": beta,
+        "correlation": correlation,
+    }, index=returns.columns)
+
+def rolling_risk(returns, benchmark=None, risk_free_rate=0.0, window=RISK_WINDOW, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """Rolling-window versions of the report's metrics for every column at once.
+
+    Returns:
+        dict: volatility (annualised %), sharpe, sortino, beta and drawdown
+        (running, from each column's peak) -> DataFrame shaped like returns;
+        beta is only present when a benchmark is given
+    """
+    annualiser = np.sqrt(periods_per_year)
+    target = risk_free_rate / periods_per_year
+    rolling = returns.rolling(window, min_periods=window)
+    means, stds = rolling.mean(), rolling.std()
+    downside_stds = returns.where(returns < target).rolling(window, min_periods=2).std()
+    downside_stds = downside_stds.where(means.notna())
+    equity = (1 + returns.fillna(0.0)).cumprod().where(returns.notna())
+    result = {
+        "volatility": stds * annualiser * 100,
+        "sharpe": ((means - target) / stds * annualiser).where(stds != 0, 0.0).where(stds.notna()),
+        "sortino": ((means - target) / downside_stds * annualiser).where(downside_stds > 0, 0.0).where(means.notna()),
+        "drawdown": equity / equity.cummax().clip(lower=1.0) - 1,
+    }
+    benchmark_returns = _benchmark_series(returns, benchmark)
+    if benchmark_returns is not None:
+        bench_variance = benchmark_returns.rolling(window, min_periods=window).var()
+        result["beta"] = rolling.cov(benchmark_returns).div(bench_variance.where(bench_variance > 0), axis=0)
+    return result
+
+def risk_metric(value):
+    """A report cell as the per-Series functions returned it: float, or None when unavailable"""
+    return None if value is None or pd.isna(value) else float(value)
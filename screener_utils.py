@@ -0,0 +1,212 @@
+import time
+import threading
+import numpy as np
+import pandas as pd
+from batch_utils import fetch_batch_info
+from rate_limit_utils import request_priority, with_priority, current_priority, PRIORITY_BULK, PRIORITY_BACKGROUND
+
+# Screener engine: one fundamentals table per ticker universe, kept in process
+# memory and rebuilt on a background thread once it ages, so a screen is just a
+# handful of vectorized comparisons over columns that are already loaded.
+FUNDAMENTALS_REFRESH_SECONDS = 6 * 3600
+FUNDAMENTAL_FIELDS = {
+    "name": "shortName",
+    "sector": "sector",
+    "price": "regularMarketPrice",
+    "market_cap": "marketCap",
+    "trailing_pe": "trailingPE",
+    "dividend_yield": "dividendYield",
+    "beta": "beta",
+    "average_volume": "averageVolume",
+}
+NUMERIC_COLUMNS = ["price", "market_cap", "trailing_pe", "dividend_yield", "beta", "average_volume"]
+
+# Screener universes by exchange suffix: the large caps of each market's main
+# index. A market screens these plus its featured stocks; markets without an
+# entry screen their featured stocks only.
+SCREENER_UNIVERSES = {
+    "": [
+        "AAPL", "ABBV", "ABT", "ACN", "ADBE", "AIG", "AMD", "AMGN", "AMT", "AMZN",
+        "AVGO", "AXP", "BA", "BAC", "BK", "BKNG", "BLK", "BMY", "BRK-B", "C",
+        "CAT", "CHTR", "CL", "CMCSA", "COF", "COP", "COST", "CRM", "CSCO", "CVS",
+        "CVX", "DE", "DHR", "DIS", "DUK", "EMR", "F", "FDX", "GD", "GE",
+        "GILD", "GM", "GOOGL", "GS", "HD", "HON", "IBM", "INTC", "INTU", "ISRG",
+        "JNJ", "JPM", "KHC", "KO", "LIN", "LLY", "LMT", "LOW", "MA", "MCD",
+        "MDLZ", "MDT", "MET", "META", "MMM", "MO", "MRK", "MS", "MSFT", "NEE",
+        "NFLX", "NKE", "NVDA", "ORCL", "PEP", "PFE", "PG", "PM", "PYPL", "QCOM",
+        "RTX", "SBUX", "SCHW", "SO", "SPG", "T", "TGT", "TMO", "TMUS", "TSLA",
+        "TXN", "UNH", "UNP", "UPS", "USB", "V", "VZ", "WFC", "WMT", "XOM",
+    ],
+    ".NS": [
+        "ADANIENT.NS", "ADANIPORTS.NS", "APOLLOHOSP.NS", "ASIANPAINT.NS", "AXISBANK.NS", "BAJAJ-AUTO.NS", "BAJFINANCE.NS", "BAJAJFINSV.NS", "BPCL.NS", "BHARTIARTL.NS",
+        "BRITANNIA.NS", "CIPLA.NS", "COALINDIA.NS", "DIVISLAB.NS", "DRREDDY.NS", "EICHERMOT.NS", "GRASIM.NS", "HCLTECH.NS", "HDFCBANK.NS", "HDFCLIFE.NS",
+        "HEROMOTOCO.NS", "HINDALCO.NS", "HINDUNILVR.NS", "ICICIBANK.NS", "ITC.NS", "INDUSINDBK.NS", "INFY.NS", "JSWSTEEL.NS", "KOTAKBANK.NS", "LT.NS",
+        "LTIM.NS", "M&M.NS", "MARUTI.NS", "NESTLEIND.NS", "NTPC.NS", "ONGC.NS", "POWERGRID.NS", "RELIANCE.NS", "SBILIFE.NS", "SBIN.NS",
+        "SHRIRAMFIN.NS", "SUNPHARMA.NS", "TATACONSUM.NS", "TATAMOTORS.NS", "TATASTEEL.NS", "TCS.NS", "TECHM.NS", "TITAN.NS", "ULTRACEMCO.NS", "WIPRO.NS",
+    ],
+    ".L": [
+        "AAL.L", "ABF.L", "ANTO.L", "AV.L", "AZN.L", "BA.L", "BARC.L", "BATS.L", "BNZL.L", "BP.L",
+        "BT-A.L", "DGE.L", "EXPN.L", "GLEN.L", "GSK.L", "HLN.L", "HSBA.L", "IHG.L", "III.L", "IMB.L",
+        "LGEN.L", "LLOY.L", "LSEG.L", "NG.L", "NWG.L", "PRU.L", "REL.L", "RIO.L", "RKT.L", "RR.L",
+        "SGE.L", "SHEL.L", "SMT.L", "SSE.L", "STAN.L", "TSCO.L", "ULVR.L", "VOD.L", "WPP.L",
+    ],
+    ".DE": [
+        "ADS.DE", "AIR.DE", "ALV.DE", "BAS.DE", "BAYN.DE", "BEI.DE", "BMW.DE", "BNR.DE", "CBK.DE", "CON.DE",
+        "DB1.DE", "DBK.DE", "DHL.DE", "DTE.DE", "DTG.DE", "ENR.DE", "EOAN.DE", "FRE.DE", "HEI.DE", "HEN3.DE",
+        "HNR1.DE", "IFX.DE", "MBG.DE", "MRK.DE", "MTX.DE", "MUV2.DE", "P911.DE", "PAH3.DE", "QIA.DE", "RHM.DE",
+        "RWE.DE", "SAP.DE", "SHL.DE", "SIE.DE", "SRT3.DE", "SY1.DE", "VNA.DE", "VOW3.DE", "ZAL.DE",
+    ],
+    ".PA": [
+        "AC.PA", "AI.PA", "AIR.PA", "ALO.PA", "BN.PA", "BNP.PA", "CA.PA", "CAP.PA", "CS.PA", "DG.PA",
+        "DSY.PA", "EDEN.PA", "EL.PA", "EN.PA", "ENGI.PA", "ERF.PA", "GLE.PA", "HO.PA", "KER.PA", "LR.PA",
+        "MC.PA", "ML.PA", "OR.PA", "ORA.PA", "PUB.PA", "RI.PA", "RMS.PA", "RNO.PA", "SAF.PA", "SAN.PA",
+        "SGO.PA", "STLAP.PA", "STMPA.PA", "SU.PA", "TTE.PA", "URW.PA", "VIE.PA", "VIV.PA",
+    ],
+    ".T": [
+        "2914.T", "3382.T", "4063.T", "4502.T", "4519.T", "4543.T", "4568.T", "4661.T", "5108.T", "6098.T",
+        "6273.T", "6367.T", "6501.T", "6503.T", "6594.T", "6702.T", "6758.T", "6861.T", "6902.T", "6954.T",
+        "6981.T", "7203.T", "7267.T", "7741.T", "7751.T", "7974.T", "8001.T", "8002.T", "8031.T", "8035.T",
+        "8058.T", "8306.T", "8316.T", "8411.T", "8766.T", "9020.T", "9432.T", "9433.T", "9983.T", "9984.T",
+    ],
+    ".TO": [
+        "ABX.TO", "AEM.TO", "ATD.TO", "BAM.TO", "BCE.TO", "BMO.TO", "BN.TO", "BNS.TO", "CM.TO", "CNQ.TO",
+        "CNR.TO", "CP.TO", "CSU.TO", "CVE.TO", "DOL.TO", "ENB.TO", "FNV.TO", "FTS.TO", "GIB-A.TO", "H.TO",
+        "IFC.TO", "IMO.TO", "L.TO", "MFC.TO", "MG.TO", "NA.TO", "NTR.TO", "POW.TO", "QSR.TO", "RY.TO",
+        "SHOP.TO", "SLF.TO", "SU.TO", "T.TO", "TD.TO", "TECK-B.TO", "TRI.TO", "TRP.TO", "WCN.TO", "WPM.TO",
+    ],
+    ".AX": [
+        "ALL.AX", "AMC.AX", "ANZ.AX", "APA.AX", "ASX.AX", "BHP.AX", "BXB.AX", "CBA.AX", "COH.AX", "COL.AX",
+        "CPU.AX", "CSL.AX", "FMG.AX", "GMG.AX", "IAG.AX", "JHX.AX", "MIN.AX", "MQG.AX", "NAB.AX", "NST.AX",
+        "ORG.AX", "QBE.AX", "REA.AX", "RHC.AX", "RIO.AX", "RMD.AX", "S32.AX", "SCG.AX", "SHL.AX", "STO.AX",
+        "SUN.AX", "TCL.AX", "TLC.AX", "TLS.AX", "WBC.AX", "WDS.AX", "WES.AX", "WOW.AX", "WTC.AX", "XRO.AX",
+    ],
+    ".HK": [
+        "0001.HK", "0002.HK", "0003.HK", "0005.HK", "0006.HK", "0011.HK", "0016.HK", "0027.HK", "0066.HK", "0175.HK",
+        "0267.HK", "0386.HK", "0388.HK", "0669.HK", "0688.HK", "0700.HK", "0762.HK", "0823.HK", "0857.HK", "0868.HK",
+        "0883.HK", "0939.HK", "0941.HK", "0960.HK", "0968.HK", "1038.HK", "1044.HK", "1088.HK", "1109.HK", "1113.HK",
+        "1177.HK", "1211.HK", "1299.HK", "1398.HK", "1810.HK", "1928.HK", "2020.HK", "2269.HK", "2313.HK", "2318.HK",
+        "2319.HK", "2331.HK", "2382.HK", "2388.HK", "2628.HK", "3690.HK", "3968.HK", "3988.HK", "9618.HK", "9988.HK",
+        "9999.HK",
+    ],
+    ".KS": [
+        "000270.KS", "000660.KS", "003550.KS", "003670.KS", "005380.KS", "005490.KS", "005930.KS", "006400.KS", "009150.KS", "010130.KS",
+        "011200.KS", "012330.KS", "015760.KS", "017670.KS", "018260.KS", "028260.KS", "032830.KS", "033780.KS", "034730.KS", "035420.KS",
+        "035720.KS", "051910.KS", "055550.KS", "066570.KS", "068270.KS", "086790.KS", "096770.KS", "105560.KS", "207940.KS", "373220.KS",
+    ],
+    ".SW": [
+        "ABBN.SW", "ALC.SW", "CFR.SW", "GEBN.SW", "GIVN.SW", "HOLN.SW", "KNIN.SW", "LOGN.SW", "LONN.SW", "NESN.SW",
+        "NOVN.SW", "PGHN.SW", "ROG.SW", "SCMN.SW", "SGSN.SW", "SIKA.SW", "SLHN.SW", "SOON.SW", "SREN.SW", "UBSG.SW",
+        "ZURN.SW",
+    ],
+    ".SA": [
+        "ABEV3.SA", "B3SA3.SA", "BBAS3.SA", "BBDC4.SA", "BPAC11.SA", "CMIG4.SA", "CSAN3.SA", "ELET3.SA", "EMBR3.SA", "EQTL3.SA",
+        "GGBR4.SA", "HAPV3.SA", "ITSA4.SA", "ITUB4.SA", "JBSS3.SA", "KLBN11.SA", "LREN3.SA", "PETR4.SA", "PRIO3.SA", "RADL3.SA",
+        "RAIL3.SA", "RDOR3.SA", "RENT3.SA", "SBSP3.SA", "SUZB3.SA", "TOTS3.SA", "UGPA3.SA", "VALE3.SA", "VIVT3.SA", "WEGE3.SA",
+    ],
+    ".SI": [
+        "9CI.SI", "A17U.SI", "BN4.SI", "C07.SI", "C38U.SI", "C6L.SI", "D05.SI", "F34.SI", "G13.SI", "H78.SI",
+        "M44U.SI", "ME8U.SI", "N2IU.SI", "O39.SI", "S63.SI", "S68.SI", "U11.SI", "U96.SI", "V03.SI", "Y92.SI",
+        "Z74.SI",
+    ],
+}
+
+_tables = {}  # universe key -> (built_at, DataFrame)
+_refreshing = set()
+_tables_lock = threading.Lock()
+
+def screener_universe(market_config):
+    """Tickers the screener covers for a MARKET_CONFIGS entry: featured stocks first, then its index large caps"""
+    suffix = market_config.get("suffix", "").strip()
+    return list(dict.fromkeys(market_config["stocks"] + SCREENER_UNIVERSES.get(suffix, [])))
+
+def _universe_key(tickers):
+    return tuple(sorted(dict.fromkeys(t.upper() for t in tickers if t)))
+
+def build_fundamentals_table(tickers):
+    """Fetch .info for every ticker and flatten the screener fields into one DataFrame.
+
+    Lookups are queued at the caller's request priority.
+
+    Returns:
+        pd.DataFrame: Indexed by ticker with the FUNDAMENTAL_FIELDS columns (NaN where Yahoo has no value)
+    """
+    infos = fetch_batch_info(list(tickers))
+    table = pd.DataFrame.from_dict(
+        {ticker_symbol: {column: info.get(field) for column, field in FUNDAMENTAL_FIELDS.items()}
+         for ticker_symbol, info in infos.items()},
+        orient="index", columns=list(FUNDAMENTAL_FIELDS)
+    )
+    table[NUMERIC_COLUMNS] = table[NUMERIC_COLUMNS].apply(pd.to_numeric, errors="coerce")
+    table.index.name = "ticker"
+    return table
+
+def _refresh_in_background(key):
+    try:
+        table = build_fundamentals_table(key)
+        with _tables_lock:
+            _tables[key] = (time.time(), table)
+    finally:
+        with _tables_lock:
+            _refreshing.discard(key)
+
+def get_fundamentals_table(tickers, max_age_seconds=FUNDAMENTALS_REFRESH_SECONDS):
+    """Return the fundamentals table for a universe, building it on first use.
+
+    Once a table exists it is always returned immediately; if it is older than
+    max_age_seconds a rebuild is started on a background thread (at background
+    priority) and picked up by a later call.
+
+    Returns:
+        tuple: (DataFrame, built_at epoch seconds)
+    """
+    key = _universe_key(tickers)
+    with _tables_lock:
+        cached = _tables.get(key)
+        start_refresh = cached is not None and time.time() - cached[0] > max_age_seconds and key not in _refreshing
+        if start_refresh:
+            _refreshing.add(key)
+    if start_refresh:
+        threading.Thread(target=with_priority(PRIORITY_BACKGROUND, _refresh_in_background), args=(key,),
+                         daemon=True, name="screener-refresh").start()
+    if cached is not None:
+        return cached[1], cached[0]
+
+    # Someone is waiting on the first build: queue it as user-started work, or higher if the caller is
+    with request_priority(min(current_priority(), PRIORITY_BULK)):
+        table = build_fundamentals_table(key)
+    built_at = time.time()
+    with _tables_lock:
+        _tables[key] = (built_at, table)
+    return table, built_at
+
+def screen_fundamentals(table, market_cap_min=0.0, pe_max=np.inf, dividend_yield_min=0.0,
+                        beta_max=np.inf, volume_min=0.0, sector="All"):
+    """Filter a fundamentals table with vectorized masks.
+
+    A missing value fails any bound that is actually set, the same way the old
+    per-ticker loop treated absent .info fields.
+
+    Args:
+        table (pd.DataFrame): Output of get_fundamentals_table
+        market_cap_min (float): Minimum market cap
+        pe_max (float): Maximum trailing P/E
+        dividend_yield_min (float): Minimum dividend yield as a fraction (0.02 for 2%)
+        beta_max (float): Maximum beta
+        volume_min (float): Minimum average daily volume
+        sector (str): Sector name, or "All"
+
+    Returns:
+        pd.DataFrame: Matching rows
+    """
+    if table.empty:
+        return table
+    mask = (
+        (table["market_cap"].fillna(0) >= market_cap_min)
+        & (table["trailing_pe"].fillna(np.inf) <= pe_max)
+        & (table["dividend_yield"].fillna(0) >= dividend_yield_min)
+        & (table["beta"].fillna(np.inf) <= beta_max)
+        & (table["average_volume"].fillna(0) >= volume_min)
+    )
+    if sector != "All":
+        mask &= table["sector"].fillna("").eq(sector)
+    return table[mask]
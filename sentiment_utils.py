@@ -0,0 +1,185 @@
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+# Headline sentiment is deterministic, and the same headlines show up for many
+# tickers and users, so every VADER score is kept in a SQLite file keyed by a
+# hash of the text and reused across sessions and restarts.
+SENTIMENT_DB_PATH = os.path.join("data_cache", "sentiment.db")
+MEMORY_CACHE_MAX_ENTRIES = 50000
+SQLITE_MAX_VARIABLES = 900  # Stay under SQLite's bound-parameter limit per query
+
+NEUTRAL_RESULT = {"label": "NEUTRAL", "score": 0.0, "compound": 0.0}
+
+# HuggingFace model. transformers/torch are only imported when the model is
+# first needed, so server start-up doesn't pay for them. HF_SENTIMENT_BACKEND
+# picks the CPU runtime: "torch" (default), "quantized" (dynamic int8 Linear
+# layers) or "onnx" (needs optimum[onnxruntime]; falls back to torch without it).
+HF_SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+HF_SENTIMENT_BACKEND = os.getenv("HF_SENTIMENT_BACKEND", "torch").lower()
+HF_BATCH_SIZE = 16
+HF_MAX_TOKENS = 512
+
+_analyzer = None
+_analyzer_lock = threading.Lock()
+_memory_scores = {}  # text hash -> compound score
+_memory_scores_lock = threading.Lock()
+_hf_model = None  # (tokenizer, model) once loaded
+_hf_lock = threading.Lock()
+
+def _get_analyzer():
+    global _analyzer
+    with _analyzer_lock:
+        if _analyzer is None:
+            _analyzer = SentimentIntensityAnalyzer()
+        return _analyzer
+
+def _connect():
+    os.makedirs(os.path.dirname(SENTIMENT_DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(SENTIMENT_DB_PATH, timeout=10)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS vader_scores (
+            text_hash TEXT PRIMARY KEY,
+            compound REAL NOT NULL,
+            scored_at REAL NOT NULL
+        )
+    ''')
+    return conn
+
+def _text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def vader_result(compound_score):
+    """Build the label/score dict the app uses from a VADER compound score"""
+    label = "POSITIVE" if compound_score >= 0.05 else "NEGATIVE" if compound_score <= -0.05 else "NEUTRAL"
+    return {"label": label, "score": compound_score, "compound": compound_score}
+
+def _load_scores(hashes):
+    scores = {}
+    try:
+        conn = _connect()
+        for i in range(0, len(hashes), SQLITE_MAX_VARIABLES):
+            chunk = hashes[i:i + SQLITE_MAX_VARIABLES]
+            placeholders = ",".join("?" * len(chunk))
+            scores.update(conn.execute(f"SELECT text_hash, compound FROM vader_scores WHERE text_hash IN ({placeholders})",
+                                       chunk).fetchall())
+        conn.close()
+    except sqlite3.Error:
+        pass
+    return scores
+
+def _store_scores(scores):
+    try:
+        conn = _connect()
+        now = time.time()
+        conn.executemany("INSERT OR REPLACE INTO vader_scores (text_hash, compound, scored_at) VALUES (?, ?, ?)",
+                         [(text_hash, compound, now) for text_hash, compound in scores.items()])
+        conn.commit()
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+def _remember(scores):
+    with _memory_scores_lock:
+        if len(_memory_scores) + len(scores) > MEMORY_CACHE_MAX_ENTRIES:
+            _memory_scores.clear()
+        _memory_scores.update(scores)
+
+def _recall(hashes):
+    with _memory_scores_lock:
+        return {h: _memory_scores[h] for h in hashes if h in _memory_scores}
+
+def score_texts_vader(texts):
+    """Score many texts with VADER, only running the analyzer on texts never seen before.
+
+    Texts are stripped and deduplicated, then looked up in memory and in the
+    SQLite store; the remaining ones are scored and written back.
+
+    Args:
+        texts (list): Headlines or other strings (non-strings and blanks score as neutral)
+
+    Returns:
+        list: One {"label", "score", "compound"} dict per input text, in order
+    """
+    cleaned = [text.strip() if isinstance(text, str) else "" for text in texts]
+    hash_by_text = {text: _text_hash(text) for text in dict.fromkeys(cleaned) if text}
+
+    scores = _recall(hash_by_text.values())
+    missing = [h for h in hash_by_text.values() if h not in scores]
+    if missing:
+        stored = _load_scores(missing)
+        scores.update(stored)
+        _remember(stored)
+
+    unscored = [text for text, h in hash_by_text.items() if h not in scores]
+    if unscored:
+        analyzer = _get_analyzer()
+        new_scores = {hash_by_text[text]: analyzer.polarity_scores(text)["compound"] for text in unscored}
+        _store_scores(new_scores)
+        _remember(new_scores)
+        scores.update(new_scores)
+
+    return [vader_result(scores[hash_by_text[text]]) if text else dict(NEUTRAL_RESULT) for text in cleaned]
+
+def load_hf_model():
+    """Load (once per process) and return the HF sentiment (tokenizer, model) pair for the configured backend"""
+    global _hf_model
+    with _hf_lock:
+        if _hf_model is not None:
+            return _hf_model
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+        tokenizer = AutoTokenizer.from_pretrained(HF_SENTIMENT_MODEL)
+        model = None
+        if HF_SENTIMENT_BACKEND == "onnx":
+            try:
+                from optimum.onnxruntime import ORTModelForSequenceClassification
+                model = ORTModelForSequenceClassification.from_pretrained(HF_SENTIMENT_MODEL, export=True)
+            except ImportError:
+                print("optimum[onnxruntime] not installed; using the torch backend for HF sentiment.")
+        if model is None:
+            model = AutoModelForSequenceClassification.from_pretrained(HF_SENTIMENT_MODEL)
+            model.eval()
+            if HF_SENTIMENT_BACKEND == "quantized":
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        _hf_model = (tokenizer, model)
+        return _hf_model
+
+def warm_hf_model_async():
+    """Start loading the HF model on a background thread so the first request doesn't wait for it"""
+    if _hf_model is None:
+        threading.Thread(target=load_hf_model, daemon=True, name="hf-sentiment-warmup").start()
+
+def score_texts_hf(texts, batch_size=HF_BATCH_SIZE):
+    """Classify many texts with the HF sentiment model.
+
+    Texts are truncated at the token level (not by characters) and grouped
+    by length so each batch is only padded to its own longest member.
+
+    Args:
+        texts (list): Strings to classify (non-strings and blanks come back neutral)
+        batch_size (int): Texts per forward pass
+
+    Returns:
+        list: One {"label", "score"} dict per input text, in order
+    """
+    cleaned = [text.strip() if isinstance(text, str) else "" for text in texts]
+    unique_texts = [text for text in dict.fromkeys(cleaned) if text]
+    results = {}
+    if unique_texts:
+        import torch
+        tokenizer, model = load_hf_model()
+        max_length = min(tokenizer.model_max_length, HF_MAX_TOKENS)
+        unique_texts.sort(key=len)
+        for i in range(0, len(unique_texts), batch_size):
+            batch = unique_texts[i:i + batch_size]
+            encoded = tokenizer(batch, truncation=True, max_length=max_length, padding=True, return_tensors="pt")
+            with torch.inference_mode():
+                probabilities = torch.softmax(model(**encoded).logits, dim=-1)
+            scores, label_ids = probabilities.max(dim=-1)
+            for text, score, label_id in zip(batch, scores.tolist(), label_ids.tolist()):
+                results[text] = {"label": model.config.id2label[label_id], "score": score}
+    return [dict(results[text]) if text else {"label": "NEUTRAL", "score": 0.0} for text in cleaned]
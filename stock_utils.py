@@ -3,27 +3,31 @@ import yfinance as yf
 import pandas as pd
 import ta
 import plotly.graph_objs as go 
-import feedparser
 import requests
 from bs4 import BeautifulSoup
 import numpy as np
+from store_utils import get_bars
+from indicator_utils import compute_indicators
+from http_utils import parse_feed
+from response_cache_utils import cached_get
 
 # --- Data Fetching and Processing ---
 @st.cache_data(ttl=3600)
 def fetch_stock_data(ticker_symbol, period='3mo', interval='1d'):
-    stock = yf.Ticker(ticker_symbol)
-    df = stock.history(period=period, interval=interval)
-    df.dropna(inplace=True)
-    return df
+    return get_bars(ticker_symbol, period=period, interval=interval)
 
 @st.cache_data(ttl=3600)
 def add_technical_indicators(df):
     if df.empty or 'Close' not in df.columns:
         return pd.DataFrame()
     df_ta = df.copy()
-    df_ta['SMA_20'] = ta.trend.sma_indicator(df_ta['Close'], window=20)
-    df_ta['RSI'] = ta.momentum.rsi(df_ta['Close'], window=14)
-    df_ta['MACD'] = ta.trend.macd_diff(df_ta['Close'])
+    indicators = compute_indicators(df_ta['Close'], key=df_ta.attrs.get('ticker_symbol'))
+    df_ta['SMA_20'] = indicators['SMA_20']
+    df_ta['RSI'] = indicators['RSI']
+    df_ta['MACD'] = indicators['MACD_hist']
+    # Kept alongside the histogram so signal generation doesn't recompute them
+    df_ta['MACD_line'] = indicators['MACD_line']
+    df_ta['MACD_signal'] = indicators['MACD_signal']
     return df_ta
 
 @st.cache_data(ttl=3600)
@@ -49,8 +53,11 @@ def generate_signal_detailed(df):
     previous = df.iloc[-2] 
     rsi_val = latest['RSI']; macd_hist_val = latest['MACD']
     try:
-        macd_line_series = ta.trend.macd(df['Close'])
-        macd_signal_series = ta.trend.macd_signal(df['Close'])
+        if 'MACD_line' in df.columns and 'MACD_signal' in df.columns:
+            macd_line_series, macd_signal_series = df['MACD_line'], df['MACD_signal']
+        else:
+            macd_line_series = ta.trend.macd(df['Close'])
+            macd_signal_series = ta.trend.macd_signal(df['Close'])
         if len(macd_line_series) < 2 or len(macd_signal_series) < 2: return "N/A", "Not enough data for MACD line calculation."
         macd_line_val = macd_line_series.iloc[-1]; macd_signal_line_val = macd_signal_series.iloc[-1]
         prev_macd_line = macd_line_series.iloc[-2]; prev_macd_signal_line = macd_signal_series.iloc[-2]
@@ -112,7 +119,7 @@ def get_company_profile_scraping(ticker_symbol):
         search_query = f"{ticker_symbol} stock company profile site:finance.yahoo.com"
         headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
         search_url = f"https://www.google.com/search?q={search_query.replace(' ', '+')}&hl=en"
-        search_response = requests.get(search_url, headers=headers, timeout=10)
+        search_response = cached_get(search_url, headers=headers, timeout=10)
         search_response.raise_for_status()
         soup = BeautifulSoup(search_response.text, 'html.parser')
         profile_url = None
@@ -125,7 +132,7 @@ def get_company_profile_scraping(ticker_symbol):
                     profile_url = unquote(profile_url)
                     break
         if not profile_url: return "Couldn't find Yahoo Finance profile link on Google."
-        profile_response = requests.get(profile_url, headers=headers, timeout=10)
+        profile_response = cached_get(profile_url, headers=headers, timeout=10)
         profile_response.raise_for_status()
         profile_soup = BeautifulSoup(profile_response.text, 'html.parser')
         summary_section = profile_soup.find('section', attrs={'data-testid': 'qsp-profile'}) # Updated based on Yahoo's current structure (might change)
@@ -150,7 +157,7 @@ def get_company_profile_scraping(ticker_symbol):
 def get_stock_news_feedparser(ticker_symbol):
     feed_url = f"https://feeds.finance.yahoo.com/rss/2.0/headline?s={ticker_symbol}®ion=US&lang=en-US"
     try:
-        news_feed = feedparser.parse(feed_url)
+        news_feed = parse_feed(feed_url, fetch=cached_get)
         if news_feed.bozo: return [], f"News feed for {ticker_symbol} is not well-formed."
         return news_feed.entries[:5], None
     except Exception as e: return [], f"Could not fetch news using feedparser: {e}"
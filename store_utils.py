@@ -0,0 +1,274 @@
+import os
+import json
+import time
+import tempfile
+import threading
+from urllib.parse import quote
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import yfinance as yf
+from concurrency_utils import single_flight, map_concurrently
+from rate_limit_utils import acquire, YAHOO
+from market_calendar_utils import next_refresh_at, refresh_window, exchange_timezone
+from batch_utils import download_batch_history, get_ticker_frame
+from fingerprint_utils import stamp_frame_version, FRAME_VERSION_ATTR
+
+# Local OHLCV bar store: one Parquet file per ticker+interval, with a small JSON
+# record of how far back the file is known to be complete kept in the file's
+# own schema metadata, so bars and metadata are always replaced together.
+STORE_DIR = os.path.join("data_cache", "bars")
+STORE_META_KEY = b"stockseer_store_meta"
+
+# How old a stored series may get during a trading session before the missing
+# tail bars are fetched. Outside sessions the store is not topped up at all
+# until the market reopens (see market_calendar_utils).
+TOP_UP_AFTER_SECONDS = {
+    "1m": 60, "2m": 60, "5m": 120, "15m": 300, "30m": 300,
+    "60m": 300, "90m": 300, "1h": 300,
+    "1d": 300, "5d": 300, "1wk": 900, "1mo": 1800, "3mo": 1800
+}
+DEFAULT_TOP_UP_AFTER_SECONDS = 300
+
+# The first fetch for an interval pulls at least this span, so the shorter
+# periods the app asks for later (6mo candidates, 1y index beta, 5y CAGR) are
+# all slices of one download. Intraday intervals keep Yahoo's own limits.
+BASE_SPAN_BY_INTERVAL = {"1d": "5y"}
+
+# Coarser bars are built locally from the daily series instead of fetched
+RESAMPLED_INTERVALS = {"1wk": "W-MON", "1mo": "MS", "3mo": "QS"}
+OHLCV_AGGREGATION = {
+    "Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum",
+    "Dividends": "sum", "Stock Splits": "max",
+}
+
+_store_locks = {}  # (ticker, interval) -> lock held around a read-merge-write of that file
+_store_locks_guard = threading.Lock()
+
+def _bar_path(ticker_symbol, interval):
+    """Return the parquet file path for a ticker+interval"""
+    return os.path.join(STORE_DIR, f"{quote(ticker_symbol.upper(), safe='')}__{interval}.parquet")
+
+def _store_lock(ticker_symbol, interval):
+    key = (ticker_symbol.upper(), interval)
+    with _store_locks_guard:
+        return _store_locks.setdefault(key, threading.Lock())
+
+def period_start(period, now=None):
+    """Return the UTC timestamp a yfinance period string reaches back to, or None for 'max'."""
+    now = now if now is not None else pd.Timestamp.now(tz="UTC")
+    period = str(period).lower()
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=now.year, month=1, day=1, tz="UTC")
+    for suffix, unit in (("mo", "months"), ("wk", "weeks"), ("y", "years"), ("d", "days")):
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return now - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    raise ValueError(f"Unsupported period: {period}")
+
+def _covers(covered_from, period):
+    """Check whether a stored series starting at covered_from satisfies period"""
+    if covered_from is None:
+        return False
+    if covered_from == "max":
+        return True
+    needed = period_start(period)
+    return needed is not None and pd.Timestamp(covered_from) <= needed
+
+def widest_period(period, other):
+    """Return whichever of two yfinance period strings reaches further back"""
+    if period == "max" or other == "max":
+        return "max"
+    return period if period_start(period) <= period_start(other) else other
+
+def _widest_coverage(covered_from, period):
+    """Combine the stored coverage marker with a freshly fetched period"""
+    if covered_from == "max" or period == "max":
+        return "max"
+    fetched_from = period_start(period)
+    if covered_from is None:
+        return fetched_from.isoformat()
+    return min(pd.Timestamp(covered_from), fetched_from).isoformat()
+
+def _stored_meta(ticker_symbol, interval):
+    """Read only the metadata of a stored series ({} if nothing is stored)"""
+    try:
+        return json.loads((pq.read_schema(_bar_path(ticker_symbol, interval)).metadata or {})[STORE_META_KEY])
+    except (OSError, ValueError, KeyError, pa.ArrowException):
+        return {}
+
+def load_bars(ticker_symbol, interval="1d"):
+    """Read the stored bars and metadata for a ticker, or (None, {}) if nothing is stored"""
+    try:
+        table = pq.read_table(_bar_path(ticker_symbol, interval))
+        meta = json.loads((table.schema.metadata or {})[STORE_META_KEY])
+        return table.to_pandas(), meta
+    except (OSError, ValueError, KeyError, pa.ArrowException):
+        return None, {}
+
+def save_bars(ticker_symbol, interval, df, meta):
+    """Atomically write bars and metadata so concurrent readers never see a partial or mismatched file"""
+    os.makedirs(STORE_DIR, exist_ok=True)
+    table = pa.Table.from_pandas(df)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), STORE_META_KEY: json.dumps(meta)})
+    fd, tmp_path = tempfile.mkstemp(dir=STORE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pq.write_table(table, f)
+        os.replace(tmp_path, _bar_path(ticker_symbol, interval))
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def merge_bars(stored_df, new_df):
+    """Append new bars to stored ones; refetched timestamps replace the stored (possibly partial) bar"""
+    if stored_df is None or stored_df.empty:
+        return new_df
+    if new_df is None or new_df.empty:
+        return stored_df
+    merged = pd.concat([stored_df, new_df])
+    merged = merged[~merged.index.duplicated(keep="last")]
+    return merged.sort_index()
+
+def slice_period(df, period):
+    """Return the rows of df that fall inside a yfinance period string"""
+    start = period_start(period)
+    if df.empty or start is None:
+        return df
+    if df.index.tz is None:
+        start = start.tz_localize(None)
+    return df[df.index >= start]
+
+def _download(ticker_symbol, interval, **kwargs):
+    acquire(YAHOO)
+    df = yf.Ticker(ticker_symbol).history(interval=interval, **kwargs)
+    df.dropna(inplace=True)
+    return df
+
+def _sync_store(ticker_symbol, period, interval):
+    """Bring the stored series up to date for period.
+
+    Returns:
+        tuple: (all stored bars, revision = epoch seconds of the last fetch that changed them)
+    """
+    # Calls for other periods of the same file (not merged by single_flight) wait here
+    # and then see the bars the previous holder saved
+    with _store_lock(ticker_symbol, interval):
+        return _sync_store_locked(ticker_symbol, period, interval)
+
+def _sync_store_locked(ticker_symbol, period, interval):
+    stored_df, meta = load_bars(ticker_symbol, interval)
+    covered_from = meta.get("covered_from")
+    top_up_after = TOP_UP_AFTER_SECONDS.get(interval, DEFAULT_TOP_UP_AFTER_SECONDS)
+
+    if stored_df is None or not _covers(covered_from, period):
+        # Cold start or a longer span than we hold: fetch the whole period once
+        fresh_df = _download(ticker_symbol, interval, period=period)
+        if fresh_df.empty:
+            return (fresh_df if stored_df is None else slice_period(stored_df, period)), meta.get("fetched_at")
+        merged_df = merge_bars(stored_df, fresh_df)
+        meta = {"covered_from": _widest_coverage(covered_from, period), "fetched_at": time.time()}
+        save_bars(ticker_symbol, interval, merged_df, meta)
+    elif time.time() >= next_refresh_at(ticker_symbol, meta.get("fetched_at", 0), top_up_after) and not stored_df.empty:
+        # Warm store: only pull bars from the last stored session onwards
+        last_session = stored_df.index[-1].strftime("%Y-%m-%d")
+        try:
+            tail_df = _download(ticker_symbol, interval, start=last_session)
+        except Exception:
+            # The gap may exceed what the interval allows; rebuild the requested span instead
+            tail_df = _download(ticker_symbol, interval, period=period)
+        merged_df = merge_bars(stored_df, tail_df)
+        meta = {"covered_from": covered_from, "fetched_at": time.time()}
+        save_bars(ticker_symbol, interval, merged_df, meta)
+    else:
+        merged_df = stored_df
+    return merged_df, meta.get("fetched_at")
+
+def resample_bars(df, interval):
+    """Aggregate daily OHLCV bars into '1wk' (Monday-labelled), '1mo' or '3mo' bars"""
+    if df.empty:
+        return df
+    aggregation = {column: how for column, how in OHLCV_AGGREGATION.items() if column in df.columns}
+    resampled = df.resample(RESAMPLED_INTERVALS[interval], label="left", closed="left").agg(aggregation)
+    return resampled.dropna(subset=["Close"])
+
+def get_bars(ticker_symbol, period="1y", interval="1d"):
+    """Serve OHLCV history from the local store, fetching only what is missing.
+
+    A cold daily series is fetched for at least BASE_SPAN_BY_INTERVAL, and
+    weekly/monthly/quarterly bars are resampled from it, so every period and
+    interval the app needs for a ticker comes out of one download. Concurrent
+    calls that need the same download (e.g. many sessions opening a popular
+    ticker at once) share one store update, and each gets its own copy.
+
+    Args:
+        ticker_symbol (str): Stock ticker symbol
+        period (str): yfinance period string (e.g. '6mo', '5y', 'max')
+        interval (str): yfinance bar interval
+
+    Returns:
+        pd.DataFrame: Bars covering the requested period
+    """
+    if interval in RESAMPLED_INTERVALS:
+        daily = get_bars(ticker_symbol, period, "1d")
+        revision = daily.attrs.get(FRAME_VERSION_ATTR, (None, None, None))[2]
+        return stamp_frame_version(resample_bars(daily, interval), ticker_symbol, interval, revision)
+    fetch_period = widest_period(period, BASE_SPAN_BY_INTERVAL.get(interval, period))
+    # Calls with a different fetch span don't share the flight; _sync_store's file lock orders them
+    merged_df, revision = single_flight(("bars", ticker_symbol.upper(), interval, fetch_period),
+                                        lambda: _sync_store(ticker_symbol, fetch_period, interval))
+    bars = slice_period(merged_df, period)
+    return stamp_frame_version(bars, ticker_symbol, interval, revision)
+
+def _seed_store(tickers, period, interval):
+    """Fetch the tickers the store can't serve for period in one bulk download and save each one.
+
+    Only tickers with a known exchange timezone are seeded, so the saved bars
+    carry the same index as a Ticker.history fetch and later top-ups merge
+    cleanly. Anything the download misses is left for get_bars.
+    """
+    missing = [t for t in tickers if exchange_timezone(t) is not None
+               and not _covers(_stored_meta(t, interval).get("covered_from"), period)]
+    if len(missing) < 2:
+        return
+    try:
+        batch_df = download_batch_history(missing, period=period, interval=interval, actions=True)
+    except Exception:
+        return
+    for ticker_symbol in missing:
+        fresh_df = get_ticker_frame(batch_df, ticker_symbol)
+        if fresh_df.empty:
+            continue
+        timezone = exchange_timezone(ticker_symbol)
+        fresh_df = fresh_df.tz_localize(timezone) if fresh_df.index.tz is None else fresh_df.tz_convert(timezone)
+        with _store_lock(ticker_symbol, interval):
+            stored_df, meta = load_bars(ticker_symbol, interval)
+            covered_from = meta.get("covered_from")
+            if stored_df is not None and _covers(covered_from, period):
+                continue  # Filled by another session meanwhile
+            meta = {"covered_from": _widest_coverage(covered_from, period), "fetched_at": time.time()}
+            save_bars(ticker_symbol, interval, merge_bars(stored_df, fresh_df), meta)
+
+def get_bars_many(tickers, period="1y", interval="1d", max_workers=8):
+    """get_bars for many tickers concurrently.
+
+    Daily tickers the store can't serve yet are first fetched together in one
+    bulk download at the store's base span and saved, so a cold watchlist or
+    candidate list costs one upstream request instead of one per ticker.
+
+    Returns:
+        dict: ticker -> DataFrame (empty when that ticker's fetch failed)
+    """
+    base_interval = "1d" if interval in RESAMPLED_INTERVALS else interval
+    if base_interval in BASE_SPAN_BY_INTERVAL:
+        _seed_store(list(dict.fromkeys(tickers)), widest_period(period, BASE_SPAN_BY_INTERVAL[base_interval]), base_interval)
+    results = map_concurrently(lambda t: get_bars(t, period=period, interval=interval), tickers, max_workers=max_workers)
+    return {t: (df if isinstance(df, pd.DataFrame) else pd.DataFrame()) for t, df in results.items()}
+
+def bars_refresh_window(ticker_symbol, interval="1d"):
+    """Cache-key token for in-memory caches over get_bars; changes when the store would top up"""
+    return refresh_window(ticker_symbol, TOP_UP_AFTER_SECONDS.get(interval, DEFAULT_TOP_UP_AFTER_SECONDS))
@@ -0,0 +1,145 @@
+import os
+import re
+import time
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from html import unescape
+from urllib.parse import urljoin
+import requests
+from http_utils import http_get
+from rate_limit_utils import with_priority, PRIORITY_BACKGROUND
+
+# Article thumbnails are resolved off the render path: the News tab asks for a
+# cached og:image and shows a placeholder until a background worker finds one.
+THUMBNAIL_DB_PATH = os.path.join("data_cache", "thumbnails.db")
+THUMBNAIL_MAX_BYTES = 64 * 1024  # og:image lives in <head>; never read past this
+THUMBNAIL_TIMEOUT_SECONDS = 5
+THUMBNAIL_MISS_RETRY_SECONDS = 86400  # Pages without an og:image are retried once a day
+THUMBNAIL_WORKERS = 4
+
+_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Range": f"bytes=0-{THUMBNAIL_MAX_BYTES - 1}",
+}
+_META_TAG_RE = re.compile(r"<meta\b[^>]*>", re.IGNORECASE)
+_ATTR_RE = re.compile(r"""([a-zA-Z:_-]+)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+_IMAGE_KEYS = ("og:image", "og:image:url", "og:image:secure_url", "twitter:image", "twitter:image:src")
+
+_executor = ThreadPoolExecutor(max_workers=THUMBNAIL_WORKERS, thread_name_prefix="thumbnail")
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+
+def _connect():
+    os.makedirs(os.path.dirname(THUMBNAIL_DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(THUMBNAIL_DB_PATH, timeout=10)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS thumbnails (
+            url_hash TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            image_url TEXT,
+            resolved_at REAL NOT NULL
+        )
+    ''')
+    return conn
+
+def _url_hash(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+def extract_og_image(html_text, base_url=None):
+    """Return the og:image (or twitter:image) URL declared in an HTML fragment, if any"""
+    for tag in _META_TAG_RE.findall(html_text):
+        attrs = {k.lower(): (v1 or v2) for k, v1, v2 in _ATTR_RE.findall(tag)}
+        key = (attrs.get("property") or attrs.get("name") or "").lower()
+        if key in _IMAGE_KEYS and attrs.get("content"):
+            image_url = unescape(attrs["content"].strip())
+            return urljoin(base_url, image_url) if base_url else image_url
+    return None
+
+def resolve_og_image(url):
+    """Read just the start of a page and pull its og:image.
+
+    The body is streamed and abandoned once </head> or THUMBNAIL_MAX_BYTES
+    is reached, so a large article costs a few kilobytes rather than a full
+    download and parse.
+    """
+    try:
+        with http_get(url, headers=_HEADERS, timeout=THUMBNAIL_TIMEOUT_SECONDS, stream=True) as response:
+            if response.status_code not in (200, 206):
+                return None
+            buffer = b""
+            for chunk in response.iter_content(chunk_size=8192):
+                buffer += chunk
+                if b"</head>" in buffer.lower() or len(buffer) >= THUMBNAIL_MAX_BYTES:
+                    break
+            html_text = buffer.decode(response.encoding or "utf-8", errors="ignore")
+            return extract_og_image(html_text, base_url=response.url)
+    except requests.exceptions.RequestException:
+        return None
+
+def get_cached_thumbnail(url):
+    """Look up a resolved thumbnail.
+
+    Returns:
+        tuple: (known, image_url) - known is False when the URL still needs resolving
+    """
+    try:
+        conn = _connect()
+        row = conn.execute("SELECT image_url, resolved_at FROM thumbnails WHERE url_hash = ?", (_url_hash(url),)).fetchone()
+        conn.close()
+    except sqlite3.Error:
+        return False, None
+    if not row:
+        return False, None
+    image_url, resolved_at = row
+    if not image_url and time.time() - resolved_at > THUMBNAIL_MISS_RETRY_SECONDS:
+        return False, None
+    return True, image_url or None
+
+def _store_thumbnail(url, image_url):
+    try:
+        conn = _connect()
+        conn.execute("INSERT OR REPLACE INTO thumbnails (url_hash, url, image_url, resolved_at) VALUES (?, ?, ?, ?)",
+                     (_url_hash(url), url, image_url, time.time()))
+        conn.commit()
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+def _resolve_and_store(url):
+    try:
+        _store_thumbnail(url, resolve_og_image(url))
+    finally:
+        with _in_flight_lock:
+            _in_flight.discard(url)
+
+def prefetch_thumbnails(urls):
+    """Queue background resolution for every URL not already cached or in flight"""
+    for url in urls:
+        if not url or not url.startswith("http"):
+            continue
+        with _in_flight_lock:
+            if url in _in_flight:
+                continue
+        known, _ = get_cached_thumbnail(url)
+        if known:
+            continue
+        with _in_flight_lock:
+            if url in _in_flight:
+                continue
+            _in_flight.add(url)
+        # Pool threads don't inherit the caller's context; lookups are prefetch work whoever queues them
+        _executor.submit(with_priority(PRIORITY_BACKGROUND, _resolve_and_store), url)
+
+def get_thumbnail(url):
+    """Return the cached thumbnail for an article, scheduling a background lookup on a miss.
+
+    Never blocks on the network: callers should show a placeholder when this returns None.
+    """
+    if not url or not url.startswith("http"):
+        return None
+    known, image_url = get_cached_thumbnail(url)
+    if not known:
+        prefetch_thumbnails([url])
+    return image_url
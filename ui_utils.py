@@ -3,16 +3,13 @@ import pandas as pd
 import plotly.graph_objs as go
 from plotly.subplots import make_subplots
 import yfinance as yf
-import ta
 import numpy as np
 import numpy_financial as npf  # Added for financial calculations
-from transformers import pipeline
 import requests
 from bs4 import BeautifulSoup # Added for scraping
 from urllib.parse import quote_plus, urlparse # Added for scraping URL encoding
 import os
 from dotenv import load_dotenv
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import time
 from datetime import datetime, timedelta
 import json # Added for Lottie
@@ -21,6 +18,22 @@ import plotly.express as px
 from datetime import datetime, timedelta
 import random
 from about_tab import render_about_tab  # Added for About tab
+from store_utils import get_bars, get_bars_many, bars_refresh_window  # Local OHLCV store with incremental top-up
+from fingerprint_utils import FRAME_HASH_FUNCS  # Version-stamp cache keys for DataFrame arguments
+from panel_utils import build_panel, load_panel, signal_board, board_signal_reason  # Cross-sectional (dates x tickers) signal scoring
+from risk_utils import risk_report, returns_from_closes, risk_metric  # One-pass vectorised risk metrics
+from correlation_utils import rolling_correlation, correlation_clusters, most_correlated_pairs  # Incremental N x N rolling correlation
+from simulation_utils import run_monte_carlo  # Vectorised Monte Carlo engine
+from indicator_utils import compute_indicators  # Incremental SMA/BB/RSI/MACD engine
+from info_cache_utils import get_info  # Shared .info cache with per-field-class TTLs
+from screener_utils import get_fundamentals_table, screen_fundamentals, screener_universe  # Cached fundamentals table + vectorized filters
+from sentiment_utils import score_texts_vader, score_texts_hf, warm_hf_model_async  # Batch VADER/HF scoring
+from http_utils import http_get, http_head  # Shared pooled HTTP client
+from response_cache_utils import cached_get  # Persistent conditional-GET cache for pages and feeds
+from batch_utils import get_batch_quotes, fetch_batch_info  # Bulk multi-ticker fetches
+from concurrency_utils import iter_completed  # Bounded pool with streamed results
+from rate_limit_utils import acquire, request_priority, with_priority, YAHOO, PRIORITY_BULK  # Prioritized upstream quota scheduler
+from thumbnail_utils import get_thumbnail  # Lazy og:image thumbnails for news cards
 import streamlit.components.v1 as components # Added for HTML components
 import re
 
@@ -54,7 +67,7 @@ def scrape_company_images(query_term, max_images=9):
         try:
             # Try Google Images
             search_url = f"https://www.google.com/search?q={quote_plus(search_query)}&tbm=isch"
-            response = requests.get(search_url, headers=headers, timeout=10)
+            response = http_get(search_url, headers=headers, timeout=10)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -109,7 +122,7 @@ def scrape_company_images(query_term, max_images=9):
         try:
             # Try Unsplash API as a fallback
             unsplash_url = f"https://source.unsplash.com/featured/?{quote_plus(query_term)},company"
-            response = requests.head(unsplash_url, allow_redirects=True)
+            response = http_head(unsplash_url, allow_redirects=True)
             if response.status_code == 200:
                 image_urls.append(response.url)
         except:
@@ -594,15 +607,8 @@ def load_lottiefile(filepath: str):
         return None
 
 # --- SENTIMENT MODELS ---
-@st.cache_resource
-def load_hf_sentiment_model():
-    return pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
-hf_sentiment_analyzer = load_hf_sentiment_model()
-
-@st.cache_resource
-def load_vader_sentiment_analyzer():
-    return SentimentIntensityAnalyzer()
-vader_analyzer = load_vader_sentiment_analyzer()
+# The HF model is loaded on first use (see sentiment_utils); HF_SENTIMENT_WARMUP=1 loads it in the background at start-up instead
+if os.getenv("HF_SENTIMENT_WARMUP") == "1": warm_hf_model_async()
 
 # --- STYLING ---
 st.markdown("""
@@ -1551,13 +1557,15 @@ with st.sidebar:
     st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # --- UTILITY FUNCTIONS ---
-@st.cache_data(ttl=3600)
 def fetch_stock_data(ticker_symbol, period='1y', interval='1d', max_retries=3):
+    # The refresh window follows the ticker's trading hours: short while the market is open, frozen from close to the next open
+    return _fetch_stock_data_cached(ticker_symbol, period, interval, max_retries, bars_refresh_window(ticker_symbol, interval))
+
+@st.cache_data(ttl=3600)
+def _fetch_stock_data_cached(ticker_symbol, period, interval, max_retries, refresh_window_key):
     for attempt in range(max_retries):
         try:
-            stock = yf.Ticker(ticker_symbol)
-            df = stock.history(period=period, interval=interval)
-            df.dropna(inplace=True)
+            df = get_bars(ticker_symbol, period=period, interval=interval)
             df.attrs['ticker_symbol'] = ticker_symbol
             return df
         except Exception as e:
@@ -1569,31 +1577,59 @@ def fetch_stock_data(ticker_symbol, period='1y', interval='1d', max_retries=3):
                 return pd.DataFrame()
     return pd.DataFrame()
 
-@st.cache_data(ttl=3600)
+def get_panel_returns(tickers, period='1y'):
+    # Daily returns for a ticker list from one panel load; refreshed on the first ticker's market schedule
+    tickers = tuple(dict.fromkeys(t.upper() for t in tickers))
+    return _get_panel_returns_cached(tickers, period, bars_refresh_window(tickers[0]) if tickers else None)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _get_panel_returns_cached(tickers, period, refresh_window_key):
+    with request_priority(PRIORITY_BULK):
+        closes, _ = load_panel(tickers, period=period)
+    return returns_from_closes(closes)
+
+def get_risk_table(tickers, benchmark_symbol=None, risk_free_rate=0.0, period='1y'):
+    # Risk columns for a ticker list (plus its benchmark) from one panel; refreshed on the first ticker's market schedule
+    tickers = tuple(dict.fromkeys(t.upper() for t in tickers))
+    return _get_risk_table_cached(tickers, benchmark_symbol, risk_free_rate, period, bars_refresh_window(tickers[0]) if tickers else None)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _get_risk_table_cached(tickers, benchmark_symbol, risk_free_rate, period, refresh_window_key):
+    symbols = list(tickers) + ([benchmark_symbol] if benchmark_symbol and benchmark_symbol not in tickers else [])
+    with request_priority(PRIORITY_BULK):
+        closes, _ = load_panel(symbols, period=period)
+    if closes.empty:
+        return pd.DataFrame()
+    benchmark = benchmark_symbol if benchmark_symbol in closes.columns else None
+    report = risk_report(returns_from_closes(closes), benchmark=benchmark, risk_free_rate=risk_free_rate)
+    return report.reindex([t for t in tickers if t in report.index])
+
+@st.cache_data(ttl=3600, hash_funcs=FRAME_HASH_FUNCS)
 def add_technical_indicators(df):
     if df.empty or 'Close' not in df.columns: return pd.DataFrame()
     df_ta = df.copy()
+    # Same values as the ta library, but only bars new since the last call for this ticker are computed
+    indicators = compute_indicators(df_ta['Close'], key=df_ta.attrs.get('ticker_symbol'))
     if len(df_ta) > 20:
-        df_ta['SMA_20'] = ta.trend.sma_indicator(df_ta['Close'], window=20)
-        bb_indicator = ta.volatility.BollingerBands(close=df_ta['Close'], window=20, window_dev=2)
-        df_ta['BB_High'] = bb_indicator.bollinger_hband()
-        df_ta['BB_Mid'] = bb_indicator.bollinger_mavg()
-        df_ta['BB_Low'] = bb_indicator.bollinger_lband()
+        df_ta['SMA_20'] = indicators['SMA_20']
+        df_ta['BB_High'] = indicators['BB_High']
+        df_ta['BB_Mid'] = indicators['BB_Mid']
+        df_ta['BB_Low'] = indicators['BB_Low']
     else:
         df_ta['SMA_20'], df_ta['BB_High'], df_ta['BB_Mid'], df_ta['BB_Low'] = np.nan, np.nan, np.nan, np.nan
-    if len(df_ta) > 50: df_ta['SMA_50'] = ta.trend.sma_indicator(df_ta['Close'], window=50)
+    if len(df_ta) > 50: df_ta['SMA_50'] = indicators['SMA_50']
     else: df_ta['SMA_50'] = np.nan
-    if len(df_ta) > 14: df_ta['RSI'] = ta.momentum.rsi(df_ta['Close'], window=14)
+    if len(df_ta) > 14: df_ta['RSI'] = indicators['RSI']
     else: df_ta['RSI'] = np.nan
     if len(df_ta) > 34: 
-        df_ta['MACD_line'] = ta.trend.macd(df_ta['Close'])
-        df_ta['MACD_signal'] = ta.trend.macd_signal(df_ta['Close'])
-        df_ta['MACD_hist'] = ta.trend.macd_diff(df_ta['Close'])
+        df_ta['MACD_line'] = indicators['MACD_line']
+        df_ta['MACD_signal'] = indicators['MACD_signal']
+        df_ta['MACD_hist'] = indicators['MACD_hist']
     else:
         df_ta['MACD_line'], df_ta['MACD_signal'], df_ta['MACD_hist'] = np.nan, np.nan, np.nan
     return df_ta
 
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, hash_funcs=FRAME_HASH_FUNCS)
 def generate_signal(df, overall_news_sentiment_score=0.0, company_name="the company"):
     MIN_DATA_POINTS = 35 
     required_cols = ['RSI', 'MACD_hist', 'SMA_20', 'Close', 'MACD_line', 'MACD_signal']
@@ -1641,13 +1677,14 @@ def get_about_stock_info(ticker_symbol):
     description, sector, industry, market_cap, exchange = "Info not available.", "N/A", "N/A", None, "N/A"
     info_dict, financials_df, earnings_df, analyst_recs_df, analyst_price_target_dict, company_officers_list = {}, pd.DataFrame(), pd.DataFrame(), None, None, []
     try:
-        stock = yf.Ticker(ticker_symbol); info = stock.info
+        stock = yf.Ticker(ticker_symbol); info = get_info(ticker_symbol)
         if info:
             description, sector, industry = info.get('longBusinessSummary', description), info.get('sector', sector), info.get('industry', industry)
             market_cap, exchange, info_dict = info.get('marketCap'), info.get('exchange', exchange), info
             company_officers_list = info.get('companyOfficers', [])
             info_dict['currency_symbol'] = get_currency_symbol(info.get('currency', 'USD')) 
             info_dict['logo_url'] = get_company_logo_url(ticker_symbol, info.get('shortName'), info.get('website'))
+        acquire(YAHOO, tokens=4)  # Financials, earnings, recommendations and price target requests below
         try: financials_df = stock.quarterly_financials if not stock.quarterly_financials.empty else stock.financials
         except: pass
         try: earnings_df = stock.quarterly_earnings if not stock.quarterly_earnings.empty else stock.earnings
@@ -1665,7 +1702,7 @@ def get_stock_news_from_newsapi(ticker_symbol_or_company_name):
     if not NEWS_API_KEY: return news_items, "NEWS_API_KEY not configured."
     query_term = ticker_symbol_or_company_name
     try:
-        stock_info_temp = yf.Ticker(ticker_symbol_or_company_name).info
+        stock_info_temp = get_info(ticker_symbol_or_company_name, field_classes=("profile",))
         if stock_info_temp and stock_info_temp.get('shortName'):
             company_name_for_search = stock_info_temp['shortName'].replace(" Inc.", "").replace(" Corp.", "").replace(" Ltd.", "")
             if len(company_name_for_search) > 3 : query_term = company_name_for_search
@@ -1673,27 +1710,15 @@ def get_stock_news_from_newsapi(ticker_symbol_or_company_name):
     to_date, from_date = datetime.now().strftime('%Y-%m-%d'), (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
     url = f"https://newsapi.org/v2/everything?q={query_term}&from={from_date}&to={to_date}&language=en&sortBy=relevancy&pageSize=15&apiKey={NEWS_API_KEY}"
     try:
-        response = requests.get(url, timeout=10); response.raise_for_status()
+        response = http_get(url, timeout=10); response.raise_for_status()
         articles_data = response.json().get("articles", [])
         if not articles_data: error_message = f"No recent news for '{query_term}' via NewsAPI."
         else:
             for item in articles_data:
                 publish_time_readable = pd.to_datetime(item['publishedAt']).strftime('%Y-%m-%d %H:%M') if item.get('publishedAt') else "N/A"
-                # Enhanced image URL handling
+                # Articles without urlToImage get a thumbnail lazily via thumbnail_utils in the News tab
                 image_url = item.get('urlToImage')
-                if not image_url or not image_url.startswith('http'):
-                    # Try to get image from article URL
-                    try:
-                        article_response = requests.get(item.get('url', ''), timeout=5)
-                        if article_response.status_code == 200:
-                            soup = BeautifulSoup(article_response.text, 'html.parser')
-                            # Try to find the first valid image
-                            for img in soup.find_all('img'):
-                                if img.get('src') and img['src'].startswith('http'):
-                                    image_url = img['src']
-                                    break
-                    except:
-                        pass
+                if not image_url or not image_url.startswith('http'): image_url = None
                 
                 news_items.append({
                     'title': item.get('title', 'N/A'), 
@@ -1720,7 +1745,7 @@ def scrape_google_news(query_term):
     search_url = f"https://news.google.com/search?q={safe_query}&hl=en-US&gl=US&ceid=US%3Aen"
     headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
     try:
-        response = requests.get(search_url, headers=headers, timeout=15); response.raise_for_status()
+        response = cached_get(search_url, headers=headers, timeout=15); response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser'); articles_tags = soup.find_all('article', limit=15)
         processed_urls = set()
         for article_tag in articles_tags:
@@ -1728,20 +1753,8 @@ def scrape_google_news(query_term):
             if link_tag and link_tag['href'].startswith('./articles/'):
                 title_text = link_tag.get_text(strip=True) or (article_tag.find(['h3', 'h4']) and article_tag.find(['h3', 'h4']).get_text(strip=True)) or article_tag.get_text(separator=' ', strip=True).split(' temporally ')[0]
                 full_link = "https://news.google.com" + link_tag['href'][1:]
-                
-                # Try to get image from article
-                image_url = None
-                try:
-                    article_response = requests.get(full_link, headers=headers, timeout=5)
-                    if article_response.status_code == 200:
-                        article_soup = BeautifulSoup(article_response.text, 'html.parser')
-                        # Try to find the first valid image
-                        for img in article_soup.find_all('img'):
-                            if img.get('src') and img['src'].startswith('http'):
-                                image_url = img['src']
-                                break
-                except:
-                    pass
+
+                image_url = None  # Resolved lazily from og:image by thumbnail_utils
                 
                 if full_link not in processed_urls and len(title_text) > 15:
                     news_items.append({
@@ -1758,20 +1771,8 @@ def scrape_google_news(query_term):
             for link_tag in potential_links:
                 title_text = link_tag.get_text(strip=True) or (link_tag.find(['h3','h4','div'], recursive=False) and link_tag.find(['h3','h4','div'], recursive=False).get_text(strip=True)) or (link_tag.img and link_tag.img.get('alt'))
                 full_link = "https://news.google.com" + link_tag['href'][1:]
-                
-                # Try to get image from article
-                image_url = None
-                try:
-                    article_response = requests.get(full_link, headers=headers, timeout=5)
-                    if article_response.status_code == 200:
-                        article_soup = BeautifulSoup(article_response.text, 'html.parser')
-                        # Try to find the first valid image
-                        for img in article_soup.find_all('img'):
-                            if img.get('src') and img['src'].startswith('http'):
-                                image_url = img['src']
-                                break
-                except:
-                    pass
+
+                image_url = None  # Resolved lazily from og:image by thumbnail_utils
                 
                 if full_link not in processed_urls and title_text and len(title_text) > 20 and (query_term.split()[0].lower() in title_text.lower() or query_term.lower() in title_text.lower()):
                     news_items.append({
@@ -1795,7 +1796,7 @@ def scrape_yahoo_finance_news(ticker_symbol):
     search_url = f"https://finance.yahoo.com/quote/{ticker_symbol}/news"
     headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
     try:
-        response = requests.get(search_url, headers=headers, timeout=15); response.raise_for_status()
+        response = cached_get(search_url, headers=headers, timeout=15); response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser')
         article_containers = soup.find_all('li', class_=lambda x: x and 'stream-item' in x.lower(), limit=15)
         if not article_containers : article_containers = soup.select('div.Cf div.js-stream-content > div', limit=15)
@@ -1808,20 +1809,8 @@ def scrape_yahoo_finance_news(ticker_symbol):
                 elif raw_link.startswith('https://finance.yahoo.com/news/'): full_link = raw_link
                 elif raw_link.startswith(('http://', 'https://')) and 'yahoo.com' in raw_link : full_link = raw_link
                 else: continue
-                
-                # Try to get image from article
-                image_url = None
-                try:
-                    article_response = requests.get(full_link, headers=headers, timeout=5)
-                    if article_response.status_code == 200:
-                        article_soup = BeautifulSoup(article_response.text, 'html.parser')
-                        # Try to find the first valid image
-                        for img in article_soup.find_all('img'):
-                            if img.get('src') and img['src'].startswith('http'):
-                                image_url = img['src']
-                                break
-                except:
-                    pass
+
+                image_url = None  # Resolved lazily from og:image by thumbnail_utils
                 
                 publisher_name = "Yahoo Finance"; publisher_tag_container = item_container.find('div', class_=lambda x: x and ('publisher' in x.lower() or 'provider' in x.lower() or 'c-secondary-text' in x.lower()))
                 if publisher_tag_container: publisher_name = (publisher_tag_container.find('span') and publisher_tag_container.find('span').get_text(strip=True)) or publisher_tag_container.get_text(strip=True) or publisher_name
@@ -1843,22 +1832,15 @@ def scrape_yahoo_finance_news(ticker_symbol):
 
 @st.cache_data(show_spinner=False)
 def analyze_news_item_sentiment_vader(text):
-    if not text or not isinstance(text, str) or not text.strip(): return {"label": "NEUTRAL", "score": 0.0, "compound": 0.0}
-    vs = vader_analyzer.polarity_scores(text); compound_score = vs['compound']
-    label = "POSITIVE" if compound_score >= 0.05 else "NEGATIVE" if compound_score <= -0.05 else "NEUTRAL"
-    return {"label": label, "score": compound_score, "compound": compound_score}
+    return score_texts_vader([text])[0]  # Shares the persistent per-headline score store
 
 @st.cache_data(ttl=3600)
 def analyze_sentiment_text_hf(text):
     if not text or not isinstance(text, str): return {"label": "NEUTRAL", "score": 0.0}
-    try:
-        max_len = hf_sentiment_analyzer.tokenizer.model_max_length
-        truncated_text = text[:max_len] if len(text) > max_len else text
-        if not truncated_text.strip(): return {"label": "NEUTRAL", "score": 0.0}
-        return hf_sentiment_analyzer(truncated_text)[0]
+    try: return score_texts_hf([text])[0]
     except Exception: return {"label": "NEUTRAL", "score": 0.0}
 
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, hash_funcs=FRAME_HASH_FUNCS)
 def assess_volatility_and_risk(df, window=60):
     if df.empty or 'Close' not in df.columns or len(df) < window + 1: return None, "N/A", "Not enough data."
     daily_returns = df['Close'].pct_change().dropna()
@@ -1878,7 +1860,7 @@ def get_historical_volatility_data(df, window=30, trading_days=252):
     if df.empty or 'Close' not in df.columns or len(df) < window + 1: return None
     return (df['Close'].pct_change().rolling(window=window).std() * np.sqrt(trading_days) * 100).dropna()
 
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, hash_funcs=FRAME_HASH_FUNCS)
 def get_correlation_data(ticker1_df, ticker2_symbol, main_ticker_symbol, period='1y', interval='1d'):
     try:
         ticker2_df = fetch_stock_data(ticker2_symbol, period=period, interval=interval)
@@ -1891,7 +1873,7 @@ def get_correlation_data(ticker1_df, ticker2_symbol, main_ticker_symbol, period=
         return rolling_corr.dropna(), overall_corr, None
     except Exception as e: return None, None, f"Corr. Error with {ticker2_symbol}: {e}"
 
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, hash_funcs=FRAME_HASH_FUNCS)
 def calculate_historical_performance_and_cagr(df_hist, initial_investment=1000):
     if df_hist.empty or len(df_hist) < 2 or 'Close' not in df_hist.columns: return None, None, None, "Not enough hist. data."
     start_price, end_price = df_hist['Close'].iloc[0], df_hist['Close'].iloc[-1]
@@ -1921,7 +1903,7 @@ def calculate_max_drawdown(df):
         start_date = df.index[0]
     return max_drawdown, start_date, end_date
 
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, hash_funcs=FRAME_HASH_FUNCS)
 def calculate_sharpe_ratio(returns, risk_free_rate):
     """Calculates the Sharpe ratio."""
     if returns is None or returns.empty or len(returns) < 2:
@@ -1954,7 +1936,7 @@ def calculate_sortino_ratio(returns, risk_free_rate):
     sortino_ratio = (expected_return - target_return) / downside_std * np.sqrt(252)
     return sortino_ratio
 
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, hash_funcs=FRAME_HASH_FUNCS)
 def calculate_beta(stock_returns, index_returns):
     """Calculates the beta of a stock against an index."""
     if stock_returns is None or index_returns is None or len(stock_returns) < 2 or len(index_returns) < 2:
@@ -2090,10 +2072,23 @@ def calculate_max_drawdown(df):
     return max_drawdown, start_date, end_date
 
 # --- AI PORTFOLIO ADVISOR FUNCTIONS ---
+ADVISOR_MAX_WORKERS = 8
+ADVISOR_CANDIDATE_TIMEOUT_SECONDS = 45  # A candidate still running after this is skipped
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_batch_stock_data(tickers, period='6mo', interval='1d'):
+    # Candidates missing from the bar store are fetched together in one bulk download and stored; all are then sliced locally
+    return get_bars_many(list(tickers), period=period, interval=interval, max_workers=ADVISOR_MAX_WORKERS)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_advisor_signal_board(tickers):
+    # generate_signal for every candidate in one panel pass over the prefetched frames
+    return signal_board(*build_panel(fetch_batch_stock_data(tickers)))
+
 @st.cache_data(ttl=1800, show_spinner=False)
-def get_candidate_stock_details_for_advisor(ticker_symbol, company_name_for_news_search_override=None):
+def get_candidate_stock_details_for_advisor(ticker_symbol, company_name_for_news_search_override=None, batch_tickers=None):
     try:
-        stock_info = yf.Ticker(ticker_symbol).info
+        stock_info = get_info(ticker_symbol)
         current_price = stock_info.get('regularMarketPrice', stock_info.get('currentPrice'))
         short_name = stock_info.get('shortName', ticker_symbol)
 
@@ -2111,12 +2106,32 @@ def get_candidate_stock_details_for_advisor(ticker_symbol, company_name_for_news
         }
 
         # Technical Analysis Score
-        df_candidate = fetch_stock_data(ticker_symbol, period='6mo')         
+        # Prefer the advisor's prefetched 6mo frames; fall back to a single-ticker fetch
+        df_candidate = fetch_batch_stock_data(batch_tickers).get(ticker_symbol, pd.DataFrame()) if batch_tickers else pd.DataFrame()
+        if df_candidate.empty:
+            df_candidate = fetch_stock_data(ticker_symbol, period='6mo')
         signal = "HOLD"
         signal_reason = "Insufficient data for signal"
         news_sentiment_score = 0.0
         
-        if not df_candidate.empty:
+        board = get_advisor_signal_board(batch_tickers) if batch_tickers else pd.DataFrame()
+        if not df_candidate.empty and ticker_symbol in board.index:
+            # Scored with the rest of the batch; same values add_technical_indicators/generate_signal give
+            board_row = board.loc[ticker_symbol]
+            signal = board_row['Signal']
+            signal_reason = board_signal_reason(board_row, news_sentiment_score, short_name)
+            rsi = board_row['RSI']
+            if pd.notna(rsi):
+                if rsi < 30: score_components["technical"] += 2
+                elif rsi < 40: score_components["technical"] += 1
+                elif rsi > 70: score_components["technical"] -= 2
+                elif rsi > 60: score_components["technical"] -= 1
+            else:
+                rsi = None
+
+            # MACD Component (line > signal is the same test as a positive histogram)
+            score_components["technical"] += 1 if board_row['MACD Hist'] > 0 else -1
+        elif not df_candidate.empty:
             df_ta_candidate = add_technical_indicators(df_candidate.copy())
             signal, signal_reason = generate_signal(df_ta_candidate, news_sentiment_score, short_name)
             
@@ -2135,6 +2150,7 @@ def get_candidate_stock_details_for_advisor(ticker_symbol, company_name_for_news
                 else:
                     score_components["technical"] -= 1
 
+        if not df_candidate.empty:
             # Momentum Component (20-day returns)
             if len(df_candidate) >= 20:
                 returns_20d = (df_candidate['Close'].iloc[-1] / df_candidate['Close'].iloc[-20] - 1) * 100
@@ -2164,11 +2180,9 @@ def get_candidate_stock_details_for_advisor(ticker_symbol, company_name_for_news
             news_items, _ = scrape_google_news(company_name_for_news_search_override or short_name)
         
         if news_items:
-            sentiment_scores = []
-            for item in news_items:
-                text = (item.get('title', '') + ' ' + item.get('description', '')).strip()
-                sentiment = analyze_news_item_sentiment_vader(text)
-                sentiment_scores.append(sentiment['compound'])
+            sentiment_scores = [sentiment['compound'] for sentiment in score_texts_vader([
+                ((item.get('title') or '') + ' ' + (item.get('description') or '')).strip() for item in news_items
+            ])]
             
             if sentiment_scores:
                 avg_sentiment = sum(sentiment_scores) / len(sentiment_scores)
@@ -2232,12 +2246,31 @@ def generate_portfolio_suggestions(investment_amount, investment_currency_symbol
         with lottie_placeholder.container():
             st_lottie(lottie_animation, speed=1, width=150, height=150, key="advisor_loading_lottie_unique") 
     
-    for i, ticker_candidate in enumerate(candidate_tickers):
-        status_text.text(f"Analyzing candidate {i+1}/{len(candidate_tickers)}: {ticker_candidate}...")
-        details = get_candidate_stock_details_for_advisor(ticker_candidate)
-        if details:
-             analyzed_candidates.append(details)
-        progress_bar.progress((i + 1) / len(candidate_tickers))
+    # One bulk price download for every candidate instead of one per ticker
+    status_text.text(f"Downloading price history for {len(candidate_tickers)} candidates...")
+    batch_tickers = tuple(candidate_tickers)
+    with request_priority(PRIORITY_BULK):
+        fetch_batch_stock_data(batch_tickers)
+
+    # Candidates are scored concurrently; the progress bar advances as each one finishes
+    unique_candidates = list(dict.fromkeys(candidate_tickers))
+    status_text.text(f"Analyzing {len(unique_candidates)} candidates...")
+    candidate_details, skipped_candidates = {}, []
+    completed_results = iter_completed(
+        with_priority(PRIORITY_BULK, lambda t: get_candidate_stock_details_for_advisor(t, batch_tickers=batch_tickers)), unique_candidates,
+        max_workers=ADVISOR_MAX_WORKERS, timeout_seconds=ADVISOR_CANDIDATE_TIMEOUT_SECONDS
+    )
+    for i, (ticker_candidate, details) in enumerate(completed_results):
+        if isinstance(details, Exception):
+            skipped_candidates.append(ticker_candidate)
+        elif details:
+            candidate_details[ticker_candidate] = details
+        status_text.text(f"Analyzed {i+1}/{len(unique_candidates)}: {ticker_candidate}")
+        progress_bar.progress((i + 1) / len(unique_candidates))
+    # Keep the caller's candidate order so equal scores rank the same way on every run
+    analyzed_candidates = [candidate_details[t] for t in unique_candidates if t in candidate_details]
+    if skipped_candidates:
+        st.caption(f"Skipped (timed out or failed): {', '.join(skipped_candidates)}")
     
     lottie_placeholder.empty() 
     status_text.text("Filtering, ranking, and allocating funds...")
@@ -2313,7 +2346,7 @@ def generate_portfolio_suggestions(investment_amount, investment_currency_symbol
 if ticker:
     try:
         with st.spinner("🔄 Initializing..."):
-            stock_info_main = yf.Ticker(ticker).info
+            stock_info_main = get_info(ticker)
             if not stock_info_main or stock_info_main.get('regularMarketPrice') is None:
                 st.error(f"Essential data for **{ticker}** unavailable. Check the ticker or try again later.")
                 st.stop()
@@ -2393,14 +2426,7 @@ if ticker:
     company_name_for_news_search = stock_info_main.get('shortName', ticker)
 
     with st.spinner(f"Summoning insights for {ticker}... This might take a moment."):
-        df = fetch_stock_data(ticker, selected_period)
-        if df.empty: st.error(f"No historical data for {ticker} ({selected_label})."); st.stop()
-        
-        df_ta = add_technical_indicators(df.copy()) 
-
-        (about_info, sector, industry, mcap_val, exch_val, s_info_full, fin_df, earn_df,
-         analyst_recs, analyst_price_target_data, company_officers) = get_about_stock_info(ticker)
-        
+        # df, df_ta and the get_about_stock_info results were already loaded above; don't refetch them here
         if not s_info_full and stock_info_main: s_info_full = stock_info_main 
         if s_info_full and s_info_full.get('currency') and s_info_full.get('currency') != stock_currency_code : 
             stock_currency_code = s_info_full.get('currency', stock_currency_code)
@@ -2442,9 +2468,12 @@ if ticker:
 
         if processed_news_for_sentiment:
             compound_scores = []
-            for item_idx, item_content in enumerate(processed_news_for_sentiment):
-                text_for_sentiment = (item_content.get('title') or "") + " " + (item_content.get('description') or "")
-                vader_sentiment_result = analyze_news_item_sentiment_vader(text_for_sentiment.strip())
+            # Score every headline in one batch; ones seen before (by any user or ticker) come from the store
+            vader_sentiment_results = score_texts_vader([
+                ((item_content.get('title') or "") + " " + (item_content.get('description') or "")).strip()
+                for item_content in processed_news_for_sentiment
+            ])
+            for item_idx, vader_sentiment_result in enumerate(vader_sentiment_results):
                 processed_news_for_sentiment[item_idx]["vader_sentiment"] = vader_sentiment_result
                 compound_scores.append(vader_sentiment_result['compound'])
                 if vader_sentiment_result['label'] == "POSITIVE": overall_news_sentiment_stats["positive_count"] += 1
@@ -2564,6 +2593,7 @@ if ticker:
             fig.add_trace(go.Bar(x=df_ta.index,y=df_ta['MACD_hist'],name='MACD Hist.',marker_color=np.where(df_ta['MACD_hist']>0,'#39ff14','#c0392b'), yaxis="y3", opacity=0.6))
         if show_earnings_dates_cb:
             try:
+                acquire(YAHOO)
                 earnings_data = yf.Ticker(ticker).earnings_dates
                 if earnings_data is not None and not earnings_data.empty:
                     min_c_date, max_c_date = df_ta.index.min(), df_ta.index.max()
@@ -2734,29 +2764,13 @@ if ticker:
                         publisher = news_item.get('publisher', 'N/A')
                         published_time = news_item.get('published', 'N/A')
                         
-                        # Enhanced image handling with multiple fallbacks
+                        # Render immediately: use a cached og:image if one has been resolved,
+                        # otherwise a placeholder while thumbnail_utils resolves it in the background
                         image_url = news_item.get('image_url')
                         if not image_url or not image_url.startswith('http'):
-                            # Try to get company logo as fallback
-                            if s_info_full and s_info_full.get('logo_url'):
-                                image_url = s_info_full.get('logo_url')
-                            else:
-                                # Try to get company logo from Yahoo Finance
-                                try:
-                                    yahoo_logo_url = f"https://s.yimg.com/aq/autoc?query={ticker}&region=US&lang=en-US"
-                                    response = requests.get(yahoo_logo_url, timeout=2)
-                                    if response.status_code == 200:
-                                        data = response.json()
-                                        if data.get('ResultSet', {}).get('Result'):
-                                            result = data['ResultSet']['Result'][0]
-                                            if result.get('symbol') == ticker and result.get('logourl'):
-                                                image_url = result['logourl']
-                                except:
-                                    pass
-                                
-                                # Use default company icon as last resort
-                                if not image_url or not image_url.startswith('http'):
-                                    image_url = DEFAULT_COMPANY_ICON_PATH
+                            image_url = get_thumbnail(link)
+                        if not image_url:
+                            image_url = s_info_full.get('logo_url') if s_info_full and s_info_full.get('logo_url') else DEFAULT_COMPANY_ICON_PATH
 
                         # Add error handling for image loading with multiple fallbacks
                         st.markdown(f"""
@@ -2825,8 +2839,8 @@ if ticker:
                 stock_returns = df['Close'].pct_change().dropna()
                 cagr_stock = hist_cagr
                 risk_free_rate = market_info.get("risk_free_rate", 0.03)
-                sharpe_stock = calculate_sharpe_ratio(stock_returns, risk_free_rate)
-                sortino_stock = calculate_sortino_ratio(stock_returns, risk_free_rate)
+                stock_risk = risk_report(stock_returns.to_frame('stock'), risk_free_rate=risk_free_rate).loc['stock']
+                sharpe_stock, sortino_stock = risk_metric(stock_risk['sharpe']), risk_metric(stock_risk['sortino'])
                 
                 # Display metrics
                 col1, col2, col3 = st.columns(3)
@@ -2849,17 +2863,14 @@ if ticker:
                 _, _, cagr_index, _ = calculate_historical_performance_and_cagr(index_df)
                 
                 risk_free_rate = market_info.get("risk_free_rate", 0.03)
-                
-                sharpe_stock = calculate_sharpe_ratio(combined_returns['stock'], risk_free_rate)
-                sharpe_index = calculate_sharpe_ratio(combined_returns['index'], risk_free_rate)
 
-                sortino_stock = calculate_sortino_ratio(combined_returns['stock'], risk_free_rate)
-                sortino_index = calculate_sortino_ratio(combined_returns['index'], risk_free_rate)
-
-                beta_stock = calculate_beta(combined_returns['stock'], combined_returns['index'])
-                
-                max_drawdown_stock, _, _ = calculate_max_drawdown(df)
-                max_drawdown_index, _, _ = calculate_max_drawdown(index_df)
+                # Stock and index risk metrics in one vectorised pass, each over its own bars
+                perf_closes = pd.concat([df['Close'].rename('stock'), index_df['Close'].rename('index')], axis=1)
+                perf_risk = risk_report(returns_from_closes(perf_closes), benchmark='index', risk_free_rate=risk_free_rate)
+                sharpe_stock, sharpe_index = risk_metric(perf_risk.loc['stock', 'sharpe']), risk_metric(perf_risk.loc['index', 'sharpe'])
+                sortino_stock, sortino_index = risk_metric(perf_risk.loc['stock', 'sortino']), risk_metric(perf_risk.loc['index', 'sortino'])
+                beta_stock = risk_metric(perf_risk.loc['stock', 'beta'])
+                max_drawdown_stock, max_drawdown_index = risk_metric(perf_risk.loc['stock', 'max_drawdown']), risk_metric(perf_risk.loc['index', 'max_drawdown'])
 
                 # Convert CAGR to a decimal for Calmar calculation
                 calmar_stock = calculate_calmar_ratio(cagr_stock / 100 if cagr_stock else None, max_drawdown_stock)
@@ -2900,7 +2911,7 @@ if ticker:
                     st.metric("Max Drawdown (Stock)", f"{max_drawdown_stock*100:.2f}%" if max_drawdown_stock is not None else "N/A", help="The largest peak-to-trough decline in investment value.")
                     st.metric("Beta vs. Index", f"{beta_stock:.2f}" if beta_stock is not None else "N/A", help="Measures the stock's volatility relative to the index. >1 is more volatile, <1 is less volatile.")
                 with perf_col6:
-                    vol_index, _, _ = assess_volatility_and_risk(index_df)
+                    vol_index = risk_metric(perf_risk.loc['index', 'recent_volatility'])
                     st.metric("Volatility (Index)", f"{vol_index:.2f}%" if vol_index is not None else "N/A")
                     st.metric("Max Drawdown (Index)", f"{max_drawdown_index*100:.2f}%" if max_drawdown_index is not None else "N/A")
 
@@ -2987,6 +2998,9 @@ if ticker:
             with sim_cols1[1]:
                 sim_years = st.slider("Simulation Years", 1, 40, 10, key="sim_years")
                 reinvest_dividends = st.checkbox("Reinvest Dividends", value=True, key="sim_reinvest")
+                num_simulations = st.select_slider("Number of Simulations", options=[500, 1000, 5000, 10000, 50000, 100000], value=10000, key="sim_num_paths")
+                sim_seed_input = st.number_input("Random Seed (0 = random)", min_value=0, value=0, step=1, key="sim_seed", help="Use a fixed seed to reproduce a run.")
+                sim_seed = int(sim_seed_input) or None
             
             # Market Parameters
             st.markdown("""
@@ -3025,24 +3039,13 @@ if ticker:
             # Generate and display simulations
             if st.button("🚀 Run Monte Carlo Simulation", use_container_width=True, key="run_sim_btn"):
                 with st.spinner("Running thousands of simulations... this may take a moment."):
-                    # Generate multiple scenarios
-                    num_simulations = 500
-                    scenarios = []
-                    for _ in range(num_simulations):
-                        dates = pd.date_range(start=pd.Timestamp.now(), periods=sim_years*12, freq='M')
-                        values = [initial_investment_sim]
-                        current_value = initial_investment_sim
-                        
-                        for _ in range(1, len(dates)):
-                            monthly_growth = np.random.normal(sim_growth/12, sim_volatility/np.sqrt(12))
-                            current_value *= (1 + monthly_growth)
-                            current_value += monthly_contribution
-                            if reinvest_dividends and dividend_yield > 0:
-                                current_value *= (1 + dividend_yield/12)
-                            values.append(max(0, current_value)) # Ensure value doesn't go below zero
-                        scenarios.append(pd.Series(values, index=dates))
-                    
-                    final_values = [s.iloc[-1] for s in scenarios]
+                    sim_result = run_monte_carlo(
+                        initial_investment_sim, monthly_contribution, sim_years, sim_growth, sim_volatility,
+                        dividend_yield=dividend_yield, reinvest_dividends=reinvest_dividends,
+                        num_simulations=num_simulations, seed=sim_seed
+                    )
+                    final_values = sim_result["final_values"]
+                    sim_dates = sim_result["dates"]
                     
                     # --- Display Simulation Results ---
                     st.markdown("---")
@@ -3056,29 +3059,29 @@ if ticker:
                     """, unsafe_allow_html=True)
                     fig_sim = go.Figure()
                     colors = px.colors.qualitative.Plotly
-                    for i, scenario in enumerate(scenarios[:5]): # Plot first 5 as examples
+                    for i, scenario in enumerate(sim_result["sample_paths"]): # Plot first 5 as examples
                         fig_sim.add_trace(go.Scatter(
-                            x=scenario.index, y=scenario.values, name=f'Scenario {i+1}',
+                            x=sim_dates, y=scenario, name=f'Scenario {i+1}',
                             line=dict(color=colors[i], width=1.5, dash='dot'),
                             opacity=0.7
                         ))
                     
                     # Add median and percentile bounds
-                    percentile_25 = pd.concat(scenarios, axis=1).quantile(0.25, axis=1)
-                    percentile_50 = pd.concat(scenarios, axis=1).quantile(0.50, axis=1) # Median
-                    percentile_75 = pd.concat(scenarios, axis=1).quantile(0.75, axis=1)
+                    percentile_25 = sim_result["percentiles"][25]
+                    percentile_50 = sim_result["percentiles"][50] # Median
+                    percentile_75 = sim_result["percentiles"][75]
                     
                     fig_sim.add_trace(go.Scatter(
-                        x=percentile_25.index, y=percentile_25.values,
+                        x=sim_dates, y=percentile_25,
                         fill=None, line=dict(color='rgba(255,255,255,0.3)', width=1, dash='dash'), showlegend=False
                     ))
                     fig_sim.add_trace(go.Scatter(
-                        x=percentile_75.index, y=percentile_75.values,
+                        x=sim_dates, y=percentile_75,
                         fill='tonexty', fillcolor='rgba(0, 191, 255, 0.2)',
                         line=dict(color='rgba(255,255,255,0.3)', width=1, dash='dash'), name='25-75th Percentile'
                     ))
                     fig_sim.add_trace(go.Scatter(
-                        x=percentile_50.index, y=percentile_50.values, name='Median Outcome',
+                        x=sim_dates, y=percentile_50, name='Median Outcome',
                         line=dict(color='#00bfff', width=3)
                     ))
 
@@ -4458,18 +4461,22 @@ if ticker:
         # Display watchlist
         if st.session_state.watchlist:
             st.markdown("### Your Watchlist")
+            # One bulk price download plus concurrent name lookups instead of a serial .info per row
+            with request_priority(PRIORITY_BULK):
+                watchlist_quotes = get_batch_quotes(st.session_state.watchlist)
+                watchlist_infos = fetch_batch_info(st.session_state.watchlist, field_classes=("profile",))
             for stock in st.session_state.watchlist:
                 try:
-                    stock_info = yf.Ticker(stock).info
-                    current_price = stock_info.get('regularMarketPrice', 'N/A')
-                    prev_close = stock_info.get('regularMarketPreviousClose', 'N/A')
-                    change = ((current_price - prev_close) / prev_close * 100) if current_price != 'N/A' and prev_close != 'N/A' else 0
+                    stock_info = watchlist_infos.get(stock, {})
+                    quote = watchlist_quotes.loc[stock.upper()]
+                    watch_price = quote['price'] if pd.notna(quote['price']) else 'N/A'
+                    change = quote['change_pct'] if pd.notna(quote['change_pct']) else 0
                     
                     col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
                     with col1:
                         st.markdown(f"**{stock}** - {stock_info.get('shortName', 'N/A')}")
                     with col2:
-                        st.metric("Price", f"${current_price:.2f}" if current_price != 'N/A' else 'N/A')
+                        st.metric("Price", f"${watch_price:.2f}" if watch_price != 'N/A' else 'N/A')
                     with col3:
                         st.metric("Change", f"{change:.2f}%", delta=f"{change:.2f}%")
                     with col4:
@@ -4478,6 +4485,49 @@ if ticker:
                             st.rerun()
                 except:
                     st.error(f"Could not fetch data for {stock}")
+
+            # Risk columns for the whole list, measured against the selected market's index
+            watch_market_info = market_info
+            watchlist_risk = get_risk_table(st.session_state.watchlist, watch_market_info.get('index'), watch_market_info.get('risk_free_rate', 0.03))
+            if not watchlist_risk.empty:
+                st.markdown("#### Risk (1Y)")
+                st.dataframe(pd.DataFrame({
+                    'Volatility': watchlist_risk['volatility'].map('{:.1f}%'.format, na_action='ignore'),
+                    'Risk Level': watchlist_risk['risk_level'],
+                    'Sharpe': watchlist_risk['sharpe'].round(2),
+                    'Sortino': watchlist_risk['sortino'].round(2),
+                    'Max Drawdown': (watchlist_risk['max_drawdown'] * 100).map('{:.1f}%'.format, na_action='ignore'),
+                    'Beta': watchlist_risk['beta'].round(2),
+                }), use_container_width=True)
+
+            # Correlation across the list: heatmap in cluster order, so names that move together sit together
+            if len(st.session_state.watchlist) >= 2:
+                with st.expander("🔗 Correlation & Diversification"):
+                    corr_window = st.select_slider("Rolling window (trading days)", options=[20, 60, 120, 250], value=60, key="watchlist_corr_window")
+                    watchlist_returns = get_panel_returns(st.session_state.watchlist)
+                    if watchlist_returns.shape[1] < 2 or len(watchlist_returns) <= corr_window:
+                        st.info("Not enough overlapping price history to correlate these stocks.")
+                    else:
+                        corr_matrix = rolling_correlation(watchlist_returns, window=corr_window, key="watchlist")
+                        corr_clusters, cluster_order = correlation_clusters(corr_matrix)
+                        ordered_corr = corr_matrix.loc[cluster_order, cluster_order]
+                        fig_corr = go.Figure(go.Heatmap(
+                            z=ordered_corr.values, x=cluster_order, y=cluster_order, zmin=-1, zmax=1, colorscale='RdBu_r',
+                            text=np.round(ordered_corr.values, 2), texttemplate="%{text}"
+                        ))
+                        fig_corr.update_layout(
+                            title=f"{corr_window}-Day Return Correlation",
+                            template='plotly_dark', plot_bgcolor='#0e0e0e', paper_bgcolor='#0e0e0e',
+                            height=max(400, 28 * len(cluster_order))
+                        )
+                        st.plotly_chart(fig_corr, use_container_width=True)
+                        cluster_groups = corr_clusters.groupby(corr_clusters).groups
+                        correlated_groups = [", ".join(members) for members in cluster_groups.values() if len(members) > 1]
+                        if correlated_groups:
+                            st.markdown("**Move together (average correlation ≥ 0.5):** " + " · ".join(f"[{group}]" for group in correlated_groups))
+                        else:
+                            st.markdown("**Well diversified:** no group of these stocks has an average correlation of 0.5 or more.")
+                        st.dataframe(most_correlated_pairs(corr_matrix, top=10).style.format({'Correlation': '{:.2f}'}), use_container_width=True, hide_index=True)
         else:
             st.info("Your watchlist is empty. Add some stocks to track!")
 
@@ -4501,38 +4551,44 @@ if ticker:
             volume_min = st.number_input("Min Volume (Millions)", value=1.0)
             sector = st.selectbox("Sector", ["All", "Technology", "Healthcare", "Finance", "Consumer", "Energy", "Industrial"])
 
+        market_config = MARKET_CONFIGS[st.session_state.selected_market]
+        extra_screener_tickers = st.text_input("Additional tickers to screen (comma-separated)", value="", key="screener_extra_tickers")
+
         if st.button("Run Screener", use_container_width=True):
             with st.spinner("Scanning market..."):
-                # Get list of stocks to screen
-                stocks_to_screen = MARKET_CONFIGS[st.session_state.selected_market]["stocks"]
-                results = []
-
-                for stock in stocks_to_screen:
-                    try:
-                        info = yf.Ticker(stock).info
-                        if (info.get('marketCap', 0) >= market_cap_min * 1e6 and
-                            info.get('trailingPE', float('inf')) <= pe_max and
-                            info.get('dividendYield', 0) * 100 >= dividend_yield_min and
-                            info.get('beta', float('inf')) <= beta_max and
-                            info.get('averageVolume', 0) >= volume_min * 1e6 and
-                            (sector == "All" or info.get('sector', '') == sector)):
-                            results.append({
-                                'Ticker': stock,
-                                'Name': info.get('shortName', 'N/A'),
-                                'Price': info.get('regularMarketPrice', 'N/A'),
-                                'Market Cap': f"${info.get('marketCap', 0) / 1e6:.2f}M",
-                                'P/E': info.get('trailingPE', 'N/A'),
-                                'Dividend Yield': f"{info.get('dividendYield', 0) * 100:.2f}%",
-                                'Beta': info.get('beta', 'N/A'),
-                                'Volume': f"{info.get('averageVolume', 0) / 1e6:.2f}M"
-                            })
-                    except:
-                        continue
+                # Universe: the market's featured stocks and index large caps plus anything the user added
+                stocks_to_screen = screener_universe(market_config)
+                stocks_to_screen += [t.strip().upper() for t in extra_screener_tickers.split(",") if t.strip()]
+                fundamentals_table, fundamentals_built_at = get_fundamentals_table(stocks_to_screen)
+                matches = screen_fundamentals(
+                    fundamentals_table,
+                    market_cap_min=market_cap_min * 1e6, pe_max=pe_max,
+                    dividend_yield_min=dividend_yield_min / 100, beta_max=beta_max,
+                    volume_min=volume_min * 1e6, sector=sector
+                )
 
-                if results:
-                    st.dataframe(pd.DataFrame(results), use_container_width=True)
+                if not matches.empty:
+                    results = pd.DataFrame({
+                        'Ticker': matches.index,
+                        'Name': matches['name'].fillna('N/A').values,
+                        'Price': matches['price'].values,
+                        'Market Cap': (matches['market_cap'].fillna(0) / 1e6).map('${:.2f}M'.format).values,
+                        'P/E': matches['trailing_pe'].values,
+                        'Dividend Yield': (matches['dividend_yield'].fillna(0) * 100).map('{:.2f}%'.format).values,
+                        'Beta': matches['beta'].values,
+                        'Volume': (matches['average_volume'].fillna(0) / 1e6).map('{:.2f}M'.format).values
+                    })
+                    # Price-based risk for every match from one panel pass
+                    matches_risk = get_risk_table(matches.index, market_config.get('index'), market_config.get('risk_free_rate', 0.03))
+                    if not matches_risk.empty:
+                        matches_risk = matches_risk.reindex(matches.index.str.upper())
+                        results['Volatility (1Y)'] = matches_risk['volatility'].map('{:.1f}%'.format, na_action='ignore').values
+                        results['Sharpe'] = matches_risk['sharpe'].round(2).values
+                        results['Max Drawdown'] = (matches_risk['max_drawdown'] * 100).map('{:.1f}%'.format, na_action='ignore').values
+                    st.dataframe(results, use_container_width=True)
                 else:
                     st.info("No stocks found matching your criteria")
+                st.caption(f"Screened {len(fundamentals_table)} tickers · fundamentals as of {datetime.fromtimestamp(fundamentals_built_at).strftime('%H:%M')}")
 
     # --- TAB 14: Alerts ---
     with tabs[14]:
@@ -4695,7 +4751,4 @@ if dodo_query:
 
 @st.cache_data(show_spinner=False)
 def analyze_news_item_sentiment_vader(text):
-    if not text or not isinstance(text, str) or not text.strip(): return {"label": "NEUTRAL", "score": 0.0, "compound": 0.0}
-    vs = vader_analyzer.polarity_scores(text); compound_score = vs['compound']
-    label = "POSITIVE" if compound_score >= 0.05 else "NEGATIVE" if compound_score <= -0.05 else "NEUTRAL"
-    return {"label": label, "score": compound_score, "compound": compound_score}
\ No newline at end of file
+    return score_texts_vader([text])[0]  # Shares the persistent per-headline score store
\ No newline at end of file